@@ -15,202 +15,592 @@ Steuerung:
 - 'r' zum Zurücksetzen
 - 'c' zum Löschen der Spur
 - 'm' zum Wechseln des Modus
+- 't' zum Umschalten des ROI-Trackings
+- 'p' zum Umschalten der Pyramiden-Segmentierung
+- 'l' zum Umschalten der Haut-Lookup-Tabelle
+- 'g' zum Umschalten des Motion Gates
+- 'n' zum Wechseln des Erkennungsintervalls (Kalman-Vorhersage dazwischen)
+- 'h' zum Umschalten des adaptiven Haut-Histogramms
+- '1'-'4' für die maximale Anzahl verfolgter Hände
+- 'k' zum Ein-/Ausblenden des Hautmasken-Fensters
+- 'i' zum Umschalten des Profilings (Laufzeit pro Schritt im Bild)
 """
 
+import argparse
+
 import cv2
 import numpy as np
 import time
 import math
 
+from display import DisplayThrottle, add_display_arguments, display_from_args
+from frame_buffers import FrameBuffers
+from frame_capture import open_camera
+from frame_recorder import add_source_arguments, capture_from_args
+from kalman_tracker import KalmanTracker
+from motion_gate import MotionGate
+from multi_hand import HandTrackManager, extract_blobs
+from orientation import OrientationTransform, add_orientation_arguments, orientation_from_args
+from profiling import StageProfiler, add_profiling_arguments, profiler_from_args
+from roi_tracking import RegionOfInterest
+from skin_histogram import AdaptiveSkinModel
+from skin_lut import SkinLookupTable
+from trajectory_buffer import TrajectoryBuffer
+from gesture_classifier import StreamingGestureClassifier
+from rendering import StaticHud, draw_trail_batched, gradient_color, velocity_color
+
 class AdvancedHandTracker:
-    def __init__(self):
-        self.cap = cv2.VideoCapture(0)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+    def __init__(self, camera_index=0):
+        # Kamera mit Capture-Thread (neuester Frame gewinnt), None = headless
+        self.cap = open_camera(camera_index, 640, 480) if camera_index is not None else None
         
         # Hautfarben-Bereich in HSV
         self.lower_skin = np.array([0, 20, 70], dtype=np.uint8)
         self.upper_skin = np.array([20, 255, 255], dtype=np.uint8)
         
-        # Tracking-Variablen
-        self.hand_positions = []
-        self.timestamps = []
+        # Tracking-Variablen (Spur mit Position, Zeit und Geschwindigkeit)
         self.max_trail_length = 50
+        self.hand_positions = TrajectoryBuffer(self.max_trail_length)
         self.calibrated = False
         self.calibrating = False
+        self.pending_click = None       # Kalibrierungsklick, ausgewertet im nächsten Frame
+        
+        # Zwischenpuffer (HSV, Masken, Anzeigebild) einmal pro Auflösung
+        self.buffers = FrameBuffers()
+        self._kernels = {}              # Strukturelemente nach Kernelgröße
+        
+        # Segmentiert wird das ungedrehte Kamerabild; Kontur, Fingerspitzen,
+        # Spur und Gesten liegen in Anzeigekoordinaten (Standard: 180° gedreht)
+        self.orientation = OrientationTransform(180)
         
-        # Geschwindigkeits-Tracking
-        self.velocities = []
+        # Geschwindigkeits-Tracking (geglättet über Kalman-Filter)
         self.max_velocity = 0
+        self.kalman = KalmanTracker()
+        
+        # Nur jeden N-ten Frame erkennen, dazwischen vorhersagen; bei zu großer
+        # Unsicherheit der Vorhersage wird vorzeitig neu erkannt
+        self.detect_interval = 1
+        self.max_prediction_std = 10.0     # Pixel
+        self.frames_since_detection = 0
+        self.hand_lost = True
+        self.detected_frames = 0
+        self.predicted_frames = 0
         
         # Gesten-Erkennung
-        self.gesture_buffer = []
-        self.current_gesture = "Keine"
         self.gesture_threshold = 30  # Mindestanzahl Punkte für Geste
+        self.gesture_buffer = TrajectoryBuffer(self.gesture_threshold * 2)
+        self.gesture_classifier = StreamingGestureClassifier(self.gesture_threshold)
+        self.current_gesture = "Keine"
+        
+        # Mehrere Hände (max_hands > 1): Zuordnung mit stabilen Track-IDs,
+        # jede Hand mit eigener Spur, Kalman-Filter und Geste
+        self.max_hands = 1
+        self.hand_tracks = HandTrackManager(max_hands=4, trail_length=self.max_trail_length,
+                                            gesture_window=self.gesture_threshold)
         
         # Display-Modi
         self.display_modes = ["Normal", "Spur", "Geschwindigkeit", "Gesten"]
         self.current_mode = 0
         
+        # Region-of-Interest Tracking (nach Erfassung nur Fenster um die Hand)
+        self.roi_tracking = False
+        self.roi = RegionOfInterest()
+        self.roi_window = None
+        
+        # Segmentierungs-Pyramide: Hand grob auf verkleinerter Kopie suchen,
+        # dann nur deren Bounding Box in voller Auflösung verfeinern
+        self.pyramid_segmentation = False
+        self.pyramid_scale = 0.5    # 1/2 oder 1/4
+        self.pyramid_margin = 16    # Rand um die grobe Bounding Box (volle Auflösung)
+        
+        # Fingerspitzen-Erkennung
+        self.contour_epsilon = 2.0         # approxPolyDP-Toleranz in Pixeln (0 = aus)
+        self.fingertip_max_angle = 90      # Maximaler Winkel zwischen zwei Fingern (Grad)
+        self.fingertip_min_depth = 10000   # Mindesttiefe des Defekts (1/256 Pixel)
+        
+        # Vorberechnete BGR→Haut Tabelle (wird bei Kalibrierung neu aufgebaut)
+        self.use_skin_lut = False
+        self.skin_lut = SkinLookupTable()
+        
+        # Adaptives H-S Histogramm, nachgeführt aus der Handkontur
+        # (bis zur ersten Kontur wird der feste HSV-Bereich verwendet)
+        self.use_skin_histogram = False
+        self.skin_model = AdaptiveSkinModel()
+        
+        # Motion Gate: unveränderte Frames überspringen, geänderte Kacheln neu segmentieren
+        self.motion_gating = False
+        self.motion_gate = MotionGate()
+        self._gate_mask = None          # Vollbild-Maske des letzten Frames
+        self._last_located = None       # Letztes Ergebnis von locate_hand
+        
+        # Laufzeitmessung pro Verarbeitungsschritt (standardmäßig aus)
+        self.profiler = StageProfiler()
+        
+        # Zeichnen und Anzeige mit höchstens 30 fps, Erkennung mit Kamerarate;
+        # das Fenster mit der Hautmaske nur auf Wunsch
+        self.display = DisplayThrottle(30)
+        self.show_mask = False
+        
+        # Statische HUD-Elemente (Balken, Steuerung) werden einmal vorgerendert
+        self.hud = self._build_hud()
+        
     def mouse_callback(self, event, x, y, flags, param):
         """Callback für Hautkalibrierung"""
         if event == cv2.EVENT_LBUTTONDOWN and self.calibrating:
-            hsv = cv2.cvtColor(self.current_frame, cv2.COLOR_BGR2HSV)
-            pixel_hsv = hsv[y, x]
-            
-            h, s, v = pixel_hsv
-            self.lower_skin = np.array([max(0, h-15), 50, 50], dtype=np.uint8)
-            self.upper_skin = np.array([min(179, h+15), 255, 255], dtype=np.uint8)
-            
-            print(f"Neue Hautfarbe kalibriert: HSV({h}, {s}, {v})")
-            self.calibrated = True
-            self.calibrating = False
+            # Auswertung im nächsten Frame, bevor darauf gezeichnet wird
+            self.pending_click = (x, y)
     
-    def detect_hand(self, frame):
-        """Erweiterte Hand-Erkennung"""
-        # Konvertiere zu HSV
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        
-        # Erstelle Hautmaske
-        mask = cv2.inRange(hsv, self.lower_skin, self.upper_skin)
+    def calibrate_at(self, frame, x, y):
+        """Kalibriert die Hautfarbe am Pixel (x, y) des Kamerabilds (Rohkoordinaten)"""
+        # Nur den geklickten Pixel nach HSV konvertieren
+        h, s, v = (int(c) for c in cv2.cvtColor(frame[y:y+1, x:x+1], cv2.COLOR_BGR2HSV)[0, 0])
+        self.lower_skin = np.array([max(0, h-15), 50, 50], dtype=np.uint8)
+        self.upper_skin = np.array([min(179, h+15), 255, 255], dtype=np.uint8)
+        
+        print(f"Neue Hautfarbe kalibriert: HSV({h}, {s}, {v})")
+        if self.use_skin_lut:
+            self.skin_lut.update(self.lower_skin, self.upper_skin)
+        self.motion_gate.reset()
+        self.skin_model.reset()
+        self.calibrated = True
+        self.calibrating = False
+    
+    def detect_hand(self, frame, dst=None):
+        """
+        Erweiterte Hand-Erkennung
+        
+        Args:
+            frame: BGR-Bild (oder Ausschnitt)
+            dst: Zielmaske; ohne Angabe ein Hilfspuffer, der nur bis zum
+                 nächsten Aufruf gültig ist
+        """
+        if self.pyramid_segmentation:
+            return self.detect_hand_pyramid(frame, dst)
+        
+        return self.segment_skin(frame, dst=dst)
+    
+    def _kernel(self, size):
+        """Elliptisches Strukturelement (einmal pro Größe erzeugt)"""
+        kernel = self._kernels.get(size)
+        if kernel is None:
+            kernel = self._kernels[size] = cv2.getStructuringElement(cv2.MORPH_ELLIPSE,
+                                                                     (size, size))
+        return kernel
+    
+    def segment_skin(self, frame, scale=1.0, dst=None):
+        """
+        Hautsegmentierung mit Morphologie und Median Blur
+        
+        Mit adaptivem Histogramm ist die Maske sauber genug, dass ein kleiner
+        Gauß-Blur vor dem Schwellwert den Median Blur ersetzt.
+        
+        Zwischenbilder liegen in wiederverwendeten Puffern; die Schritte
+        wechseln zwischen Zielmaske und Hilfspuffer, sodass das Ergebnis ohne
+        Kopie in der Zielmaske landet.
+        
+        Args:
+            frame: BGR-Bild
+            scale: Maßstab des Bildes relativ zur vollen Auflösung;
+                   Kernelgrößen werden entsprechend verkleinert
+            dst: Zielmaske; ohne Angabe ein Hilfspuffer, der nur bis zum
+                 nächsten Aufruf gültig ist
+        """
+        kernel_size = max(3, int(round(5 * scale)) | 1)
+        kernel = self._kernel(kernel_size)
+        profiler = self.profiler
+        shape = frame.shape[:2]
+        mask = self.buffers.get("segment", shape) if dst is None else dst
+        tmp = self.buffers.get("morph", shape)
+        
+        if self.use_skin_histogram and self.skin_model.ready:
+            with profiler.stage("cvtColor"):
+                hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV,
+                                   dst=self.buffers.get("hsv", frame.shape))
+            with profiler.stage("backproject"):
+                mask = self.skin_model.segment(hsv, blur=kernel_size, dst=mask)
+            with profiler.stage("morphology"):
+                tmp = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, dst=tmp)
+                mask = cv2.morphologyEx(tmp, cv2.MORPH_CLOSE, kernel, dst=mask)
+            return mask
+        
+        if self.use_skin_lut:
+            # Ein Tabellenzugriff pro Pixel statt HSV-Konvertierung
+            with profiler.stage("lut"):
+                self.skin_lut.update(self.lower_skin, self.upper_skin)
+                tmp = self.skin_lut.apply(frame, dst=tmp)
+        else:
+            # Konvertiere zu HSV
+            with profiler.stage("cvtColor"):
+                hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV,
+                                   dst=self.buffers.get("hsv", frame.shape))
+            
+            # Erstelle Hautmaske
+            with profiler.stage("inRange"):
+                tmp = cv2.inRange(hsv, self.lower_skin, self.upper_skin, dst=tmp)
         
         # Erweiterte morphologische Operationen
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel, iterations=2)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, iterations=1)
+        with profiler.stage("morphology"):
+            mask = cv2.morphologyEx(tmp, cv2.MORPH_CLOSE, kernel, dst=mask, iterations=2)
+            tmp = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, dst=tmp, iterations=1)
         
         # Median Blur für bessere Glättung
-        mask = cv2.medianBlur(mask, 15)
+        with profiler.stage("blur"):
+            mask = cv2.medianBlur(tmp, max(3, int(15 * scale) | 1), dst=mask)
         
         return mask
     
-    def find_hand_features(self, mask):
-        """Findet Hand-Features inklusive Fingerspitzen"""
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
+    def detect_hand_pyramid(self, frame, dst=None):
+        """
+        Zweistufige Hand-Erkennung über eine Auflösungspyramide
+        
+        Die Maske wird zuerst auf einer verkleinerten Kopie berechnet, um den
+        Hand-Blob zu finden. Nur dessen Bounding Box wird danach in voller
+        Auflösung segmentiert, sodass Mittelpunkt und Fingerspitzen ihre volle
+        Genauigkeit behalten.
+        
+        Args:
+            frame: BGR-Bild (oder Ausschnitt)
+            dst: Zielmaske in voller Auflösung (Standard: Hilfspuffer)
+        
+        Returns:
+            Maske in voller Auflösung (außerhalb der Hand leer)
+        """
+        height, width = frame.shape[:2]
+        scale = self.pyramid_scale
+        mask = self.buffers.get("pyramid", (height, width)) if dst is None else dst
+        mask.fill(0)
+        
+        # Zielgröße wie OpenCV rundet, damit der Puffer ohne Neuallokation passt
+        small_shape = (int(round(height * scale)), int(round(width * scale)), frame.shape[2])
+        small = cv2.resize(frame, None, dst=self.buffers.get("pyramid_small", small_shape),
+                           fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        coarse = self.segment_skin(small, scale)
+        contours, _ = cv2.findContours(coarse, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         if not contours:
+            return mask
+        
+        # Größter Blob in der groben Stufe
+        areas = [cv2.contourArea(c) for c in contours]
+        best = int(np.argmax(areas))
+        if areas[best] * (1 / scale) ** 2 < 2000:
+            return mask
+        
+        # Bounding Box auf volle Auflösung skalieren und verfeinern
+        x, y, w, h = cv2.boundingRect(contours[best])
+        margin = self.pyramid_margin
+        x0 = max(0, int(x / scale) - margin)
+        y0 = max(0, int(y / scale) - margin)
+        x1 = min(width, int((x + w) / scale) + margin)
+        y1 = min(height, int((y + h) / scale) + margin)
+        
+        self.segment_skin(frame[y0:y1, x0:x1], dst=mask[y0:y1, x0:x1])
+        return mask
+    
+    def find_hand_features(self, mask, offset=(0, 0)):
+        """Findet Hand-Features inklusive Fingerspitzen"""
+        with self.profiler.stage("findContours"):
+            # offset verschiebt ROI-Konturen in Bildkoordinaten
+            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE,
+                                           offset=offset)
+            
+            # Größte Kontur finden (Fläche pro Kontur nur einmal berechnet)
+            blobs = extract_blobs(contours, 1, min_area=2000)
+        if not blobs:
             return None, None, None
         
-        # Größte Kontur finden
-        largest_contour = max(contours, key=cv2.contourArea)
-        
-        if cv2.contourArea(largest_contour) < 2000:
-            return None, None, None
+        center, largest_contour, _ = blobs[0]
+        return center, largest_contour, self.contour_fingertips(largest_contour)
+    
+    def find_hands(self, mask):
+        """
+        Findet bis zu max_hands Hände
+        
+        Returns:
+            Liste von (Mittelpunkt, Kontur, Fingerspitzen, Fläche), absteigend nach Fläche
+        """
+        with self.profiler.stage("findContours"):
+            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            blobs = extract_blobs(contours, self.max_hands, min_area=2000)
+        return [(center, contour, self.contour_fingertips(contour), area)
+                for center, contour, area in blobs]
+    
+    def contour_fingertips(self, contour):
+        """Fingerspitzen einer Handkontur als (K, 2) int32-Array"""
+        with self.profiler.stage("convexityDefects"):
+            # Kontur vereinfachen, bevor Hülle und Defekte berechnet werden
+            if self.contour_epsilon > 0:
+                simplified = cv2.approxPolyDP(contour, self.contour_epsilon, True)
+            else:
+                simplified = contour
+            
+            fingertips = self.find_fingertips(simplified)
+            if fingertips is None:
+                # Vereinfachte Kontur ergab keine gültigen Defekte: Originalkontur verwenden
+                fingertips = self.find_fingertips(contour)
+        if fingertips is None:
+            fingertips = np.empty((0, 2), dtype=np.int32)
+        
+        return fingertips
+    
+    def find_fingertips(self, contour):
+        """
+        Findet Fingerspitzen über Konvexitätsdefekte der Kontur
         
-        # Schwerpunkt berechnen
-        M = cv2.moments(largest_contour)
-        if M["m00"] == 0:
-            return None, None, None
+        Winkel- und Tiefenfilter werden in einem Schritt über das gesamte
+        (N,4)-Defekt-Array berechnet.
         
-        cx = int(M["m10"] / M["m00"])
-        cy = int(M["m01"] / M["m00"])
-        center = (cx, cy)
+        Returns:
+            (K,2) int32-Array mit Fingerspitzen oder None, wenn für die Kontur
+            keine Defekte berechnet werden können
+        """
+        if len(contour) < 4:
+            return None
         
         # Konvexe Hülle und Defekte finden (für Fingererkennung)
-        hull = cv2.convexHull(largest_contour, returnPoints=False)
-        if len(hull) > 3:
-            defects = cv2.convexityDefects(largest_contour, hull)
-            fingertips = []
-            
-            if defects is not None:
-                for i in range(defects.shape[0]):
-                    s, e, f, d = defects[i, 0]
-                    start = tuple(largest_contour[s][0])
-                    end = tuple(largest_contour[e][0])
-                    far = tuple(largest_contour[f][0])
-                    
-                    # Berechne Winkel
-                    a = math.sqrt((end[0] - start[0])**2 + (end[1] - start[1])**2)
-                    b = math.sqrt((far[0] - start[0])**2 + (far[1] - start[1])**2)
-                    c = math.sqrt((end[0] - far[0])**2 + (end[1] - far[1])**2)
-                    
-                    if b != 0 and c != 0:
-                        angle = math.acos((b**2 + c**2 - a**2) / (2*b*c)) * 180 / math.pi
-                        
-                        # Wenn Winkel klein genug, ist es wahrscheinlich ein Finger
-                        if angle <= 90 and d > 10000:
-                            fingertips.append(start)
-        else:
-            fingertips = []
+        hull = cv2.convexHull(contour, returnPoints=False)
+        if len(hull) <= 3:
+            return np.empty((0, 2), dtype=np.int32)
+        
+        try:
+            defects = cv2.convexityDefects(contour, hull)
+        except cv2.error:
+            # z.B. nicht monotone Hüllen-Indizes bei selbstüberschneidender Kontur
+            return None
+        
+        if defects is None:
+            return np.empty((0, 2), dtype=np.int32)
+        
+        # OpenCV 4 liefert (N,1,4), OpenCV 5 bereits (N,4)
+        defects = defects.reshape(-1, 4)
+        points = contour.reshape(-1, 2)
+        start = points[defects[:, 0]].astype(np.float64)
+        end = points[defects[:, 1]].astype(np.float64)
+        far = points[defects[:, 2]].astype(np.float64)
+        
+        # Seitenlängen des Dreiecks Start-Tiefpunkt-Ende
+        a = np.hypot(*(end - start).T)
+        b = np.hypot(*(far - start).T)
+        c = np.hypot(*(end - far).T)
+        
+        # Winkel am Tiefpunkt über den Kosinussatz (cos >= cos(max) entspricht Winkel <= max)
+        denom = 2 * b * c
+        valid = denom > 0
+        cos_angle = np.divide(b**2 + c**2 - a**2, denom, out=np.full_like(a, -1.0), where=valid)
+        max_cos = math.cos(math.radians(self.fingertip_max_angle))
+        
+        # Wenn Winkel klein genug und Defekt tief genug, ist es wahrscheinlich ein Finger
+        is_finger = valid & (cos_angle >= max_cos) & (defects[:, 3] > self.fingertip_min_depth)
+        return points[defects[is_finger, 0]].astype(np.int32)
+    
+    def locate_hand(self, frame):
+        """
+        Segmentiert den Frame und findet Hand-Features
+        
+        Im ROI-Modus wird nur das Fenster um die letzte Handposition
+        segmentiert; die Maske hat dann die Größe des Fensters.
+        
+        Mit Motion Gate wird bei unverändertem Bild das letzte Ergebnis
+        wiederverwendet und bei teilweiser Änderung nur die geänderten
+        Kacheln in der letzten Vollbild-Maske neu segmentiert.
+        
+        Die Maske liegt in einem wiederverwendeten Puffer und gilt bis zum
+        nächsten Frame. Alle Ergebnisse sind in Rohbild-Koordinaten.
+        
+        Returns:
+            Tuple aus Maske, Handmittelpunkt, Handkontur und Fingerspitzen
+        """
+        changed = self.motion_gate.update(frame) if self.motion_gating else None
+        if changed is not None and self._last_located is not None and not changed.any():
+            return self._last_located
+        
+        window = self.roi.window(frame.shape) if self.roi_tracking else None
         
-        return center, largest_contour, fingertips
+        if window is None and changed is not None and self._gate_mask is not None:
+            # Kleine Bereiche direkt segmentieren (ohne Pyramide)
+            mask = self._gate_mask
+            self.motion_gate.resegment(mask, frame, changed, self.segment_skin)
+            hand_center, hand_contour, fingertips = self.find_hand_features(mask)
+        elif window is None:
+            mask = self.detect_hand(frame, dst=self.buffers.get("mask", frame.shape[:2]))
+            hand_center, hand_contour, fingertips = self.find_hand_features(mask)
+        else:
+            x0, y0, x1, y1 = window
+            mask = self.detect_hand(frame[y0:y1, x0:x1],
+                                    dst=self.buffers.get("mask", (y1 - y0, x1 - x0)))
+            hand_center, hand_contour, fingertips = self.find_hand_features(
+                mask, offset=(x0, y0))
+        
+        if self.roi_tracking:
+            bbox = cv2.boundingRect(hand_contour) if hand_contour is not None else None
+            self.roi.update(hand_center, bbox)
+        
+        if self.use_skin_histogram and hand_contour is not None:
+            # Hautmodell mit den Pixeln der bestätigten Hand nachführen
+            self.skin_model.update_from_contour(frame, hand_contour)
+        
+        self.roi_window = window
+        if self.motion_gating:
+            # Nur Vollbild-Masken eignen sich für die teilweise Aktualisierung
+            self._gate_mask = mask if window is None else None
+            self._last_located = (mask, hand_center, hand_contour, fingertips)
+        return mask, hand_center, hand_contour, fingertips
     
-    def calculate_velocity(self, current_pos):
-        """Berechnet die Geschwindigkeit der Hand"""
-        current_time = time.time()
+    def update_tracking(self, hand_center, current_time=None):
+        """
+        Aktualisiert Kalman-Filter, Spur und Gesten-Puffer
         
-        if len(self.hand_positions) > 1 and len(self.timestamps) > 1:
-            prev_pos = self.hand_positions[-1]
-            prev_time = self.timestamps[-1]
-            
-            # Berechne Distanz und Zeit
-            dx = current_pos[0] - prev_pos[0]
-            dy = current_pos[1] - prev_pos[1]
-            distance = math.sqrt(dx**2 + dy**2)
-            time_diff = current_time - prev_time
+        Spur und Geste verwenden die geglättete Position, die Geschwindigkeit
+        stammt aus dem Filterzustand statt aus der Differenz zweier Frames.
+        
+        Args:
+            hand_center: Erkannter Handmittelpunkt oder None (nur Vorhersage)
+            current_time: Zeitstempel in Sekunden (Standard: time.time())
             
-            if time_diff > 0:
-                velocity = distance / time_diff
-                self.velocities.append(velocity)
-                
-                # Begrenze Geschwindigkeitspuffer
-                if len(self.velocities) > 10:
-                    self.velocities.pop(0)
-                
-                # Update max Geschwindigkeit
-                if velocity > self.max_velocity:
-                    self.max_velocity = velocity
-                
-                return velocity
+        Returns:
+            Aktuelle Geschwindigkeit in px/s
+        """
+        if current_time is None:
+            current_time = time.time()
+        
+        if self.kalman.step(current_time, hand_center) is None:
+            return 0
+        
+        x, y = self.kalman.position
+        velocity = self.kalman.speed
+        if velocity > self.max_velocity:
+            self.max_velocity = velocity
+        
+        # Position hinzufügen (Puffer begrenzen sich selbst)
+        self.hand_positions.append(x, y, current_time, velocity)
+        self.gesture_buffer.append(x, y, current_time, velocity)
+        self.gesture_classifier.push(x, y)
         
-        return 0
+        # Geste erkennen
+        self.current_gesture = self.detect_gesture()
+        
+        return velocity
+    
+    def should_detect(self, current_time):
+        """Entscheidet, ob im aktuellen Frame segmentiert werden muss"""
+        if self.detect_interval <= 1 or self.hand_lost or not self.kalman.initialized:
+            return True
+        if self.frames_since_detection + 1 >= self.detect_interval:
+            return True
+        return self.kalman.position_std(current_time) > self.max_prediction_std
+    
+    def track(self, frame, current_time=None):
+        """
+        Erkennung und Tracking für einen Frame
+        
+        Mit detect_interval > 1 wird nur jeden N-ten Frame segmentiert (oder
+        früher, wenn die Vorhersage zu unsicher wird); dazwischen liefert der
+        Kalman-Filter die Position.
+        
+        Segmentiert wird das Rohbild; Mittelpunkt, Kontur und Fingerspitzen
+        werden danach in Anzeigekoordinaten umgerechnet, sodass Spur,
+        Geschwindigkeit und Gesten der angezeigten Bewegung entsprechen.
+        
+        Returns:
+            Tuple aus Maske (None bei Vorhersage, Rohbild), geglättetem
+            Handmittelpunkt, Handkontur, Fingerspitzen und Geschwindigkeit
+        """
+        if current_time is None:
+            current_time = time.time()
+        
+        if self.should_detect(current_time):
+            mask, hand_center, hand_contour, fingertips = self.locate_hand(frame)
+            orientation, shape = self.orientation, frame.shape
+            hand_center = orientation.to_display(hand_center, shape)
+            hand_contour = orientation.points_to_display(hand_contour, shape)
+            fingertips = orientation.points_to_display(fingertips, shape)
+            self.frames_since_detection = 0
+            self.detected_frames += 1
+            self.hand_lost = hand_center is None
+            if self.hand_lost:
+                return mask, None, None, fingertips, 0
+        else:
+            mask, hand_contour = None, None
+            fingertips = np.empty((0, 2), dtype=np.int32)
+            hand_center = None
+            self.frames_since_detection += 1
+            self.predicted_frames += 1
+        
+        velocity = self.update_tracking(hand_center, current_time)
+        return mask, self.kalman.point(), hand_contour, fingertips, velocity
+    
+    def locate_hands(self, frame):
+        """
+        Segmentiert den ganzen Frame und findet bis zu max_hands Hände
+        
+        ROI-Fenster, Motion Gate und Vorhersage-Intervall gelten nur für
+        den Einzelhand-Modus.
+        
+        Returns:
+            Tuple aus Maske und Liste von (Mittelpunkt, Kontur, Fingerspitzen, Fläche)
+        """
+        mask = self.detect_hand(frame)
+        hands = self.find_hands(mask)
+        
+        if self.use_skin_histogram and hands:
+            # Hautmodell mit der größten Hand nachführen
+            self.skin_model.update_from_contour(frame, hands[0][1])
+        
+        self.roi_window = None
+        return mask, hands
+    
+    def track_hands(self, frame, current_time=None):
+        """
+        Erkennung und Zuordnung mehrerer Hände zu Tracks
+        
+        Die Tracks liegen in Anzeigekoordinaten (siehe track()).
+        
+        Returns:
+            Tuple aus Maske und Liste der in diesem Frame erkannten Tracks
+        """
+        if current_time is None:
+            current_time = time.time()
+        
+        self.hand_tracks.max_hands = self.max_hands
+        mask, hands = self.locate_hands(frame)
+        
+        orientation, shape = self.orientation, frame.shape
+        hands = [(orientation.to_display(center, shape),
+                  orientation.points_to_display(contour, shape),
+                  orientation.points_to_display(fingertips, shape), area)
+                 for center, contour, fingertips, area in hands]
+        return mask, self.hand_tracks.update(hands, current_time)
     
     def detect_gesture(self):
-        """Einfache Gesten-Erkennung"""
-        if len(self.gesture_buffer) < self.gesture_threshold:
-            return "Sammle Daten..."
-        
-        points = np.array(self.gesture_buffer[-self.gesture_threshold:])
-        
-        # Berechne Bounding Box
-        x_coords = points[:, 0]
-        y_coords = points[:, 1]
-        width = np.max(x_coords) - np.min(x_coords)
-        height = np.max(y_coords) - np.min(y_coords)
-        
-        # Klassifiziere Geste basierend auf Form
-        if width < 50 and height < 50:
-            return "Punkt/Stopp"
-        elif width > height * 2:
-            return "Horizontale Linie"
-        elif height > width * 2:
-            return "Vertikale Linie"
-        elif abs(width - height) < 30:
-            # Prüfe auf Kreis
-            center_x = np.mean(x_coords)
-            center_y = np.mean(y_coords)
-            radius = min(width, height) / 2
-            
-            # Berechne Abweichung vom Kreis
-            deviations = []
-            for point in points:
-                expected_radius = math.sqrt((point[0] - center_x)**2 + (point[1] - center_y)**2)
-                deviations.append(abs(expected_radius - radius))
-            
-            avg_deviation = np.mean(deviations)
-            if avg_deviation < radius * 0.3:
-                return "Kreis"
-            else:
-                return "Unregelmäßig"
+        """Einfache Gesten-Erkennung (konstante Kosten unabhängig von der Fenstergröße)"""
+        return self.gesture_classifier.classify()
+    
+    def _build_hud(self):
+        """Registriert Header, Footer und Anweisungen im HUD-Overlay"""
+        hud = StaticHud()
+        
+        # Header und Footer (Footer relativ zum unteren Bildrand)
+        hud.add_rect((0, 0), (-1, 80), (0, 0, 0))
+        hud.add_rect((0, -120), (-1, -1), (0, 0, 0))
+        
+        instructions = [
+            "Steuerung: 's'-Kalibrierung | 'r'-Reset | 'c'-Spur löschen | 'm'-Modus | 'q'-Beenden",
+            "Optimierung: 't'-ROI | 'p'-Pyramide | 'l'-LUT | 'g'-Motion Gate | 'k'-Maske",
+            "Modelle: 'h'-Haut-Histogramm | 'n'-Intervall | '1'-'4' Haende | 'i'-Profiling",
+        ]
+        
+        for i, instruction in enumerate(instructions):
+            hud.add_text(instruction, (10, -120 + 25 + i*20), 0.5, (255, 255, 255), 1)
         
-        return "Unbekannt"
+        return hud
     
     def draw_advanced_info(self, frame):
         """Zeichnet erweiterte Informationen"""
         mode = self.display_modes[self.current_mode]
         
+        # Header, Footer und Anweisungen in einem Schritt einblenden
+        self.hud.composite(frame)
+        
         # Header
-        cv2.rectangle(frame, (0, 0), (frame.shape[1], 80), (0, 0, 0), -1)
         cv2.putText(frame, f"Modus: {mode}", (10, 25), 
                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
         
@@ -221,8 +611,8 @@ class AdvancedHandTracker:
                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
         
         # Geschwindigkeit
-        if self.velocities:
-            current_velocity = self.velocities[-1] if self.velocities else 0
+        if len(self.hand_positions) > 1:
+            current_velocity = self.hand_positions.latest()['v']
             cv2.putText(frame, f"Geschw: {current_velocity:.1f} px/s", (300, 25), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
             cv2.putText(frame, f"Max: {self.max_velocity:.1f} px/s", (300, 50), 
@@ -232,18 +622,20 @@ class AdvancedHandTracker:
         cv2.putText(frame, f"Geste: {self.current_gesture}", (10, 75), 
                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 255), 2)
         
-        # Footer mit Anweisungen
+        # Footer mit dynamischen Zählern (unter den statischen Anweisungen)
         footer_y = frame.shape[0] - 120
-        cv2.rectangle(frame, (0, footer_y), (frame.shape[1], frame.shape[0]), (0, 0, 0), -1)
-        
-        instructions = [
-            "Steuerung: 's'-Kalibrierung | 'r'-Reset | 'c'-Spur löschen | 'm'-Modus | 'q'-Beenden",
+        counters = [
             f"Verfolgte Punkte: {len(self.hand_positions)}",
             f"Gesten-Puffer: {len(self.gesture_buffer)}"
         ]
-        
-        for i, instruction in enumerate(instructions):
-            cv2.putText(frame, instruction, (10, footer_y + 25 + i*20), 
+        if self.max_hands > 1:
+            counters = [
+                f"Haende: {len(self.hand_tracks.tracks)} (max. {self.max_hands})",
+                "IDs: " + ", ".join(f"#{track.id}" for track in self.hand_tracks.tracks)
+            ]
+        
+        for i, counter in enumerate(counters):
+            cv2.putText(frame, counter, (10, footer_y + 85 + i*20), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
     
     def draw_trail_advanced(self, frame):
@@ -253,28 +645,21 @@ class AdvancedHandTracker:
         
         mode = self.display_modes[self.current_mode]
         
-        if mode == "Spur" or mode == "Normal":
-            # Farbverlauf basierend auf Geschwindigkeit
-            for i in range(1, len(self.hand_positions)):
-                alpha = i / len(self.hand_positions)
-                
-                if mode == "Geschwindigkeit" and i < len(self.velocities):
-                    # Farbe basierend auf Geschwindigkeit
-                    velocity = self.velocities[i-1] if i-1 < len(self.velocities) else 0
-                    normalized_vel = min(velocity / max(self.max_velocity, 1), 1)
-                    color = (int(255 * (1-normalized_vel)), 0, int(255 * normalized_vel))
-                else:
-                    # Standard Farbverlauf
-                    color = (int(255 * (1-alpha)), int(255 * alpha), 0)
-                
-                thickness = max(1, int(8 * alpha))
-                cv2.line(frame, self.hand_positions[i-1], self.hand_positions[i], color, thickness)
+        if mode == "Geschwindigkeit":
+            # Farbe basierend auf Geschwindigkeit (pro Segment, in Farbstufen gebündelt)
+            velocities = self.hand_positions.last()['v'][1:]
+            normalized_vel = np.minimum(velocities / max(self.max_velocity, 1), 1)
+            draw_trail_batched(frame, self.hand_positions.points(), 8,
+                               values=normalized_vel, color_fn=velocity_color)
+        
+        elif mode == "Spur" or mode == "Normal":
+            # Standard Farbverlauf
+            draw_trail_batched(frame, self.hand_positions.points(), 8, color_fn=gradient_color)
         
         elif mode == "Gesten":
-            # Zeichne Gesten-Puffer
+            # Zeichne Gesten-Puffer als einen Linienzug
             if len(self.gesture_buffer) > 1:
-                for i in range(1, len(self.gesture_buffer)):
-                    cv2.line(frame, self.gesture_buffer[i-1], self.gesture_buffer[i], (0, 255, 255), 3)
+                cv2.polylines(frame, [self.gesture_buffer.points()], False, (0, 255, 255), 3)
     
     def run(self):
         """Hauptschleife des erweiterten Hand-Trackers"""
@@ -285,76 +670,105 @@ class AdvancedHandTracker:
         cv2.namedWindow('Advanced Hand Tracking')
         cv2.setMouseCallback('Advanced Hand Tracking', self.mouse_callback)
         
+        profiler = self.profiler
+        
         while True:
-            ret, frame = self.cap.read()
+            with profiler.stage("capture"):
+                ret, frame = self.cap.read()
             if not ret:
                 print("Fehler beim Lesen der Webcam!")
                 break
             
-            frame = cv2.rotate(frame, cv2.ROTATE_180)
-            self.current_frame = frame.copy()
+            orientation = self.orientation
+            shape = frame.shape
             
-            # Hand-Erkennung
-            mask = self.detect_hand(frame)
-            hand_center, hand_contour, fingertips = self.find_hand_features(mask)
+            # Kalibrierungsklick (Anzeigekoordinaten) im Kamerabild auswerten
+            if self.pending_click is not None:
+                self.calibrate_at(frame, *orientation.to_raw(self.pending_click, shape))
+                self.pending_click = None
             
-            if hand_center:
-                current_time = time.time()
-                
-                # Geschwindigkeit berechnen
-                velocity = self.calculate_velocity(hand_center)
-                
-                # Position hinzufügen
-                self.hand_positions.append(hand_center)
-                self.timestamps.append(current_time)
-                self.gesture_buffer.append(hand_center)
-                
-                # Buffer begrenzen
-                if len(self.hand_positions) > self.max_trail_length:
-                    self.hand_positions.pop(0)
-                    self.timestamps.pop(0)
-                
-                if len(self.gesture_buffer) > self.gesture_threshold * 2:
-                    self.gesture_buffer.pop(0)
+            # Aufnahmezeitpunkt der Quelle, damit eine Wiedergabe dieselben
+            # Geschwindigkeiten und Gesten liefert wie der Live-Lauf
+            timestamp = self.cap.last_timestamp
+            
+            with profiler.stage("tracking"):
+                if self.max_hands > 1:
+                    # Mehrere Hände: jede mit eigener ID, Spur und Geste
+                    mask, _ = self.track_hands(frame, timestamp)
+                    hand_center = None
+                else:
+                    # Hand-Erkennung bzw. Kalman-Vorhersage; aktualisiert Spur,
+                    # Geschwindigkeit und Geste
+                    mask, hand_center, hand_contour, fingertips, velocity = self.track(
+                        frame, timestamp)
+            
+            profiler.maybe_export()
+            
+            # Anzeige (samt Zeichnen und Tastatur) nur mit der eingestellten Rate
+            if not self.display.due():
+                continue
+            
+            # Pixel nur für die Anzeige drehen; alle Ergebnisse sind bereits
+            # in Anzeigekoordinaten
+            with profiler.stage("rotate"):
+                frame = orientation.render(frame, dst=self.buffers.get(
+                    "display", orientation.display_shape(shape)))
+            
+            with profiler.stage("drawing"):
+                if self.max_hands > 1:
+                    self.hand_tracks.draw(frame)
                 
-                # Geste erkennen
-                self.current_gesture = self.detect_gesture()
+                # Suchfenster im ROI-Modus anzeigen
+                if self.roi_window is not None:
+                    x0, y0, x1, y1 = orientation.rect_to_display(self.roi_window, shape)
+                    cv2.rectangle(frame, (x0, y0), (x1, y1), (0, 255, 255), 1)
                 
-                # Visualisierung
-                if hand_contour is not None:
-                    cv2.drawContours(frame, [hand_contour], -1, (0, 255, 0), 2)
+                if hand_center:
+                    # Visualisierung
+                    if hand_contour is not None:
+                        cv2.drawContours(frame, [hand_contour], -1, (0, 255, 0), 2)
+                    
+                    # Handzentrum
+                    cv2.circle(frame, hand_center, 12, (255, 0, 0), -1)
+                    cv2.circle(frame, hand_center, 18, (255, 255, 255), 3)
+                    
+                    # Fingerspitzen
+                    for fingertip in fingertips.tolist():
+                        cv2.circle(frame, tuple(fingertip), 8, (0, 0, 255), -1)
+                    
+                    # Geschwindigkeitsanzeige am Cursor
+                    if velocity > 0:
+                        cv2.putText(frame, f"{velocity:.0f}", 
+                                   (hand_center[0] + 20, hand_center[1] - 20),
+                                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
                 
-                # Handzentrum
-                cv2.circle(frame, hand_center, 12, (255, 0, 0), -1)
-                cv2.circle(frame, hand_center, 18, (255, 255, 255), 3)
+                # Erweiterte Trail-Visualisierung
+                if self.max_hands == 1:
+                    self.draw_trail_advanced(frame)
                 
-                # Fingerspitzen
-                for fingertip in fingertips:
-                    cv2.circle(frame, fingertip, 8, (0, 0, 255), -1)
+                # Erweiterte Informationen
+                self.draw_advanced_info(frame)
                 
-                # Geschwindigkeitsanzeige am Cursor
-                if velocity > 0:
-                    cv2.putText(frame, f"{velocity:.0f}", 
-                               (hand_center[0] + 20, hand_center[1] - 20),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+                # Kalibrierungs-Hinweis
+                if self.calibrating:
+                    cv2.putText(frame, "Klicke auf deine Hand!", 
+                               (frame.shape[1]//2 - 150, frame.shape[0]//2), 
+                               cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 3)
             
-            # Erweiterte Trail-Visualisierung
-            self.draw_trail_advanced(frame)
+            # Laufzeiten pro Schritt (nur wenn Profiling aktiv)
+            profiler.draw(frame)
             
-            # Erweiterte Informationen
-            self.draw_advanced_info(frame)
-            
-            # Kalibrierungs-Hinweis
-            if self.calibrating:
-                cv2.putText(frame, "Klicke auf deine Hand!", 
-                           (frame.shape[1]//2 - 150, frame.shape[0]//2), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 3)
-            
-            # Anzeige
-            cv2.imshow('Advanced Hand Tracking', frame)
-            
-            # Tastatur-Input
-            key = cv2.waitKey(1) & 0xFF
+            with profiler.stage("display"):
+                # Anzeige
+                cv2.imshow('Advanced Hand Tracking', frame)
+                
+                # Hautmaske auf Wunsch (in vorhergesagten Frames bleibt die letzte stehen)
+                if self.show_mask and mask is not None:
+                    cv2.imshow('Hautmaske', orientation.render(mask, dst=self.buffers.get(
+                        "mask_display", orientation.display_shape(mask.shape))))
+                
+                # Tastatur-Input
+                key = cv2.waitKey(1) & 0xFF
             
             if key == ord('q'):
                 break
@@ -364,19 +778,84 @@ class AdvancedHandTracker:
             elif key == ord('r'):
                 print("Alles zurückgesetzt.")
                 self.calibrated = False
-                self.hand_positions = []
-                self.timestamps = []
-                self.velocities = []
-                self.gesture_buffer = []
+                self.hand_positions.clear()
+                self.gesture_buffer.clear()
+                self.gesture_classifier.clear()
                 self.max_velocity = 0
                 self.current_gesture = "Keine"
+                self.kalman.reset()
+                self.hand_lost = True
+                self.roi.reset()
+                self.motion_gate.reset()
+                self.skin_model.reset()
+                self.hand_tracks.clear()
             elif key == ord('c'):
                 print("Spur gelöscht.")
-                self.hand_positions = []
-                self.gesture_buffer = []
+                self.hand_tracks.clear()
+                self.kalman.reset()
+                self.hand_lost = True
+                self.hand_positions.clear()
+                self.gesture_buffer.clear()
+                self.gesture_classifier.clear()
             elif key == ord('m'):
                 self.current_mode = (self.current_mode + 1) % len(self.display_modes)
                 print(f"Modus gewechselt zu: {self.display_modes[self.current_mode]}")
+            elif key == ord('t'):
+                self.roi_tracking = not self.roi_tracking
+                self.roi.reset()
+                print(f"ROI-Tracking {'aktiviert' if self.roi_tracking else 'deaktiviert'}")
+            elif key == ord('p'):
+                self.pyramid_segmentation = not self.pyramid_segmentation
+                state = 'aktiviert' if self.pyramid_segmentation else 'deaktiviert'
+                self.motion_gate.reset()
+                print(f"Pyramiden-Segmentierung {state} (Maßstab {self.pyramid_scale})")
+            elif key == ord('l'):
+                self.use_skin_lut = not self.use_skin_lut
+                if self.use_skin_lut:
+                    self.skin_lut.update(self.lower_skin, self.upper_skin)
+                self.motion_gate.reset()
+                print(f"Haut-Lookup-Tabelle {'aktiviert' if self.use_skin_lut else 'deaktiviert'}")
+            elif key == ord('h'):
+                self.use_skin_histogram = not self.use_skin_histogram
+                self.skin_model.reset()
+                self.motion_gate.reset()
+                state = 'aktiviert' if self.use_skin_histogram else 'deaktiviert'
+                print(f"Adaptives Haut-Histogramm {state}")
+            elif ord('1') <= key <= ord('4'):
+                self.max_hands = key - ord('0')
+                self.hand_tracks.clear()
+                print(f"Maximal {self.max_hands} Hand/Hände verfolgen")
+            elif key == ord('n'):
+                self.detect_interval = self.detect_interval % 3 + 1
+                print(f"Erkennung jeden {self.detect_interval}. Frame (dazwischen Vorhersage)")
+            elif key == ord('g'):
+                self.motion_gating = not self.motion_gating
+                self.motion_gate.reset()
+                self._gate_mask = None
+                self._last_located = None
+                print(f"Motion Gate {'aktiviert' if self.motion_gating else 'deaktiviert'}")
+            elif key == ord('k'):
+                self.show_mask = not self.show_mask
+                if not self.show_mask:
+                    cv2.destroyWindow('Hautmaske')
+                print(f"Hautmaske {'eingeblendet' if self.show_mask else 'ausgeblendet'}")
+            elif key == ord('i'):
+                self.profiler.enabled = not self.profiler.enabled
+                self.profiler.show_overlay = self.profiler.enabled
+                print(f"Profiling {'aktiviert' if self.profiler.enabled else 'deaktiviert'}")
+        
+        if self.roi.full_pixels:
+            print(f"ROI-Tracking: {self.roi.pixel_ratio() * 100:.1f}% der Pixel segmentiert")
+        if self.motion_gate.full_frames:
+            print(self.motion_gate.stats_text())
+        if self.predicted_frames:
+            total = self.detected_frames + self.predicted_frames
+            print(f"Kalman: {self.predicted_frames}/{total} Frames vorhergesagt")
+        if self.display.skipped:
+            print(self.display.stats_text())
+
+        self.profiler.print_summary()
+        self.profiler.export()
         
         self.cap.release()
         cv2.destroyAllWindows()
@@ -384,8 +863,19 @@ class AdvancedHandTracker:
 
 def main():
     """Hauptfunktion"""
+    parser = argparse.ArgumentParser(description="Erweitertes Hand Tracking mit Gesten-Erkennung")
+    add_source_arguments(parser)
+    add_orientation_arguments(parser)
+    add_display_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    
     try:
-        tracker = AdvancedHandTracker()
+        tracker = AdvancedHandTracker(camera_index=None)
+        tracker.cap = capture_from_args(args)
+        tracker.orientation = orientation_from_args(args)
+        tracker.display = display_from_args(args)
+        tracker.profiler = profiler_from_args(args)
         tracker.run()
     except KeyboardInterrupt:
         print("\nProgramm durch Benutzer beendet.")
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Headless Batch-Verarbeitung für aufgezeichnete Videos
+Lässt die Hand-Tracking-Pipeline ohne Anzeige und ohne waitKey so schnell
+wie möglich über eine Videodatei oder einen Ordner mit Clips laufen.
+
+Pro Frame werden Mittelpunkt, Konturfläche, Fingerspitzen und Geste als
+JSONL (eine Zeile pro Frame) oder als NPZ-Archiv gespeichert. Am Ende wird
+die erreichte Verarbeitungsrate (Frames/s) ausgegeben.
+
+Beispiele:
+    python batch_processing.py aufnahme.mp4 -o ergebnis.jsonl
+    python batch_processing.py clips/ --tracker simple -o ergebnis.npz
+    python batch_processing.py aufnahme.mp4 --compare-pyramid 0.5 0.25
+"""
+
+import argparse
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+from advanced_hand_tracking import AdvancedHandTracker
+from hand_tracking import HandTracker
+from orientation import OrientationTransform
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm', '.m4v')
+
+
+def find_videos(path):
+    """Liefert die Videodatei selbst oder alle Videos eines Ordners (sortiert)"""
+    if os.path.isdir(path):
+        return [os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.lower().endswith(VIDEO_EXTENSIONS)]
+    return [path]
+
+
+def create_tracker(kind, roi_tracking=False, pyramid_scale=None, motion_gate=False,
+                   detect_interval=1, max_hands=1, fast_path=False):
+    """Erstellt einen Tracker ohne Kamera"""
+    if kind == "simple":
+        tracker = HandTracker(camera_index=None)
+        tracker.fast_path = fast_path
+        # Ohne Anzeige wird die Kontur nicht gezeichnet; die Fläche liefern
+        # im schnellen Pfad die Komponenten-Statistiken
+        tracker.draw_contour = not fast_path
+    else:
+        tracker = AdvancedHandTracker(camera_index=None)
+        if pyramid_scale:
+            tracker.pyramid_segmentation = True
+            tracker.pyramid_scale = pyramid_scale
+        tracker.detect_interval = detect_interval
+        tracker.max_hands = max_hands
+    tracker.roi_tracking = roi_tracking
+    tracker.motion_gating = motion_gate
+    # Ergebnisse in Koordinaten des Videos (keine Drehung für die Anzeige)
+    tracker.orientation = OrientationTransform(0)
+    return tracker
+
+
+def frame_timestamp(cap, frame_index, fps):
+    """Zeitstempel eines Frames in Sekunden (Container-Zeit, sonst aus FPS berechnet)"""
+    msec = cap.get(cv2.CAP_PROP_POS_MSEC)
+    if msec > 0:
+        return msec / 1000.0
+    return frame_index / fps if fps > 0 else 0.0
+
+
+def process_frame(tracker, frame, timestamp):
+    """
+    Führt die Erkennung für einen Frame aus und aktualisiert den Tracker-Zustand
+
+    Beim erweiterten Tracker ist der Mittelpunkt Kalman-geglättet; in
+    vorhergesagten Frames (detect_interval > 1) fehlen Kontur und Fingerspitzen.
+    Mit max_hands > 1 enthält 'hands' alle erkannten Hände mit Track-ID; die
+    übrigen Felder beschreiben dann die größte Hand. Im schnellen Pfad des
+    einfachen Trackers ist die Fläche die Pixelanzahl der Komponente, eine
+    Kontur wird dort nicht extrahiert.
+
+    Returns:
+        Dictionary mit Mittelpunkt, Konturfläche, Fingerspitzen, Geste,
+        Geschwindigkeit und ob der Frame nur vorhergesagt wurde
+    """
+    if isinstance(tracker, AdvancedHandTracker) and tracker.max_hands > 1:
+        _, tracks = tracker.track_hands(frame, timestamp)
+        hands = [{'id': track.id, 'center': list(track.point()), 'area': track.area,
+                  'fingertips': track.fingertips.tolist(), 'gesture': track.gesture}
+                 for track in sorted(tracks, key=lambda track: -track.area)]
+        primary = hands[0] if hands else None
+        return {
+            'center': primary['center'] if primary else None,
+            'area': primary['area'] if primary else 0.0,
+            'fingertips': primary['fingertips'] if primary else [],
+            'gesture': primary['gesture'] if primary else None,
+            'velocity': None,
+            'predicted': False,
+            'hands': hands,
+        }
+
+    if isinstance(tracker, AdvancedHandTracker):
+        mask, hand_center, hand_contour, fingertips, velocity = tracker.track(frame, timestamp)
+        area = cv2.contourArea(hand_contour) if hand_contour is not None else 0.0
+        predicted = mask is None
+        gesture = tracker.current_gesture
+    else:
+        _, hand_center, hand_contour = tracker.locate_hand(frame)
+        area = tracker.hand_area if hand_center else 0.0
+        fingertips = None
+        velocity = None
+        predicted = False
+        if hand_center:
+            tracker.update_trail(hand_center)
+        gesture = None
+
+    return {
+        'center': [int(hand_center[0]), int(hand_center[1])] if hand_center else None,
+        'area': float(area),
+        'fingertips': fingertips.tolist() if fingertips is not None else [],
+        'gesture': gesture,
+        'velocity': float(velocity) if velocity is not None and hand_center else None,
+        'predicted': predicted,
+    }
+
+
+def process_video(path, tracker_kind="advanced", max_frames=None, roi_tracking=False,
+                  pyramid_scale=None, motion_gate=False, detect_interval=1, max_hands=1,
+                  fast_path=False):
+    """
+    Verarbeitet eine Videodatei Frame für Frame ohne Anzeige
+
+    Args:
+        path: Pfad zur Videodatei
+        tracker_kind: "simple" (HandTracker) oder "advanced" (AdvancedHandTracker)
+        max_frames: Optionales Limit für die Anzahl Frames
+        roi_tracking: Nach Erfassung nur das Fenster um die Hand segmentieren
+        pyramid_scale: Maßstab der groben Pyramidenstufe (None = aus)
+        motion_gate: Unveränderte Frames überspringen, geänderte Kacheln neu segmentieren
+        detect_interval: Nur jeden N-ten Frame segmentieren, dazwischen Kalman-Vorhersage
+        max_hands: Maximale Anzahl verfolgter Hände (nur erweiterter Tracker)
+        fast_path: Zusammenhangskomponenten statt Konturen (nur einfacher Tracker)
+
+    Returns:
+        Liste mit einem Ergebnis-Dictionary pro Frame
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        print(f"Fehler: {path} konnte nicht geöffnet werden")
+        return []
+
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    tracker = create_tracker(tracker_kind, roi_tracking, pyramid_scale, motion_gate,
+                             detect_interval, max_hands, fast_path)
+    clip = os.path.basename(path)
+    records = []
+
+    frame_index = 0
+    while max_frames is None or frame_index < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        timestamp = frame_timestamp(cap, frame_index, fps)
+        record = {'clip': clip, 'frame': frame_index, 'time': timestamp}
+        record.update(process_frame(tracker, frame, timestamp))
+        records.append(record)
+        frame_index += 1
+
+    cap.release()
+
+    if roi_tracking:
+        print(f"{clip}: ROI-Tracking segmentierte {tracker.roi.pixel_ratio() * 100:.1f}% der Pixel")
+    if motion_gate:
+        print(f"{clip}: {tracker.motion_gate.stats_text()}")
+    if detect_interval > 1 and isinstance(tracker, AdvancedHandTracker):
+        print(f"{clip}: {tracker.predicted_frames}/{len(records)} Frames vorhergesagt")
+    return records
+
+
+def compare_pyramid(path, scales=(0.5, 0.25), max_frames=None):
+    """
+    Vergleicht die Pyramiden-Segmentierung mit dem Pfad in voller Auflösung
+
+    Pro Maßstab werden Laufzeit, Abweichung des Mittelpunkts, Abweichung der
+    Fingerspitzen-Anzahl und die Übereinstimmung der Masken (IoU) gemessen.
+
+    Returns:
+        Dictionary mit einem Bericht pro Maßstab (1.0 = volle Auflösung)
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        print(f"Fehler: {path} konnte nicht geöffnet werden")
+        return {}
+
+    tracker = create_tracker("advanced")
+    stats = {scale: {'time': 0.0, 'center_errors': [], 'missed': 0, 'extra': 0,
+                     'fingertip_diff': 0, 'iou': []} for scale in (1.0,) + tuple(scales)}
+    frames = 0
+
+    while max_frames is None or frames < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames += 1
+        
+        start = time.perf_counter()
+        # Eigener Puffer: die grobe Stufe der Pyramide schreibt in den Hilfspuffer
+        # von segment_skin, die Referenz muss aber bis zum IoU-Vergleich gültig bleiben
+        ref_mask = tracker.segment_skin(
+            frame, dst=tracker.buffers.get("reference", frame.shape[:2]))
+        ref_center, _, ref_tips = tracker.find_hand_features(ref_mask)
+        stats[1.0]['time'] += time.perf_counter() - start
+        
+        for scale in scales:
+            tracker.pyramid_scale = scale
+            start = time.perf_counter()
+            mask = tracker.detect_hand_pyramid(frame)
+            center, _, tips = tracker.find_hand_features(mask)
+            entry = stats[scale]
+            entry['time'] += time.perf_counter() - start
+            
+            if ref_center and center:
+                entry['center_errors'].append(np.hypot(center[0] - ref_center[0],
+                                                       center[1] - ref_center[1]))
+                entry['fingertip_diff'] += abs(len(tips) - len(ref_tips))
+            elif ref_center:
+                entry['missed'] += 1
+            elif center:
+                entry['extra'] += 1
+            
+            union = np.count_nonzero(ref_mask | mask)
+            if union:
+                entry['iou'].append(np.count_nonzero(ref_mask & mask) / union)
+
+    cap.release()
+
+    report = {}
+    for scale, entry in stats.items():
+        errors = entry['center_errors']
+        report[scale] = {
+            'fps': frames / entry['time'] if entry['time'] > 0 else 0.0,
+            'center_error_mean': float(np.mean(errors)) if errors else 0.0,
+            'center_error_max': float(np.max(errors)) if errors else 0.0,
+            'missed': entry['missed'],
+            'extra': entry['extra'],
+            'fingertip_diff': entry['fingertip_diff'],
+            'mask_iou': float(np.mean(entry['iou'])) if entry['iou'] else 1.0,
+        }
+
+    print(f"\nPyramiden-Vergleich für {os.path.basename(path)} ({frames} Frames):")
+    print(f"{'Maßstab':>8} {'Frames/s':>9} {'Fehler Ø':>9} {'Fehler max':>10} "
+          f"{'verpasst':>8} {'zusätzl.':>8} {'Finger Δ':>8} {'IoU':>6}")
+    for scale, r in report.items():
+        print(f"{scale:>8.2f} {r['fps']:>9.1f} {r['center_error_mean']:>8.2f}px "
+              f"{r['center_error_max']:>8.2f}px {r['missed']:>8} {r['extra']:>8} "
+              f"{r['fingertip_diff']:>8} {r['mask_iou']:>6.3f}")
+
+    return report
+
+
+def write_jsonl(records, output_path):
+    """Schreibt ein Ergebnis pro Zeile als JSON"""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def write_npz(records, output_path):
+    """Schreibt die Ergebnisse spaltenweise in ein komprimiertes NPZ-Archiv"""
+    centers = np.array([r['center'] if r['center'] else (-1, -1) for r in records],
+                       dtype=np.int32).reshape(-1, 2)
+
+    # Fingerspitzen variabler Anzahl: flaches Array plus Offsets pro Frame
+    counts = np.array([len(r['fingertips']) for r in records], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    fingertips = np.array([tip for r in records for tip in r['fingertips']],
+                          dtype=np.int32).reshape(-1, 2)
+
+    np.savez_compressed(
+        output_path,
+        clip=np.array([r['clip'] for r in records]),
+        frame=np.array([r['frame'] for r in records], dtype=np.int64),
+        time=np.array([r['time'] for r in records], dtype=np.float64),
+        center=centers,
+        area=np.array([r['area'] for r in records], dtype=np.float32),
+        fingertips=fingertips,
+        fingertip_offsets=offsets,
+        gesture=np.array([r['gesture'] or "" for r in records]),
+        velocity=np.array([np.nan if r['velocity'] is None else r['velocity'] for r in records],
+                          dtype=np.float32),
+        predicted=np.array([r['predicted'] for r in records], dtype=bool),
+    )
+
+
+def write_records(records, output_path):
+    """Wählt das Ausgabeformat anhand der Dateiendung"""
+    if output_path.lower().endswith('.npz'):
+        write_npz(records, output_path)
+    else:
+        write_jsonl(records, output_path)
+
+
+def main():
+    """Hauptfunktion"""
+    parser = argparse.ArgumentParser(description="Headless Hand-Tracking für Videodateien")
+    parser.add_argument("input", help="Videodatei oder Ordner mit Clips")
+    parser.add_argument("-o", "--output", default="tracking_results.jsonl",
+                        help="Ausgabedatei (.jsonl oder .npz)")
+    parser.add_argument("--tracker", choices=["simple", "advanced"], default="advanced",
+                        help="Verwendete Tracking-Pipeline")
+    parser.add_argument("--max-frames", type=int, default=None,
+                        help="Maximale Anzahl Frames pro Clip")
+    parser.add_argument("--roi", action="store_true",
+                        help="ROI-Tracking: nach Erfassung nur um die Hand segmentieren")
+    parser.add_argument("--pyramid", type=float, default=None, metavar="SCALE",
+                        help="Pyramiden-Segmentierung mit grober Stufe SCALE (z.B. 0.5 oder 0.25)")
+    parser.add_argument("--motion-gate", action="store_true",
+                        help="Statische Frames überspringen, nur geänderte Kacheln segmentieren")
+    parser.add_argument("--detect-interval", type=int, default=1, metavar="N",
+                        help="Nur jeden N-ten Frame segmentieren, dazwischen Kalman-Vorhersage "
+                             "(nur erweiterter Tracker)")
+    parser.add_argument("--fast", action="store_true",
+                        help="Schneller Pfad über connectedComponentsWithStats, ohne "
+                             "Konturen (nur einfacher Tracker)")
+    parser.add_argument("--max-hands", type=int, default=1, choices=range(1, 5), metavar="N",
+                        help="Bis zu N Hände mit Track-IDs verfolgen (nur erweiterter Tracker, "
+                             "NPZ speichert nur die größte Hand)")
+    parser.add_argument("--compare-pyramid", type=float, nargs="+", default=None,
+                        metavar="SCALE",
+                        help="Genauigkeit und Geschwindigkeit der Pyramide mit voller "
+                             "Auflösung vergleichen (keine Ausgabedatei)")
+    args = parser.parse_args()
+
+    videos = find_videos(args.input)
+    if not videos:
+        print(f"Keine Videos gefunden in: {args.input}")
+        return
+
+    if args.compare_pyramid:
+        for video in videos:
+            compare_pyramid(video, args.compare_pyramid, args.max_frames)
+        return
+
+    records = []
+    start = time.perf_counter()
+
+    for video in videos:
+        clip_start = time.perf_counter()
+        clip_records = process_video(video, args.tracker, args.max_frames, args.roi,
+                                      args.pyramid, args.motion_gate, args.detect_interval,
+                                      args.max_hands, args.fast)
+        clip_time = time.perf_counter() - clip_start
+        records.extend(clip_records)
+
+        fps = len(clip_records) / clip_time if clip_time > 0 else 0
+        print(f"{os.path.basename(video)}: {len(clip_records)} Frames ({fps:.1f} Frames/s)")
+
+    elapsed = time.perf_counter() - start
+    write_records(records, args.output)
+
+    total_fps = len(records) / elapsed if elapsed > 0 else 0
+    print(f"\n{len(records)} Frames aus {len(videos)} Clip(s) in {elapsed:.2f} s verarbeitet")
+    print(f"Durchsatz: {total_fps:.1f} Frames/s")
+    print(f"Ergebnisse gespeichert: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+"""
+Benchmark der Erkennungs-Pipelines ohne Kamera
+Erzeugt synthetische Frames mit einer hautfarbenen, handförmigen Figur
+(Handfläche und fünf gespreizte Finger), die sich auf festen Bahnen
+(Kreis, Linie, Zickzack) bewegt, und ruft die Schritte beider Tracker
+direkt auf:
+
+- einfach:   detect_hand, find_hand_center, Zeichnen (Spur + Info)
+- erweitert: detect_hand, find_hand_features, update_tracking
+             (Kalman-Filter, Spur, Geste), Zeichnen (Spur + Info)
+
+Pro Auflösung (320p, 480p, 720p, 1080p) werden Frames/s der gesamten
+Pipeline und die Latenzverteilung (Ø, p50, p95, p99) pro Aufruf
+ausgegeben. Die Erzeugung der Frames wird nicht mitgemessen.
+
+Statt synthetischer Frames kann eine Aufnahme von frame_recorder
+verwendet werden (--recording); sie wird ohne Dekodierung aus der mmap
+gelesen, sodass auch hier nur die Verarbeitung in die Zeiten eingeht.
+
+Mit --check-allocations wird per tracemalloc geprüft, dass der
+Erkennungspfad (Segmentierung, Konturen, Tracking) im
+eingeschwungenen Zustand keine Bildpuffer mehr allokiert.
+
+Ergebnisse können als Basis-JSON gespeichert und spätere Läufe damit
+verglichen werden; steigt der Median eines Aufrufs über die Toleranz,
+endet das Skript mit Exit-Code 1 (z.B. für CI).
+
+Beispiele:
+    python benchmark.py
+    python benchmark.py --resolutions 480p 720p --frames 200
+    python benchmark.py --save-baseline benchmark_basis.json
+    python benchmark.py --baseline benchmark_basis.json --threshold 0.2
+    python benchmark.py --recording aufnahme.htr --frames 300
+    python benchmark.py --check-allocations
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from advanced_hand_tracking import AdvancedHandTracker
+from frame_recorder import ReplayCapture, read_header
+from hand_tracking import HandTracker
+from profiling import StageProfiler
+
+# Auflösungen (16:9) nach Bildhöhe
+RESOLUTIONS = {
+    "320p": (568, 320),
+    "480p": (854, 480),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+}
+
+TRAJECTORIES = ("kreis", "linie", "zickzack")
+
+# Hautfarbe (BGR), liegt im Standard-HSV-Bereich beider Tracker (Farbton ~14)
+SKIN_BGR = (120, 150, 200)
+
+# Winkel (Grad, 0 = nach oben) und relative Länge der fünf Finger
+FINGERS = ((-70, 0.55), (-28, 0.8), (-5, 0.9), (18, 0.82), (40, 0.65))
+
+BASELINE_VERSION = 1
+
+
+def trajectory_point(kind, phase):
+    """
+    Position auf einer Bahn in normierten Koordinaten (0..1)
+
+    Args:
+        kind: "kreis", "linie" oder "zickzack"
+        phase: Fortschritt entlang der Bahn (0..1, periodisch)
+    """
+    if kind == "kreis":
+        angle = 2 * math.pi * phase
+        return 0.5 + 0.25 * math.cos(angle), 0.5 + 0.2 * math.sin(angle)
+    if kind == "linie":
+        # Hin und zurück, damit die Bewegung ohne Sprung periodisch ist
+        x = 2 * phase if phase < 0.5 else 2 - 2 * phase
+        return 0.25 + 0.5 * x, 0.5
+    if kind == "zickzack":
+        x = 2 * phase if phase < 0.5 else 2 - 2 * phase
+        y = abs((4 * phase) % 2 - 1)
+        return 0.25 + 0.5 * x, 0.35 + 0.3 * y
+    raise ValueError(f"Unbekannte Bahn: {kind}")
+
+
+def draw_synthetic_hand(frame, center, size, angle=0.0, color=SKIN_BGR):
+    """
+    Zeichnet eine handförmige Figur (Handfläche und fünf Finger)
+
+    Args:
+        frame: BGR-Bild (wird verändert)
+        center: Mittelpunkt der Handfläche (x, y)
+        size: Höhe der Handfläche in Pixeln
+        angle: Drehung der Hand in Grad
+        color: Hautfarbe (BGR)
+    """
+    cx, cy = center
+    palm_w, palm_h = int(size * 0.42), int(size * 0.5)
+    cv2.ellipse(frame, (int(cx), int(cy)), (palm_w, palm_h), angle, 0, 360, color, -1,
+                cv2.LINE_AA)
+
+    finger_width = max(3, int(size * 0.16))
+    for finger_angle, length in FINGERS:
+        theta = math.radians(angle + finger_angle)
+        direction = (math.sin(theta), -math.cos(theta))
+        base = (cx + direction[0] * palm_h * 0.6, cy + direction[1] * palm_h * 0.6)
+        tip = (base[0] + direction[0] * size * length, base[1] + direction[1] * size * length)
+        base = (int(base[0]), int(base[1]))
+        tip = (int(tip[0]), int(tip[1]))
+        cv2.line(frame, base, tip, color, finger_width, cv2.LINE_AA)
+        cv2.circle(frame, tip, finger_width // 2, color, -1, cv2.LINE_AA)
+
+
+def make_background(width, height):
+    """Bläulicher Farbverlauf mit zwei nicht hautfarbenen Störobjekten"""
+    ramp = np.linspace(60, 140, width, dtype=np.float32)
+    background = np.empty((height, width, 3), dtype=np.uint8)
+    background[:, :, 0] = (ramp + 40).astype(np.uint8)[None, :]
+    background[:, :, 1] = ramp.astype(np.uint8)[None, :] // 2 + 30
+    background[:, :, 2] = 50
+
+    cv2.rectangle(background, (width // 20, height // 10), (width // 6, height // 3),
+                  (90, 160, 60), -1)
+    cv2.circle(background, (width * 4 // 5, height * 4 // 5), height // 12,
+               (200, 80, 120), -1)
+    return background
+
+
+def synthetic_frames(width, height, count, trajectory, fps=30.0, seed=0):
+    """
+    Erzeugt Frames mit bewegter Hand und Kamerarauschen
+
+    Yields:
+        Tuple aus Frame, tatsächlichem Handmittelpunkt und Zeitstempel
+    """
+    rng = np.random.default_rng(seed)
+    background = make_background(width, height)
+    noise = np.empty((height, width, 3), dtype=np.int16)
+    size = 0.3 * height
+    period = max(count, 60)
+
+    for i in range(count):
+        phase = (i % period) / period
+        nx, ny = trajectory_point(trajectory, phase)
+        center = (int(nx * width), int(ny * height))
+        angle = 15 * math.sin(2 * math.pi * phase)
+
+        frame = background.copy()
+        draw_synthetic_hand(frame, center, size, angle)
+
+        noise[:] = rng.integers(-6, 7, size=noise.shape, dtype=np.int16)
+        frame = np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+        yield frame, center, i / fps
+
+
+def benchmark_simple(frames, profiler, warmup):
+    """Misst die Schritte von HandTracker; Rückgabe: Anzahl Frames mit erkannter Hand"""
+    tracker = HandTracker(camera_index=None)
+    clock = time.perf_counter_ns
+    detected = 0
+
+    for i, (frame, _, _) in enumerate(frames):
+        measure = i >= warmup
+
+        start = clock()
+        mask = tracker.detect_hand(frame)
+        t1 = clock()
+        hand_center, hand_contour = tracker.find_hand_center(mask)
+        t2 = clock()
+        if hand_center:
+            tracker.update_trail(hand_center)
+            cv2.drawContours(frame, [hand_contour], -1, (0, 255, 0), 2)
+        tracker.draw_trail(frame)
+        tracker.draw_info(frame)
+        end = clock()
+
+        if measure:
+            profiler.record("simple.detect_hand", t1 - start)
+            profiler.record("simple.find_hand_center", t2 - t1)
+            profiler.record("simple.draw", end - t2)
+            profiler.record("simple.pipeline", end - start)
+            detected += hand_center is not None
+
+    return detected
+
+
+def benchmark_advanced(frames, profiler, warmup):
+    """Misst die Schritte von AdvancedHandTracker; Rückgabe: Anzahl Frames mit erkannter Hand"""
+    tracker = AdvancedHandTracker(camera_index=None)
+    clock = time.perf_counter_ns
+    detected = 0
+
+    for i, (frame, _, timestamp) in enumerate(frames):
+        measure = i >= warmup
+
+        start = clock()
+        mask = tracker.detect_hand(frame)
+        t1 = clock()
+        hand_center, hand_contour, fingertips = tracker.find_hand_features(mask)
+        t2 = clock()
+        # Kalman-Filter, Spur, Gesten-Puffer und Gesten-Erkennung
+        tracker.update_tracking(hand_center, timestamp)
+        t3 = clock()
+        if hand_center:
+            cv2.drawContours(frame, [hand_contour], -1, (0, 255, 0), 2)
+            for fingertip in fingertips.tolist():
+                cv2.circle(frame, tuple(fingertip), 8, (0, 0, 255), -1)
+        tracker.draw_trail_advanced(frame)
+        tracker.draw_advanced_info(frame)
+        end = clock()
+
+        if measure:
+            profiler.record("advanced.detect_hand", t1 - start)
+            profiler.record("advanced.find_hand_features", t2 - t1)
+            profiler.record("advanced.update_tracking", t3 - t2)
+            profiler.record("advanced.draw", end - t3)
+            profiler.record("advanced.pipeline", end - start)
+            detected += hand_center is not None
+
+    return detected
+
+
+def run_benchmark(resolutions, frame_count=90, warmup=5, trajectories=TRAJECTORIES):
+    """
+    Führt den Benchmark für alle Auflösungen aus
+
+    Args:
+        resolutions: Namen aus RESOLUTIONS
+        frame_count: Gemessene Frames pro Bahn und Tracker
+        warmup: Nicht gemessene Frames am Anfang jeder Bahn
+        trajectories: Verwendete Bahnen
+
+    Returns:
+        Dictionary Auflösung → {'size', 'calls' (Aufruf → Kennzahlen in ms), 'fps', 'detected'}
+    """
+    results = {}
+    for name in resolutions:
+        width, height = RESOLUTIONS[name]
+        profiler = StageProfiler(enabled=True, window=frame_count * len(trajectories))
+        detected = {'simple': 0, 'advanced': 0}
+
+        for trajectory in trajectories:
+            total = frame_count + warmup
+            detected['simple'] += benchmark_simple(
+                synthetic_frames(width, height, total, trajectory), profiler, warmup)
+            detected['advanced'] += benchmark_advanced(
+                synthetic_frames(width, height, total, trajectory), profiler, warmup)
+
+        measured = frame_count * len(trajectories)
+        results[name] = _result(profiler, (width, height),
+                                {kind: count / measured for kind, count in detected.items()})
+    return results
+
+
+def recording_frames(path, count):
+    """Frames einer Aufnahme (ohne Dekodierung, bei Bedarf wiederholt) im Format von synthetic_frames"""
+    cap = ReplayCapture(path, realtime=False, loop=True)
+    try:
+        for _ in range(count):
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame, None, cap.last_timestamp
+    finally:
+        cap.release()
+
+
+def run_recording_benchmark(path, frame_count=90, warmup=5):
+    """
+    Führt den Benchmark mit den Frames einer Aufnahme von frame_recorder aus
+
+    Returns:
+        Dictionary Dateiname → Kennzahlen wie bei run_benchmark (ohne 'detected')
+    """
+    (height, width, _), _, _ = read_header(path)
+    profiler = StageProfiler(enabled=True, window=frame_count)
+    total = frame_count + warmup
+    benchmark_simple(recording_frames(path, total), profiler, warmup)
+    benchmark_advanced(recording_frames(path, total), profiler, warmup)
+    return {os.path.basename(path): _result(profiler, (width, height))}
+
+
+def _result(profiler, size, detected=None):
+    """Kennzahlen einer Auflösung aus dem Profiler"""
+    calls = profiler.summary()
+    result = {
+        'size': list(size),
+        'calls': calls,
+        'fps': {kind: 1000.0 / calls[f"{kind}.pipeline"]['mean']
+                for kind in ('simple', 'advanced')},
+    }
+    if detected is not None:
+        result['detected'] = detected
+    return result
+
+
+def print_results(results):
+    """Gibt Frames/s und Latenzen pro Auflösung als Tabelle aus"""
+    for name, result in results.items():
+        width, height = result['size']
+        fps = result['fps']
+        print(f"\n=== {name} ({width}x{height}) - einfach: {fps['simple']:.1f} Frames/s, "
+              f"erweitert: {fps['advanced']:.1f} Frames/s ===")
+        print(f"{'Aufruf':<30} {'Ø ms':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+        for call, stats in result['calls'].items():
+            print(f"{call:<30} {stats['mean']:>8.3f} {stats['p50']:>8.3f} "
+                  f"{stats['p95']:>8.3f} {stats['p99']:>8.3f}")
+
+        detected = result.get('detected', {})
+        missed = [kind for kind, ratio in detected.items() if ratio < 0.95]
+        for kind in missed:
+            print(f"Warnung: {kind} hat die Hand nur in "
+                  f"{detected[kind] * 100:.0f}% der Frames gefunden")
+
+
+def _detection_step(tracker):
+    """Erkennungspfad wie in der Hauptschleife (Rohbild, Ergebnisse in Anzeigekoordinaten)"""
+    def step(frame, timestamp):
+        if isinstance(tracker, AdvancedHandTracker):
+            tracker.track(frame, timestamp)
+        else:
+            _, hand_center, _ = tracker.locate_hand(frame)
+            hand_center = tracker.orientation.to_display(hand_center, frame.shape)
+            if hand_center:
+                tracker.update_trail(hand_center)
+    return step
+
+
+def check_allocations(resolutions, frame_count=60, warmup=20):
+    """
+    Misst mit tracemalloc, wie viel Speicher der Erkennungspfad pro Lauf zusätzlich belegt
+
+    Nach warmup Frames sollen alle Zwischenbilder in wiederverwendeten
+    Puffern liegen. Übrig bleiben nur kleine Objekte (Konturen, Tupel);
+    erreicht der Spitzenzuwachs die Größe einer Maske, wurde ein Bildpuffer
+    neu angelegt.
+
+    Returns:
+        True, wenn kein Tracker einen Bildpuffer allokiert hat
+    """
+    ok = True
+    print(f"{'Auflösung':<9} {'Tracker':<10} {'Spitze':>10} {'Bleibend':>10} {'Maske':>10}")
+    for name in resolutions:
+        width, height = RESOLUTIONS[name]
+        # Frames vorab erzeugen, damit ihre Erzeugung nicht mitgezählt wird
+        frames = list(synthetic_frames(width, height, frame_count + warmup, "kreis"))
+        mask_bytes = width * height
+
+        for kind, tracker in (("einfach", HandTracker(camera_index=None)),
+                              ("erweitert", AdvancedHandTracker(camera_index=None))):
+            step = _detection_step(tracker)
+            for frame, _, timestamp in frames[:warmup]:
+                step(frame, timestamp)
+
+            tracemalloc.start()
+            try:
+                start, _ = tracemalloc.get_traced_memory()
+                for frame, _, timestamp in frames[warmup:]:
+                    step(frame, timestamp)
+                current, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+            growth = peak - start
+            marker = "" if growth < mask_bytes else "  BILDPUFFER ALLOKIERT"
+            ok = ok and growth < mask_bytes
+            print(f"{name:<9} {kind:<10} {growth / 1024:>8.1f}KB {(current - start) / 1024:>8.1f}KB "
+                  f"{mask_bytes / 1024:>8.1f}KB{marker}")
+    return ok
+
+
+def environment_info():
+    """Versionen, die die Vergleichbarkeit mit einer Basis bestimmen"""
+    return {
+        'opencv': cv2.__version__,
+        'numpy': np.__version__,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'threads': cv2.getNumThreads(),
+    }
+
+
+def save_baseline(results, path, frame_count):
+    """Speichert die Ergebnisse als Basis für spätere Vergleiche"""
+    data = {
+        'version': BASELINE_VERSION,
+        'frames': frame_count,
+        'environment': environment_info(),
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    print(f"\nBasis gespeichert: {path}")
+
+
+def load_baseline(path):
+    """Lädt eine mit save_baseline gespeicherte Basis"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('version') != BASELINE_VERSION:
+        raise ValueError(f"{path}: unbekannte Basis-Version {data.get('version')}")
+    return data
+
+
+def compare_to_baseline(results, baseline, threshold=0.2, min_delta=0.05):
+    """
+    Vergleicht den Median jedes Aufrufs mit der Basis
+
+    Args:
+        results: Ergebnisse von run_benchmark
+        baseline: Daten von load_baseline
+        threshold: Erlaubte relative Verlangsamung (0.2 = 20%)
+        min_delta: Mindestdifferenz in ms, darunter gilt eine Änderung als Rauschen
+
+    Returns:
+        Liste von (Auflösung, Aufruf, Basis-p50, aktueller p50) der Regressionen
+    """
+    environment = environment_info()
+    for key, value in baseline['environment'].items():
+        if environment.get(key) != value:
+            print(f"Hinweis: {key} weicht von der Basis ab ({value} → {environment.get(key)})")
+
+    regressions = []
+    print(f"\n{'Auflösung':<9} {'Aufruf':<30} {'Basis':>8} {'Aktuell':>8} {'Änderung':>9}")
+    for name, result in results.items():
+        reference = baseline['results'].get(name)
+        if reference is None:
+            continue
+        for call, stats in result['calls'].items():
+            if call not in reference['calls']:
+                continue
+            before = reference['calls'][call]['p50']
+            after = stats['p50']
+            change = (after - before) / before if before > 0 else 0.0
+            regressed = change > threshold and after - before > min_delta
+            marker = "  REGRESSION" if regressed else ""
+            print(f"{name:<9} {call:<30} {before:>8.3f} {after:>8.3f} {change * 100:>+8.1f}%"
+                  f"{marker}")
+            if regressed:
+                regressions.append((name, call, before, after))
+
+    return regressions
+
+
+def main():
+    """Hauptfunktion"""
+    parser = argparse.ArgumentParser(description="Benchmark der Hand-Tracking-Pipelines "
+                                                 "mit synthetischen Frames")
+    parser.add_argument("--resolutions", nargs="+", choices=list(RESOLUTIONS),
+                        default=list(RESOLUTIONS), help="Zu messende Auflösungen")
+    parser.add_argument("--trajectories", nargs="+", choices=TRAJECTORIES,
+                        default=list(TRAJECTORIES), help="Bahnen der synthetischen Hand")
+    parser.add_argument("--frames", type=int, default=90,
+                        help="Gemessene Frames pro Bahn und Tracker")
+    parser.add_argument("--warmup", type=int, default=None,
+                        help="Nicht gemessene Frames am Anfang jeder Bahn "
+                             "(Standard: 5, mit --check-allocations 20)")
+    parser.add_argument("--recording", default=None, metavar="PFAD",
+                        help="Frames aus einer Aufnahme statt synthetischer Frames verwenden")
+    parser.add_argument("--check-allocations", action="store_true",
+                        help="Mit tracemalloc prüfen, dass der Erkennungspfad keine Bildpuffer allokiert")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="OpenCV-Threads (1 für stabilere Messungen)")
+    parser.add_argument("--save-baseline", default=None, metavar="PFAD",
+                        help="Ergebnisse als Basis-JSON speichern")
+    parser.add_argument("--baseline", default=None, metavar="PFAD",
+                        help="Mit gespeicherter Basis vergleichen")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Erlaubte Verlangsamung des Medians (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    if args.threads is not None:
+        cv2.setNumThreads(args.threads)
+
+    if args.check_allocations:
+        warmup = 20 if args.warmup is None else args.warmup
+        if not check_allocations(args.resolutions, args.frames, warmup):
+            sys.exit(1)
+        return
+    if args.warmup is None:
+        args.warmup = 5
+
+    if args.recording:
+        results = run_recording_benchmark(args.recording, args.frames, args.warmup)
+    else:
+        results = run_benchmark(args.resolutions, args.frames, args.warmup, args.trajectories)
+    print_results(results)
+
+    if args.save_baseline:
+        save_baseline(results, args.save_baseline, args.frames)
+
+    if args.baseline:
+        regressions = compare_to_baseline(results, load_baseline(args.baseline), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} Regression(en) über {args.threshold * 100:.0f}%")
+            sys.exit(1)
+        print("\nKeine Regressionen gegenüber der Basis.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Gedrosselte Anzeige
+cv2.imshow und cv2.waitKey kosten pro Aufruf einige Millisekunden und
+würden die Verarbeitung an die Zeichengeschwindigkeit der GUI koppeln.
+DisplayThrottle entscheidet pro Frame, ob gezeichnet und angezeigt wird:
+Die Erkennung läuft mit Kamerarate, Drehen, Zeichnen, imshow und die
+Tastaturabfrage nur mit der eingestellten Anzeigerate (Standard 30 fps).
+
+Die Anzeige bleibt bewusst im Hauptthread: HighGUI-Fenster dürfen je nach
+Backend (Cocoa, Qt) nur aus dem Thread bedient werden, der sie erstellt hat.
+"""
+
+import time
+
+
+class DisplayThrottle:
+    """Begrenzt Zeichnen und Anzeige auf eine feste Rate"""
+
+    def __init__(self, fps=30.0):
+        self.fps = fps          # Maximale Anzeigerate (0 = jeden Frame anzeigen)
+        self._next = 0.0        # Frühester Zeitpunkt der nächsten Anzeige
+
+        # Statistik
+        self.rendered = 0
+        self.skipped = 0
+
+    def due(self, now=None):
+        """
+        Entscheidet, ob der aktuelle Frame angezeigt wird
+
+        Ein Frame, der bis zu 1/4 Intervall vor dem geplanten Zeitpunkt
+        eintrifft, wird noch angezeigt, damit Kamera-Jitter bei gleicher
+        Kamera- und Anzeigerate nicht jeden zweiten Frame verwirft.
+
+        Args:
+            now: Zeitpunkt in Sekunden (Standard: time.monotonic())
+
+        Returns:
+            True, wenn gezeichnet und angezeigt werden soll
+        """
+        if not self.fps:
+            self.rendered += 1
+            return True
+
+        if now is None:
+            now = time.monotonic()
+        interval = 1.0 / self.fps
+        if now < self._next - 0.25 * interval:
+            self.skipped += 1
+            return False
+
+        self._next += interval
+        if self._next < now:
+            # Nach einer Pause (z.B. Fenster verschoben) nicht nachholen
+            self._next = now + interval
+        self.rendered += 1
+        return True
+
+    def reset(self):
+        """Nächster Frame wird sofort angezeigt"""
+        self._next = 0.0
+
+    def stats_text(self):
+        """Kurze Zusammenfassung für die Ausgabe beim Beenden"""
+        total = self.rendered + self.skipped
+        return f"Anzeige: {self.rendered}/{total} Frames dargestellt (max. {self.fps:g} fps)"
+
+
+def add_display_arguments(parser):
+    """Registriert die Option für die Anzeigerate an einem ArgumentParser"""
+    parser.add_argument("--display-fps", type=float, default=30.0, metavar="FPS",
+                        help="Maximale Anzeigerate; die Erkennung läuft mit Kamerarate "
+                             "(0 = jeden Frame anzeigen, Standard: 30)")
+
+
+def display_from_args(args):
+    """Erstellt einen DisplayThrottle aus der Option von add_display_arguments"""
+    return DisplayThrottle(args.display_fps)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Wiederverwendbare Zwischenpuffer für die Bildverarbeitung
+Die Segmentierung erzeugt pro Frame mehrere Zwischenbilder (gedrehter
+Frame, HSV, Maske, Morphologie, Blur). Statt sie bei jedem Frame neu
+anzulegen, werden sie einmal pro Auflösung allokiert und über die
+dst=-Argumente von OpenCV wiederverwendet.
+
+Ein Puffer wächst nur, wenn eine größere Form angefragt wird; kleinere
+Formen (z.B. ROI-Fenster) sind Sichten auf den Anfang des Puffers. Im
+eingeschwungenen Zustand wird daher nichts mehr allokiert.
+
+Ein Puffer gilt nur bis zur nächsten Anfrage unter demselben Namen;
+Ergebnisse, die länger gebraucht werden, gehören in einen eigenen Puffer.
+"""
+
+import numpy as np
+
+
+class FrameBuffers:
+    """Benannte, wachsende Puffer für Zwischenbilder"""
+
+    def __init__(self):
+        self._buffers = {}
+        self.allocations = 0    # Anzahl Neuallokationen (für Tests und Statistik)
+
+    def get(self, name, shape, dtype=np.uint8):
+        """
+        Puffer der gewünschten Form (Inhalt undefiniert)
+
+        Args:
+            name: Name des Puffers
+            shape: Gewünschte Form
+            dtype: Datentyp
+
+        Returns:
+            Array der Form shape; bei kleineren Formen eine Sicht auf den Puffer
+        """
+        shape = tuple(shape)
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.dtype != dtype or buffer.ndim != len(shape) or \
+                any(have < want for have, want in zip(buffer.shape, shape)):
+            if buffer is not None and buffer.dtype == dtype and buffer.ndim == len(shape):
+                # Auf die größte bisher angefragte Form wachsen
+                shape_alloc = tuple(max(have, want) for have, want in zip(buffer.shape, shape))
+            else:
+                shape_alloc = shape
+            buffer = np.empty(shape_alloc, dtype=dtype)
+            self._buffers[name] = buffer
+            self.allocations += 1
+
+        if buffer.shape == shape:
+            return buffer
+        return buffer[tuple(slice(0, size) for size in shape)]
+
+    def clear(self):
+        """Gibt alle Puffer frei"""
+        self._buffers.clear()
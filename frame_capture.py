@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Threaded Frame Capture
+Liest Kamera-Frames in einem eigenen Producer-Thread in einen kleinen,
+vorab allokierten Ringpuffer. Die Verarbeitungsschleife holt sich immer
+den neuesten Frame ("latest frame wins"); ältere, nie abgeholte Frames
+werden als verworfen gezählt. Dadurch bleibt die Latenz zwischen Aufnahme
+und Ergebnis bei einem Frame, auch wenn die Verarbeitung langsamer ist
+als die Kamera.
+"""
+
+import threading
+import time
+
+import cv2
+
+
+class ThreadedCapture:
+    """Wrapper um ein VideoCapture-Objekt mit Producer-Thread und Ringpuffer"""
+
+    def __init__(self, cap, buffer_size=3):
+        if buffer_size < 3:
+            # Ein Slot für den Consumer, einer für den neuesten Frame, einer zum Schreiben
+            raise ValueError("buffer_size muss mindestens 3 sein")
+
+        self.cap = cap
+        self.buffer_size = buffer_size
+
+        # Ringpuffer wird beim ersten Frame passend zur Auflösung allokiert
+        self.slots = None
+        self.timestamps = [0.0] * buffer_size
+
+        self._latest = -1      # Slot mit dem neuesten fertigen Frame
+        self._reading = -1     # Slot, den der Consumer gerade verarbeitet
+        self._write_seq = 0    # Anzahl geschriebener Frames
+        self._read_seq = 0     # Sequenznummer des zuletzt gelesenen Frames
+
+        # Statistik
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.last_timestamp = 0.0
+
+        self._cond = threading.Condition()
+        self._running = True
+        self._failed = False
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._thread.start()
+
+    def _next_write_slot(self):
+        """Wählt einen Slot, der weder gelesen wird noch den neuesten Frame hält"""
+        for offset in range(1, self.buffer_size + 1):
+            slot = (self._latest + offset) % self.buffer_size
+            if slot != self._latest and slot != self._reading:
+                return slot
+        return 0
+
+    def _capture_loop(self):
+        """Producer-Thread: liest Frames so schnell wie die Kamera liefert"""
+        while self._running:
+            with self._cond:
+                slot = self._next_write_slot()
+
+            if self.slots is None:
+                ret, frame = self.cap.read()
+                if ret:
+                    self.slots = [frame] + [frame.copy() for _ in range(self.buffer_size - 1)]
+                    slot = 0
+            else:
+                # Direkt in den vorab allokierten Slot dekodieren
+                ret, frame = self.cap.read(self.slots[slot])
+                if ret and frame is not self.slots[slot]:
+                    # Auflösung hat sich geändert: Slot ersetzen
+                    self.slots[slot] = frame
+
+            if not ret:
+                with self._cond:
+                    self._failed = True
+                    self._cond.notify_all()
+                break
+
+            with self._cond:
+                self.timestamps[slot] = time.time()
+                self._latest = slot
+                self._write_seq += 1
+                self.frames_captured += 1
+                self._cond.notify_all()
+
+    def read(self, timeout=2.0):
+        """
+        Liefert den neuesten Frame (blockiert bis ein neuer Frame vorliegt)
+
+        Der zurückgegebene Frame gehört dem Aufrufer bis zum nächsten read().
+
+        Returns:
+            Tuple aus Erfolg und Frame, wie cv2.VideoCapture.read()
+        """
+        with self._cond:
+            if not self._cond.wait_for(
+                    lambda: self._write_seq > self._read_seq or self._failed or not self._running,
+                    timeout):
+                return False, None
+
+            if self._write_seq <= self._read_seq:
+                return False, None
+
+            # Alle Frames zwischen dem letzten und dem neuesten wurden übersprungen
+            self.frames_dropped += self._write_seq - self._read_seq - 1
+            self._read_seq = self._write_seq
+            self._reading = self._latest
+            self.last_timestamp = self.timestamps[self._reading]
+            return True, self.slots[self._reading]
+
+    def isOpened(self):
+        """Prüft ob die zugrunde liegende Quelle geöffnet ist"""
+        return self.cap.isOpened()
+
+    def set(self, prop_id, value):
+        """Reicht Eigenschaften an die zugrunde liegende Quelle durch"""
+        return self.cap.set(prop_id, value)
+
+    def get(self, prop_id):
+        """Liest Eigenschaften der zugrunde liegenden Quelle"""
+        return self.cap.get(prop_id)
+
+    def release(self):
+        """Stoppt den Producer-Thread und gibt die Kamera frei"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout=1.0)
+        self.cap.release()
+        print(f"Capture beendet: {self.frames_captured} Frames aufgenommen, "
+              f"{self.frames_dropped} verworfen")
+
+
+def open_camera(index=0, width=640, height=480, threaded=True):
+    """Öffnet eine Kamera mit gewünschter Auflösung, optional mit Capture-Thread"""
+    cap = cv2.VideoCapture(index)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+    if threaded:
+        return ThreadedCapture(cap)
+    return cap
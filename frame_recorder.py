@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Aufzeichnung und Wiedergabe roher Kamera-Frames
+Zum Nachstellen von Problemen im Feld werden die Frames genau so
+gespeichert, wie die Kamera sie geliefert hat (BGR, unkomprimiert), samt
+Aufnahmezeitpunkt. Die Wiedergabe liefert dieselben Bytes wieder aus,
+ohne Dekodierung, sodass Benchmarks nur die Verarbeitung messen.
+
+Dateiformat (Little Endian):
+    Header (64 Byte): Magic, Version, Höhe, Breite, Kanäle, Kapazität, Anzahl
+    Zeitstempel:      float64[Kapazität] (Sekunden, time.time())
+    Frames:           uint8[Kapazität, Höhe, Breite, Kanäle], zusammenhängend
+
+Die Kapazität ist eine Obergrenze: Der Frame-Bereich wächst in Blöcken
+(Standard: 300 Frames), von denen immer nur der aktuelle per mmap
+eingeblendet ist, sodass nie mehr als ein Block ungenutzt auf der Platte
+liegt (NTFS legt keine Sparse-Dateien an). Beim Schließen werden die
+ungenutzten Frame-Slots am Ende abgeschnitten (der Zeitstempel-Block
+behält seine Größe).
+
+Beispiele:
+    python hand_tracking.py --record aufnahme.htr
+    python advanced_hand_tracking.py --source aufnahme.htr
+    python advanced_hand_tracking.py --source aufnahme.htr --fast-replay
+"""
+
+import struct
+import time
+
+import cv2
+import numpy as np
+
+from frame_capture import open_camera
+
+MAGIC = b"HTRAW\0\0\0"
+VERSION = 1
+HEADER_FORMAT = "<8sIIIIQQ"     # Magic, Version, Höhe, Breite, Kanäle, Kapazität, Anzahl
+HEADER_SIZE = 64
+COUNT_OFFSET = struct.calcsize("<8sIIIIQ")
+FRAME_ALIGNMENT = 4096          # Frames beginnen an einer Seitengrenze
+CHUNK_FRAMES = 300              # Wachstum der Datei in Frames (10 s bei 30 FPS)
+
+
+def _layout(shape, capacity):
+    """Offsets von Zeitstempeln und Frames sowie die Dateigröße"""
+    frame_bytes = int(np.prod(shape))
+    frames_offset = HEADER_SIZE + 8 * capacity
+    frames_offset += -frames_offset % FRAME_ALIGNMENT
+    return HEADER_SIZE, frames_offset, frames_offset + frame_bytes * capacity
+
+
+def recording_size(shape, capacity):
+    """Maximale Dateigröße einer Aufnahme in Byte"""
+    return _layout(shape, capacity)[2]
+
+
+def read_header(path):
+    """
+    Liest den Header einer Aufnahme
+
+    Returns:
+        Tuple aus Frame-Form (Höhe, Breite, Kanäle), Kapazität und Anzahl Frames
+    """
+    with open(path, 'rb') as f:
+        data = f.read(HEADER_SIZE)
+    if len(data) < HEADER_SIZE:
+        raise ValueError(f"{path}: Datei zu kurz für eine Aufnahme")
+
+    magic, version, height, width, channels, capacity, count = struct.unpack_from(
+        HEADER_FORMAT, data)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: keine Frame-Aufnahme")
+    if version != VERSION:
+        raise ValueError(f"{path}: nicht unterstützte Version {version}")
+    return (height, width, channels), capacity, count
+
+
+class FrameRecorder:
+    """Hängt Frames und Zeitstempel an eine blockweise wachsende, per mmap beschriebene Datei an"""
+
+    def __init__(self, path, shape, capacity=9000, chunk_frames=CHUNK_FRAMES):
+        """
+        Args:
+            path: Zieldatei (wird überschrieben)
+            shape: Frame-Form (Höhe, Breite, Kanäle)
+            capacity: Maximale Anzahl Frames (Standard: 5 Minuten bei 30 FPS)
+            chunk_frames: Frames, um die die Datei jeweils wächst
+        """
+        if len(shape) == 2:
+            shape = (shape[0], shape[1], 1)
+        self.path = path
+        self.shape = tuple(int(v) for v in shape)
+        self.capacity = capacity
+        self.chunk_frames = max(1, chunk_frames)
+        self.count = 0
+
+        ts_offset, frames_offset, _ = _layout(self.shape, capacity)
+        self._frame_bytes = int(np.prod(self.shape))
+        self._frames_offset = frames_offset
+        with open(path, 'wb') as f:
+            f.truncate(frames_offset)
+
+        # Header und Zeitstempel bleiben eingeblendet, Frames nur blockweise
+        self._mm = np.memmap(path, dtype=np.uint8, mode='r+', shape=(frames_offset,))
+        struct.pack_into(HEADER_FORMAT, self._mm, 0, MAGIC, VERSION, *self.shape,
+                         capacity, 0)
+        self.timestamps = self._mm[ts_offset:ts_offset + 8 * capacity].view(np.float64)
+        self._chunk = None          # Eingeblendeter Block (Frames, Höhe, Breite, Kanäle)
+        self._chunk_start = 0       # Index des ersten Frames im Block
+
+    def _map_chunk(self, start):
+        """Vergrößert die Datei um einen Block ab Frame start und blendet ihn ein"""
+        if self._chunk is not None:
+            self._chunk.flush()
+            self._chunk = None
+
+        frames = min(self.chunk_frames, self.capacity - start)
+        offset = self._frames_offset + start * self._frame_bytes
+        with open(self.path, 'r+b') as f:
+            f.truncate(offset + frames * self._frame_bytes)
+
+        self._chunk = np.memmap(self.path, dtype=np.uint8, mode='r+', offset=offset,
+                                shape=(frames,) + self.shape)
+        self._chunk_start = start
+
+    @property
+    def full(self):
+        return self.count >= self.capacity
+
+    def write(self, frame, timestamp=None):
+        """
+        Hängt einen Frame an
+
+        Returns:
+            False, wenn die Kapazität erschöpft ist
+        """
+        if self.full:
+            return False
+        if frame.shape != self.shape and frame.shape != self.shape[:2]:
+            raise ValueError(f"Frame-Form {frame.shape} passt nicht zur Aufnahme {self.shape}")
+
+        index = self.count - self._chunk_start
+        if self._chunk is None or index >= len(self._chunk):
+            self._map_chunk(self.count)
+            index = 0
+
+        np.copyto(self._chunk[index], frame.reshape(self.shape))
+        self.timestamps[self.count] = time.time() if timestamp is None else timestamp
+        self.count += 1
+        struct.pack_into("<Q", self._mm, COUNT_OFFSET, self.count)
+        return True
+
+    def close(self):
+        """Schreibt alles auf die Platte und schneidet die ungenutzten Frame-Slots ab"""
+        if self._mm is None:
+            return
+        if self._chunk is not None:
+            self._chunk.flush()
+            self._chunk = None
+        self._mm.flush()
+        del self.timestamps
+        self._mm = None
+
+        size = self._frames_offset + self.count * self._frame_bytes
+        with open(self.path, 'r+b') as f:
+            f.truncate(size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class RecordingCapture:
+    """Wrapper um eine Quelle, der jeden gelieferten Frame aufzeichnet"""
+
+    def __init__(self, cap, path, capacity=9000):
+        self.cap = cap
+        self.path = path
+        self.capacity = capacity
+        self.recorder = None    # wird beim ersten Frame passend zur Auflösung angelegt
+        self.last_timestamp = 0.0
+        self._full_reported = False
+
+    def read(self):
+        """Liest einen Frame der Quelle und zeichnet ihn auf"""
+        ret, frame = self.cap.read()
+        if not ret:
+            return ret, frame
+
+        # Aufnahmezeitpunkt der Quelle übernehmen, falls vorhanden (Capture-Thread)
+        self.last_timestamp = getattr(self.cap, 'last_timestamp', 0.0) or time.time()
+
+        if self.recorder is None:
+            size = recording_size(frame.shape if frame.ndim == 3 else frame.shape + (1,),
+                                  self.capacity)
+            print(f"Aufnahme gestartet: {self.path} (max. {self.capacity} Frames, "
+                  f"max. {size / 1024 ** 3:.1f} GB, wächst in Blöcken zu {CHUNK_FRAMES} Frames)")
+            self.recorder = FrameRecorder(self.path, frame.shape, self.capacity)
+        if not self.recorder.write(frame, self.last_timestamp) and not self._full_reported:
+            print(f"Aufnahme voll ({self.capacity} Frames), weitere Frames werden nicht gespeichert")
+            self._full_reported = True
+        return ret, frame
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def set(self, prop_id, value):
+        return self.cap.set(prop_id, value)
+
+    def get(self, prop_id):
+        return self.cap.get(prop_id)
+
+    def release(self):
+        """Beendet die Aufnahme und gibt die Quelle frei"""
+        if self.recorder is not None:
+            self.recorder.close()
+            print(f"Aufnahme gespeichert: {self.path} ({self.recorder.count} Frames)")
+        self.cap.release()
+
+
+class ReplayCapture:
+    """
+    Wiedergabe einer Aufnahme mit der Schnittstelle von cv2.VideoCapture
+
+    Frames werden ohne Kopie direkt aus der mmap geliefert. Die Abbildung
+    ist copy-on-write: Zeichnet der Aufrufer in einen Frame, bleibt die
+    Datei unverändert.
+    """
+
+    def __init__(self, path, realtime=True, speed=1.0, loop=False):
+        """
+        Args:
+            path: Aufnahme von FrameRecorder
+            realtime: Frames im ursprünglichen Takt liefern (sonst so schnell wie möglich)
+            speed: Wiedergabegeschwindigkeit im Echtzeitmodus
+            loop: Nach dem letzten Frame von vorne beginnen
+        """
+        self.path = path
+        self.shape, capacity, self.frame_count = read_header(path)
+        self.realtime = realtime
+        self.speed = speed
+        self.loop = loop
+
+        ts_offset, frames_offset, _ = _layout(self.shape, capacity)
+        count = self.frame_count
+        self._mm = np.memmap(path, dtype=np.uint8, mode='c')
+        self.timestamps = np.asarray(self._mm[ts_offset:ts_offset + 8 * count]).view(np.float64)
+        frames = np.asarray(self._mm[frames_offset:frames_offset + count * int(np.prod(self.shape))])
+        self.frames = frames.reshape((count,) + self.shape)
+        if self.shape[2] == 1:
+            self.frames = self.frames[..., 0]
+
+        self.position = 0
+        self.last_timestamp = 0.0
+        self._start_wall = None     # Wanduhrzeit, zu der position=_start_index gehört
+        self._start_index = 0
+
+    def read(self, image=None):
+        """
+        Liefert den nächsten Frame
+
+        Args:
+            image: Optionaler Zielpuffer; ohne Puffer wird eine Sicht auf die mmap geliefert
+
+        Returns:
+            Tuple aus Erfolg und Frame, wie cv2.VideoCapture.read()
+        """
+        if self.position >= self.frame_count:
+            if not self.loop or self.frame_count == 0:
+                return False, None
+            self.position = 0
+            self._start_wall = None
+
+        index = self.position
+        if self.realtime:
+            self._wait_for(index)
+
+        self.position += 1
+        self.last_timestamp = float(self.timestamps[index])
+        frame = self.frames[index]
+        if image is not None and image.shape == frame.shape:
+            np.copyto(image, frame)
+            return True, image
+        return True, frame
+
+    def _wait_for(self, index):
+        """Wartet, bis der Frame im ursprünglichen Takt an der Reihe ist"""
+        now = time.perf_counter()
+        if self._start_wall is None:
+            self._start_wall = now
+            self._start_index = index
+            return
+        due = self._start_wall + (self.timestamps[index] - self.timestamps[self._start_index]) \
+            / self.speed
+        if due > now:
+            time.sleep(due - now)
+
+    def isOpened(self):
+        return self._mm is not None
+
+    def get(self, prop_id):
+        """Unterstützt Frame-Anzahl, Position, FPS, Auflösung und Zeitstempel"""
+        if prop_id == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.frame_count)
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.position)
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.shape[1])
+        if prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.shape[0])
+        if prop_id == cv2.CAP_PROP_FPS:
+            if self.frame_count < 2:
+                return 0.0
+            duration = self.timestamps[-1] - self.timestamps[0]
+            return float((self.frame_count - 1) / duration) if duration > 0 else 0.0
+        if prop_id == cv2.CAP_PROP_POS_MSEC:
+            if self.position == 0:
+                return 0.0
+            return float(self.timestamps[self.position - 1] - self.timestamps[0]) * 1000.0
+        return 0.0
+
+    def set(self, prop_id, value):
+        """Springt mit CAP_PROP_POS_FRAMES an einen Frame; andere Eigenschaften sind fest"""
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            self.position = int(min(max(value, 0), self.frame_count))
+            self._start_wall = None
+            return True
+        return False
+
+    def release(self):
+        self.timestamps = None
+        self.frames = None
+        self._mm = None
+
+
+def parse_source(source):
+    """Kamera-Index (z.B. "0") als int, sonst Dateipfad (Aufnahme oder Video)"""
+    return int(source) if str(source).isdigit() else source
+
+
+def add_source_arguments(parser):
+    """Registriert die gemeinsamen Quellen- und Aufnahme-Optionen an einem ArgumentParser"""
+    parser.add_argument("--source", default="0",
+                        help="Kamera-Index oder Pfad zu einer Aufnahme (Standard: 0)")
+    parser.add_argument("--record", default=None, metavar="PFAD",
+                        help="Gelieferte Frames roh in diese Datei aufzeichnen")
+    parser.add_argument("--record-frames", type=int, default=9000, metavar="N",
+                        help="Maximale Anzahl aufgezeichneter Frames; die Datei wächst "
+                             "nur mit den tatsächlich aufgezeichneten Frames (Standard: 9000)")
+    parser.add_argument("--fast-replay", action="store_true",
+                        help="Aufnahme so schnell wie möglich statt im Originaltakt abspielen")
+
+
+def capture_from_args(args, width=640, height=480, threaded=True):
+    """
+    Öffnet die Quelle aus den Optionen von add_source_arguments
+
+    Kameras werden mit open_camera geöffnet, Aufnahmen mit ReplayCapture.
+    Mit --record wird die Quelle in eine RecordingCapture gehüllt.
+    """
+    source = parse_source(args.source)
+    if isinstance(source, int):
+        cap = open_camera(source, width, height, threaded)
+    else:
+        cap = ReplayCapture(source, realtime=not args.fast_replay)
+        print(f"Wiedergabe: {source} ({cap.frame_count} Frames, "
+              f"{cap.get(cv2.CAP_PROP_FPS):.1f} FPS)")
+
+    if args.record:
+        cap = RecordingCapture(cap, args.record, args.record_frames)
+    return cap
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Streaming Gesten-Klassifikator
+Klassifiziert die Bewegung der Hand über ein gleitendes Fenster, ohne die
+Punkte des Fensters bei jedem Frame erneut zu durchlaufen. Dazu werden
+laufende Summen (Σx, Σy, Σx², Σy², Σxy, Σz, Σxz, Σyz, Σz² mit z = x² + y²)
+gepflegt, die beim Eintreten und Verlassen eines Punktes in O(1)
+aktualisiert werden. Aus diesen Summen ergibt sich ein algebraischer
+Kreis-Fit nach der Methode der kleinsten Quadrate (Kåsa-Fit) samt Residuum.
+
+- Breite und Höhe sind die exakte Bounding Box des Fensters (max - min);
+  Minimum und Maximum jeder Achse liefern monotone Deques über dem Ring
+  in amortisiert O(1).
+- Der Kreis-Test verlangt neben einem kleinen Residuum, dass die Punkte
+  den Kreis rundum abdecken: Die ersten beiden trigonometrischen Momente
+  der Winkel um den Fit-Mittelpunkt (ebenfalls aus den Summen) müssen
+  klein sein. Damit gelten z.B. zwei Punktwolken, zwischen denen die Hand
+  springt, nicht als Kreis, obwohl jeder Kreis durch beide gut passt.
+
+Damit sind die Kosten pro Frame unabhängig von der Fenstergröße, und auch
+lange Fenster für langsame Gesten bleiben günstig.
+"""
+
+import math
+from collections import deque
+
+import numpy as np
+
+# Maximale Länge der Winkel-Momente für einen Kreis (0 = gleichmäßig rundum,
+# 1 = alle Punkte in einer Richtung bzw. auf einer Achse)
+MAX_ANGULAR_MOMENT = 0.5
+
+
+class StreamingGestureClassifier:
+    """Gleitendes Fenster mit exakter Bounding Box und Kreis-Fit in O(1)"""
+
+    def __init__(self, window=30):
+        if window < 3:
+            raise ValueError("window muss mindestens 3 sein")
+
+        self.window = window
+        self._points = np.zeros((window, 2), dtype=np.float64)
+        self.clear()
+
+    def clear(self):
+        """Leert das Fenster"""
+        self._head = 0
+        self._count = 0
+        self._index = 0         # Laufende Nummer des nächsten Punktes
+        # Monotone Deques (Nummer, Wert) für min/max von x und y
+        self._min_x, self._max_x = deque(), deque()
+        self._min_y, self._max_y = deque(), deque()
+        self._pushes_since_refresh = 0
+        self._origin = (0.0, 0.0)
+        self._reset_sums()
+
+    def __len__(self):
+        return self._count
+
+    def _reset_sums(self):
+        self.sx = self.sy = 0.0
+        self.sxx = self.syy = self.sxy = 0.0
+        self.sz = self.sxz = self.syz = self.szz = 0.0
+
+    def _accumulate(self, x, y, sign):
+        """Addiert (sign=1) oder entfernt (sign=-1) einen Punkt aus den Summen"""
+        x -= self._origin[0]
+        y -= self._origin[1]
+        z = x * x + y * y
+
+        self.sx += sign * x
+        self.sy += sign * y
+        self.sxx += sign * x * x
+        self.syy += sign * y * y
+        self.sxy += sign * x * y
+        self.sz += sign * z
+        self.sxz += sign * x * z
+        self.syz += sign * y * z
+        self.szz += sign * z * z
+
+    def _refresh(self):
+        """
+        Berechnet die Summen exakt neu, mit dem Fenstermittelpunkt als Ursprung
+
+        Passiert nur einmal pro Fensterlänge (amortisiert O(1)) und verhindert,
+        dass sich Rundungsfehler durch Addieren/Subtrahieren aufsummieren.
+        """
+        pts = self._points[:self._count] if self._count < self.window else self._points
+        self._origin = (float(pts[:, 0].mean()), float(pts[:, 1].mean()))
+        self._reset_sums()
+        for x, y in pts.tolist():
+            self._accumulate(x, y, 1)
+        self._pushes_since_refresh = 0
+
+    def push(self, x, y):
+        """Fügt einen Punkt hinzu; bei vollem Fenster fällt der älteste heraus"""
+        if self._count == self.window:
+            old_x, old_y = self._points[self._head]
+            self._accumulate(old_x, old_y, -1)
+        else:
+            self._count += 1
+
+        if self._count == 1:
+            # Erster Punkt definiert den Ursprung der Summen
+            self._origin = (float(x), float(y))
+
+        self._points[self._head] = (x, y)
+        self._accumulate(x, y, 1)
+
+        self._push_extreme(self._min_x, x, False)
+        self._push_extreme(self._max_x, x, True)
+        self._push_extreme(self._min_y, y, False)
+        self._push_extreme(self._max_y, y, True)
+        self._index += 1
+
+        self._head = (self._head + 1) % self.window
+        self._pushes_since_refresh += 1
+        if self._pushes_since_refresh >= self.window:
+            self._refresh()
+
+    def _push_extreme(self, extremes, value, maximum):
+        """
+        Trägt einen Wert in eine monotone Min- bzw. Max-Deque ein
+
+        Werte, die vom neuen Wert übertroffen werden, können nie mehr
+        Extremum werden und fallen hinten heraus; vorne fallen Punkte heraus,
+        die das Fenster verlassen haben. Jeder Punkt wird höchstens einmal
+        eingetragen und einmal entfernt.
+        """
+        if maximum:
+            while extremes and extremes[-1][1] <= value:
+                extremes.pop()
+        else:
+            while extremes and extremes[-1][1] >= value:
+                extremes.pop()
+        extremes.append((self._index, value))
+        while extremes[0][0] <= self._index - self.window:
+            extremes.popleft()
+
+    def extent(self):
+        """Exakte Breite und Höhe der Bewegung (Bounding Box des Fensters)"""
+        width = self._max_x[0][1] - self._min_x[0][1]
+        height = self._max_y[0][1] - self._min_y[0][1]
+        return float(width), float(height)
+
+    def fit_circle(self):
+        """
+        Algebraischer Kreis-Fit (Kåsa) aus den laufenden Summen
+
+        Minimiert Σ(z - A·x - B·y - C)² mit z = x² + y²; Mittelpunkt ist
+        (A/2, B/2), Radius² = C + (A/2)² + (B/2)².
+
+        Returns:
+            Tuple aus Mittelpunkt (x, y), Radius und mittlerer radialer
+            Abweichung, oder None wenn der Fit nicht lösbar ist
+        """
+        n = float(self._count)
+        normal = np.array([[self.sxx, self.sxy, self.sx],
+                           [self.sxy, self.syy, self.sy],
+                           [self.sx, self.sy, n]])
+        rhs = np.array([self.sxz, self.syz, self.sz])
+
+        try:
+            A, B, C = np.linalg.solve(normal, rhs)
+        except np.linalg.LinAlgError:
+            return None
+
+        a, b = float(A) / 2, float(B) / 2
+        radius_sq = C + a * a + b * b
+        if radius_sq <= 0:
+            return None
+        radius = math.sqrt(radius_sq)
+
+        # Residuum der kleinsten Quadrate: Σz² - pᵀ·rhs; pro Punkt gilt
+        # z - A·x - B·y - C = r² - R² ≈ 2R·(r - R)
+        residual = max(self.szz - (A * self.sxz + B * self.syz + C * self.sz), 0.0)
+        deviation = math.sqrt(residual / n) / (2 * radius)
+
+        center = (a + self._origin[0], b + self._origin[1])
+        return center, radius, deviation
+
+    def angular_moments(self, center, radius):
+        """
+        Länge des ersten und zweiten trigonometrischen Moments der Winkel
+        aller Punkte um einen Kreis (aus den laufenden Summen)
+
+        Mit (x - a, y - b) ≈ R·(cos θ, sin θ) gilt cos 2θ ≈ ((x-a)² - (y-b)²)/R²
+        und sin 2θ ≈ 2(x-a)(y-b)/R². Das erste Moment ist bei einem Bogen
+        groß, das zweite bei zwei gegenüberliegenden Punktwolken; bei einem
+        vollständigen Kreis sind beide nahe 0.
+
+        Returns:
+            Tuple (erstes Moment, zweites Moment), jeweils zwischen 0 und ~1
+        """
+        n = float(self._count)
+        a = center[0] - self._origin[0]
+        b = center[1] - self._origin[1]
+
+        # Zentrierte Summen um den Kreismittelpunkt
+        dx = self.sx - n * a
+        dy = self.sy - n * b
+        dxx = self.sxx - 2 * a * self.sx + n * a * a
+        dyy = self.syy - 2 * b * self.sy + n * b * b
+        dxy = self.sxy - a * self.sy - b * self.sx + n * a * b
+
+        first = math.hypot(dx, dy) / (n * radius)
+        second = math.hypot(dxx - dyy, 2 * dxy) / (n * radius * radius)
+        return first, second
+
+    def is_circle(self):
+        """Kreis-Test: kleines Residuum des Fits und Punkte rundum verteilt"""
+        fit = self.fit_circle()
+        if fit is None:
+            return False
+        center, radius, deviation = fit
+        if deviation >= radius * 0.3:
+            return False
+        first, second = self.angular_moments(center, radius)
+        return first < MAX_ANGULAR_MOMENT and second < MAX_ANGULAR_MOMENT
+
+    def classify(self):
+        """Klassifiziert die Bewegung im aktuellen Fenster"""
+        if self._count < self.window:
+            return "Sammle Daten..."
+
+        width, height = self.extent()
+
+        # Klassifiziere Geste basierend auf Form
+        if width < 50 and height < 50:
+            return "Punkt/Stopp"
+        elif width > height * 2:
+            return "Horizontale Linie"
+        elif height > width * 2:
+            return "Vertikale Linie"
+        elif abs(width - height) < 30:
+            # Prüfe auf Kreis
+            if self.is_circle():
+                return "Kreis"
+            else:
+                return "Unregelmäßig"
+
+        return "Unbekannt"
@@ -21,8 +21,11 @@ Steuerung:
 - 's' zum Umschalten der Sound-Ausgabe
 - 'g' zum Anzeigen erkannter Gesten
 - 'c' zum Konfigurieren der Gesten
+- 'a' zum Umschalten der adaptiven Inferenzrate
+- 'i' zum Umschalten des Profilings (Laufzeit pro Schritt im Bild)
 """
 
+import argparse
 import cv2
 import mediapipe as mp
 import numpy as np
@@ -31,12 +34,20 @@ import threading
 import time
 import json
 import os
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 
+from display import DisplayThrottle, add_display_arguments, display_from_args
+from frame_buffers import FrameBuffers
+from frame_capture import open_camera
+from frame_recorder import add_source_arguments, capture_from_args
+from inference_scheduler import AdaptiveInferenceScheduler
+from inference_worker import InferenceWorker
+from profiling import StageProfiler, add_profiling_arguments, profiler_from_args
+
 class GestureType(Enum):
     """Enum für verschiedene Gesten-Typen"""
     UNKNOWN = "unknown"
@@ -49,6 +60,57 @@ class GestureType(Enum):
     OPEN_HAND = "open_hand"
     POINTING = "pointing"
 
+# Gesten-Codes der Batch-Erkennung sind Indizes in diese Liste
+GESTURE_TYPES = list(GestureType)
+UNKNOWN_CODE = GESTURE_TYPES.index(GestureType.UNKNOWN)
+
+# Landmark-Indizes von Fingerspitzen und Fingergelenken
+# [Daumen, Zeigefinger, Mittelfinger, Ringfinger, kleiner Finger]
+FINGER_TIPS = np.array([4, 8, 12, 16, 20])
+FINGER_PIPS = np.array([3, 6, 10, 14, 18])
+FINGER_BITS = np.array([1, 2, 4, 8, 16])
+
+def _gesture_rule(thumb: bool, index: bool, middle: bool, ring: bool, pinky: bool,
+                  pinch: bool) -> GestureType:
+    """Gesten-Logik für einen Finger-Status (die erste zutreffende Geste gewinnt)"""
+    others_closed = not ring and not pinky
+    
+    # Victory-Zeichen (Zeige- und Mittelfinger gestreckt)
+    if index and middle and not thumb and others_closed:
+        return GestureType.PEACE
+    # Mittelfinger (nur Mittelfinger gestreckt)
+    if middle and not index and not thumb and others_closed:
+        return GestureType.MIDDLE_FINGER
+    # Daumen hoch
+    if thumb and not index and not middle and others_closed:
+        return GestureType.THUMBS_UP
+    # OK-Zeichen (Daumen und Zeigefinger berühren sich)
+    if pinch:
+        return GestureType.OK_SIGN
+    # Zeigen (nur Zeigefinger)
+    if index and not thumb and not middle and others_closed:
+        return GestureType.POINTING
+    # Faust (alle Finger geschlossen)
+    if not (thumb or index or middle or ring or pinky):
+        return GestureType.ROCK
+    # Offene Hand (alle Finger gestreckt)
+    if thumb and index and middle and ring and pinky:
+        return GestureType.OPEN_HAND
+    return GestureType.UNKNOWN
+
+def _build_gesture_table() -> np.ndarray:
+    """Gesten-Code für jede Kombination aus Berührung und Finger-Bits (2 × 32)"""
+    table = np.empty((2, 32), dtype=np.intp)
+    for pinch in (False, True):
+        for bits in range(32):
+            states = [bool(bits & bit) for bit in FINGER_BITS.tolist()]
+            table[int(pinch), bits] = GESTURE_TYPES.index(_gesture_rule(*states, pinch))
+    return table
+
+# Die Regeln hängen nur von 5 Finger-Bits und der Berührung ab; die Erkennung
+# aller Hände ist damit ein einziger Tabellenzugriff
+GESTURE_TABLE = _build_gesture_table()
+
 @dataclass
 class GestureConfig:
     """Konfiguration für eine Geste"""
@@ -71,9 +133,58 @@ class HandGestureDetector:
         )
         self.mp_draw = mp.solutions.drawing_utils
         
+        self.confidence = 0.9        # Basis-Confidence einer erkannten Geste
+        self.ok_distance = 0.05      # Schwellenwert für "Berührung" (normierte Koordinaten)
+    
+    def process(self, rgb_frame: np.ndarray):
+        """
+        MediaPipe-Inferenz samt Umwandlung der Landmarks (läuft im Inferenz-Worker)
+        
+        Returns:
+            Tuple aus MediaPipe-Ergebnis (für das Zeichnen) und Landmark-Array
+            der Form (Hände, 21, 3)
+        """
+        results = self.hands.process(rgb_frame)
+        return results, self.landmarks_to_array(results.multi_hand_landmarks)
+    
+    @staticmethod
+    def landmarks_to_array(multi_hand_landmarks) -> np.ndarray:
+        """
+        Wandelt MediaPipe-Landmarks einmalig in ein Array um
+        
+        Args:
+            multi_hand_landmarks: Liste der Hand-Landmarks eines Ergebnisses (oder None)
+            
+        Returns:
+            float32-Array der Form (Hände, 21, 3) mit normierten x, y, z
+        """
+        if not multi_hand_landmarks:
+            return np.empty((0, 21, 3), dtype=np.float32)
+        return np.array([[(point.x, point.y, point.z) for point in hand.landmark]
+                         for hand in multi_hand_landmarks], dtype=np.float32)
+    
+    def detect_gestures(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Erkennt die Gesten aller Hände in einem Schritt
+        
+        Args:
+            points: Landmarks der Form (Hände, 21, 3), siehe landmarks_to_array
+            
+        Returns:
+            Tuple aus Gesten-Codes (int, Index in GESTURE_TYPES) und
+            Confidence-Scores, je ein Eintrag pro Hand
+        """
+        # Finger-Status als Bitmuster, Berührung als Zeile der Gesten-Tabelle
+        bits = self._finger_states(points) @ FINGER_BITS
+        pinch = (self._pinch_distance(points) < self.ok_distance).astype(np.intp)
+        
+        codes = GESTURE_TABLE[pinch, bits]
+        confidences = np.where(codes != UNKNOWN_CODE, self.confidence, 0.0)
+        return codes, confidences
+    
     def detect_gesture(self, landmarks) -> Tuple[GestureType, float]:
         """
-        Erkennt Geste basierend auf Hand-Landmarks
+        Erkennt Geste basierend auf Hand-Landmarks einer Hand
         
         Args:
             landmarks: MediaPipe Hand-Landmarks
@@ -83,76 +194,29 @@ class HandGestureDetector:
         """
         if not landmarks:
             return GestureType.UNKNOWN, 0.0
-            
-        # Finger-Status ermitteln
-        finger_states = self._get_finger_states(landmarks)
-        
-        # Gesten-Logik
-        confidence = 0.9  # Basis-Confidence
         
-        # Victory-Zeichen (Zeige- und Mittelfinger gestreckt)
-        if (finger_states[1] and finger_states[2] and 
-            not finger_states[0] and not finger_states[3] and not finger_states[4]):
-            return GestureType.PEACE, confidence
-            
-        # Mittelfinger (nur Mittelfinger gestreckt)
-        if (finger_states[2] and not finger_states[1] and 
-            not finger_states[0] and not finger_states[3] and not finger_states[4]):
-            return GestureType.MIDDLE_FINGER, confidence
-            
-        # Daumen hoch
-        if (finger_states[0] and not finger_states[1] and 
-            not finger_states[2] and not finger_states[3] and not finger_states[4]):
-            return GestureType.THUMBS_UP, confidence
-            
-        # OK-Zeichen (Daumen und Zeigefinger berühren sich)
-        if self._is_ok_gesture(landmarks):
-            return GestureType.OK_SIGN, confidence
-            
-        # Zeigen (nur Zeigefinger)
-        if (finger_states[1] and not finger_states[0] and 
-            not finger_states[2] and not finger_states[3] and not finger_states[4]):
-            return GestureType.POINTING, confidence
-            
-        # Faust (alle Finger geschlossen)
-        if not any(finger_states):
-            return GestureType.ROCK, confidence
-            
-        # Offene Hand (alle Finger gestreckt)
-        if all(finger_states):
-            return GestureType.OPEN_HAND, confidence
-            
-        return GestureType.UNKNOWN, 0.0
+        codes, confidences = self.detect_gestures(self.landmarks_to_array([landmarks]))
+        return GESTURE_TYPES[codes[0]], float(confidences[0])
     
-    def _get_finger_states(self, landmarks) -> List[bool]:
+    def _finger_states(self, points: np.ndarray) -> np.ndarray:
         """
-        Bestimmt ob Finger gestreckt oder gebeugt sind
+        Bestimmt für alle Hände, ob die Finger gestreckt sind
         
         Returns:
-            Liste mit Status für [Daumen, Zeigefinger, Mittelfinger, Ringfinger, kleiner Finger]
+            bool-Array der Form (Hände, 5) für
+            [Daumen, Zeigefinger, Mittelfinger, Ringfinger, kleiner Finger]
         """
-        finger_tips = [4, 8, 12, 16, 20]  # Fingerspitzen-IDs
-        finger_pips = [3, 6, 10, 14, 18]  # Fingergelenk-IDs
+        delta = points[:, FINGER_TIPS, :2] - points[:, FINGER_PIPS, :2]
         
-        finger_states = []
-        
-        for i, (tip, pip) in enumerate(zip(finger_tips, finger_pips)):
-            if i == 0:  # Daumen (spezielle Behandlung)
-                finger_states.append(landmarks.landmark[tip].x > landmarks.landmark[pip].x)
-            else:  # Andere Finger
-                finger_states.append(landmarks.landmark[tip].y < landmarks.landmark[pip].y)
-                
-        return finger_states
+        # Finger: Spitze über dem Gelenk; Daumen (spezielle Behandlung): Spitze rechts davon
+        extended = delta[:, :, 1] < 0
+        extended[:, 0] = delta[:, 0, 0] > 0
+        return extended
     
-    def _is_ok_gesture(self, landmarks) -> bool:
-        """Prüft ob Daumen und Zeigefinger ein OK-Zeichen bilden"""
-        thumb_tip = landmarks.landmark[4]
-        index_tip = landmarks.landmark[8]
-        
-        # Berechne Distanz zwischen Daumen und Zeigefinger
-        distance = np.sqrt((thumb_tip.x - index_tip.x)**2 + (thumb_tip.y - index_tip.y)**2)
-        
-        return distance < 0.05  # Schwellenwert für "Berührung"
+    def _pinch_distance(self, points: np.ndarray) -> np.ndarray:
+        """Distanz zwischen Daumen- und Zeigefingerspitze (x, y) für alle Hände"""
+        delta = points[:, 4, :2] - points[:, 8, :2]
+        return np.hypot(delta[:, 0], delta[:, 1])
 
 class SoundManager:
     """Verwaltet Sound-Wiedergabe über virtuelles Mikrofon"""
@@ -228,7 +292,7 @@ class SoundManager:
 class GestureSoundBot:
     """Hauptklasse für den Gesten-Sound-Bot"""
     
-    def __init__(self):
+    def __init__(self, capture=None, inference_width: int = 640):
         self.detector = HandGestureDetector()
         self.sound_manager = SoundManager()
         self.gesture_configs = self._load_gesture_configs()
@@ -238,16 +302,35 @@ class GestureSoundBot:
         self.current_gesture = GestureType.UNKNOWN
         self.gesture_confidence = 0.0
         
-        # Kamera
-        self.cap = cv2.VideoCapture(0)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+        # Kamera mit Capture-Thread (oder eine andere Quelle, z.B. ReplayCapture)
+        if capture is None:
+            capture = open_camera(0, 1280, 720)
+        self.cap = capture
+        
+        # MediaPipe läuft in einem Worker-Thread auf dem jeweils neuesten
+        # Frame, verkleinert auf inference_width und gespiegelt wie die Anzeige;
+        # die Hauptschleife wartet nicht auf das Modell
+        self.worker = InferenceWorker(self.detector.process, inference_width, mirror=True)
+        self.frame_id = 0
+        self.last_result = None     # Neuestes Ergebnis (Landmarks für die Anzeige)
+        
+        # Bei stabiler Geste nur jeden 2./4./8. Frame inferieren, bei Bewegung
+        # im Bereich der Hand sofort wieder jeden Frame
+        self.adaptive_inference = True
+        self.scheduler = AdaptiveInferenceScheduler(mirror=True)
+        self.buffers = FrameBuffers()
         
         # Status
         self.running = False
         self.sound_enabled = True
         self.show_gui = True
         
+        # Laufzeitmessung pro Verarbeitungsschritt (standardmäßig aus)
+        self.profiler = StageProfiler(prefix="gesture_bot")
+        
+        # Zeichnen und Anzeige mit höchstens 30 fps, Erkennung mit Kamerarate
+        self.display = DisplayThrottle(30)
+        
     def _load_gesture_configs(self) -> Dict[GestureType, GestureConfig]:
         """Lädt Gesten-Konfigurationen"""
         config_file = "gesture_config.json"
@@ -332,42 +415,82 @@ class GestureSoundBot:
         print("Gesten-Sound-Bot gestartet!")
         print("Drücke 'q' zum Beenden, 's' zum Umschalten der Sounds")
         
+        profiler = self.profiler
+        cpu_start = time.process_time()
+        
         while self.running:
-            ret, frame = self.cap.read()
+            with profiler.stage("capture"):
+                ret, frame = self.cap.read()
             if not ret:
                 break
-                
-            # Frame spiegeln für natürlichere Ansicht
-            frame = cv2.flip(frame, 1)
-            height, width, _ = frame.shape
+            timestamp = getattr(self.cap, "last_timestamp", None) or time.time()
             
-            # RGB für MediaPipe
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.detector.hands.process(rgb_frame)
+            # Inferenz im Worker-Thread; hier wird nur auf dessen Auflösung verkleinert
+            self.frame_id += 1
+            if self.adaptive_inference:
+                with profiler.stage("scheduler"):
+                    infer = self.scheduler.should_infer(frame)
+            else:
+                infer = True
+            if infer:
+                with profiler.stage("submit"):
+                    self.worker.submit(frame, self.frame_id, timestamp)
             
-            # Hand-Landmarks zeichnen
-            if results.multi_hand_landmarks:
-                for hand_landmarks in results.multi_hand_landmarks:
-                    # Landmarks zeichnen
-                    self.detector.mp_draw.draw_landmarks(
-                        frame, hand_landmarks, self.detector.mp_hands.HAND_CONNECTIONS)
-                    
-                    # Geste erkennen
-                    gesture, confidence = self.detector.detect_gesture(hand_landmarks)
+            # Fertiges Ergebnis (meist eines früheren Frames) an Gesten und Sound weitergeben
+            result = self.worker.poll()
+            if result is not None:
+                self.last_result = result
+                _, points = result.output
+                if profiler.enabled:
+                    profiler.record("mediapipe", int(result.duration * 1e9))
+                    profiler.record("latency", int(result.latency * 1e9))
+                
+                # Gesten aller Hände in einem Schritt erkennen
+                with profiler.stage("gesture"):
+                    codes, confidences = self.detector.detect_gestures(points)
+                if self.adaptive_inference:
+                    # Referenz aus dem Bild des Ergebnisses, nicht aus dem neueren Frame
+                    self.scheduler.update(codes, points, result.image, result.duration)
+                
+                for code, confidence in zip(codes.tolist(), confidences.tolist()):
+                    gesture = GESTURE_TYPES[code]
                     self.current_gesture = gesture
                     self.gesture_confidence = confidence
                     
                     # Geste verarbeiten
                     self.process_gesture(gesture, confidence)
             
+            profiler.maybe_export()
+            
+            # Anzeige (samt Zeichnen und Tastatur) nur mit der eingestellten Rate
+            if not self.display.due():
+                continue
+            
+            # Frame spiegeln für natürlichere Ansicht (nur für die Anzeige)
+            with profiler.stage("flip"):
+                frame = cv2.flip(frame, 1, dst=self.buffers.get("display", frame.shape))
+            
+            # Hand-Landmarks des neuesten Ergebnisses zeichnen (normierte
+            # Koordinaten, daher unabhängig von der Inferenzauflösung)
+            hands = self.last_result.output[0].multi_hand_landmarks if self.last_result else None
+            for hand_landmarks in hands or []:
+                with profiler.stage("landmarks"):
+                    self.detector.mp_draw.draw_landmarks(
+                        frame, hand_landmarks, self.detector.mp_hands.HAND_CONNECTIONS)
+            
             # Status-Informationen einblenden
-            self._draw_status(frame)
+            with profiler.stage("drawing"):
+                self._draw_status(frame)
             
-            # Frame anzeigen
-            cv2.imshow('Gesten-Sound-Bot', frame)
+            # Laufzeiten pro Schritt (nur wenn Profiling aktiv)
+            profiler.draw(frame)
             
-            # Tastatur-Input
-            key = cv2.waitKey(1) & 0xFF
+            with profiler.stage("display"):
+                # Frame anzeigen
+                cv2.imshow('Gesten-Sound-Bot', frame)
+                
+                # Tastatur-Input
+                key = cv2.waitKey(1) & 0xFF
             if key == ord('q'):
                 self.running = False
             elif key == ord('s'):
@@ -377,7 +500,27 @@ class GestureSoundBot:
                 self._print_gesture_info()
             elif key == ord('c'):
                 self._open_config_gui()
+            elif key == ord('a'):
+                self.adaptive_inference = not self.adaptive_inference
+                self.scheduler.reset()
+                state = 'aktiviert' if self.adaptive_inference else 'deaktiviert'
+                print(f"Adaptive Inferenzrate {state}")
+            elif key == ord('i'):
+                self.profiler.enabled = not self.profiler.enabled
+                self.profiler.show_overlay = self.profiler.enabled
+                print(f"Profiling {'aktiviert' if self.profiler.enabled else 'deaktiviert'}")
         
+        if self.display.skipped:
+            print(self.display.stats_text())
+        print(self.worker.stats_text())
+        if self.scheduler.frames:
+            print(self.scheduler.stats_text())
+        if self.frame_id:
+            cpu = time.process_time() - cpu_start
+            print(f"CPU-Zeit: {cpu:.1f} s für {self.frame_id} Frames "
+                  f"({cpu / self.frame_id * 1000:.1f} ms pro Frame)")
+        self.profiler.print_summary()
+        self.profiler.export()
         self.cleanup()
     
     def _draw_status(self, frame):
@@ -386,7 +529,7 @@ class GestureSoundBot:
         
         # Hintergrund für Text
         overlay = frame.copy()
-        cv2.rectangle(overlay, (10, 10), (400, 120), (0, 0, 0), -1)
+        cv2.rectangle(overlay, (10, 10), (400, 145), (0, 0, 0), -1)
         cv2.addWeighted(overlay, 0.7, frame, 0.3, 0, frame)
         
         # Status-Text
@@ -404,8 +547,16 @@ class GestureSoundBot:
         cv2.putText(frame, f"Confidence: {self.gesture_confidence:.2f}", 
                    (20, y_offset), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
         
+        # Alter des angezeigten Ergebnisses (Frames seit dessen Aufnahme)
+        if self.last_result is not None:
+            y_offset += 25
+            lag = self.frame_id - self.last_result.frame_id
+            rate = f" | 1/{self.scheduler.interval}" if self.adaptive_inference else ""
+            cv2.putText(frame, f"Latenz: {self.last_result.latency * 1000:.0f} ms ({lag} Frames){rate}", 
+                       (20, y_offset), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+        
         y_offset += 25
-        cv2.putText(frame, "q=Quit, s=Sound, c=Config", 
+        cv2.putText(frame, "q=Quit, s=Sound, c=Config, a=Adaptiv, i=Profiling", 
                    (20, y_offset), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
     
     def _print_gesture_info(self):
@@ -426,6 +577,8 @@ class GestureSoundBot:
     
     def cleanup(self):
         """Bereinigung beim Beenden"""
+        if hasattr(self, 'worker'):
+            self.worker.close()
         if hasattr(self, 'cap'):
             self.cap.release()
         cv2.destroyAllWindows()
@@ -434,6 +587,17 @@ class GestureSoundBot:
 
 def main():
     """Hauptfunktion"""
+    parser = argparse.ArgumentParser(description="Gesten-Sound-Bot für Discord")
+    add_source_arguments(parser)
+    parser.add_argument("--inference-width", type=int, default=640, metavar="PIXEL",
+                        help="Breite des Bilds für MediaPipe (Höhe nach Seitenverhältnis, "
+                             "0 = Aufnahmeauflösung, Standard: 640)")
+    parser.add_argument("--no-adaptive-inference", action="store_true",
+                        help="MediaPipe auf jedem Frame ausführen, auch bei stabiler Geste")
+    add_display_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    
     # Erstelle Sounds-Ordner falls nicht vorhanden
     if not os.path.exists("sounds"):
         os.makedirs("sounds")
@@ -446,7 +610,10 @@ def main():
         print("- punch.wav (für Faust)")
     
     try:
-        bot = GestureSoundBot()
+        bot = GestureSoundBot(capture_from_args(args, 1280, 720), args.inference_width)
+        bot.profiler = profiler_from_args(args, prefix="gesture_bot")
+        bot.display = display_from_args(args)
+        bot.adaptive_inference = not args.no_adaptive_inference
         bot.run()
     except KeyboardInterrupt:
         print("\nProgramm durch Benutzer beendet.")
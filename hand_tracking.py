@@ -8,111 +8,343 @@ Steuerung:
 - 'q' zum Beenden
 - 's' zum Kalibrieren der Hautfarbe (klicke auf deine Hand)
 - 'r' zum Zurücksetzen der Kalibrierung
+- 't' zum Umschalten des ROI-Trackings (nur Fenster um die Hand segmentieren)
+- 'l' zum Umschalten der Haut-Lookup-Tabelle (statt cvtColor + inRange)
+- 'g' zum Umschalten des Motion Gates (statische Frames überspringen)
+- 'h' zum Umschalten des adaptiven Haut-Histogramms
+- 'f' zum Umschalten des schnellen Pfads (Zusammenhangskomponenten statt Konturen)
+- 'o' zum Ein-/Ausblenden der Handkontur
+- 'k' zum Ein-/Ausblenden des Hautmasken-Fensters
+- 'i' zum Umschalten des Profilings (Laufzeit pro Schritt im Bild)
 """
 
+import argparse
+
 import cv2
 import numpy as np
 import time
 
+from display import DisplayThrottle, add_display_arguments, display_from_args
+from frame_buffers import FrameBuffers
+from frame_capture import open_camera
+from frame_recorder import add_source_arguments, capture_from_args
+from motion_gate import MotionGate
+from multi_hand import extract_blobs
+from orientation import OrientationTransform, add_orientation_arguments, orientation_from_args
+from profiling import StageProfiler, add_profiling_arguments, profiler_from_args
+from roi_tracking import RegionOfInterest
+from skin_histogram import AdaptiveSkinModel
+from skin_lut import SkinLookupTable
+from trajectory_buffer import TrajectoryBuffer
+from rendering import StaticHud, draw_trail_batched
+
 class HandTracker:
-    def __init__(self):
-        self.cap = cv2.VideoCapture(0)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+    def __init__(self, camera_index=0):
+        # Kamera mit Capture-Thread (neuester Frame gewinnt), None = headless
+        self.cap = open_camera(camera_index, 640, 480) if camera_index is not None else None
         
         # Hautfarben-Bereich in HSV (Standardwerte für helle Haut)
         self.lower_skin = np.array([0, 20, 70], dtype=np.uint8)
         self.upper_skin = np.array([20, 255, 255], dtype=np.uint8)
         
         # Tracking-Variablen
-        self.hand_positions = []
         self.max_trail_length = 20
+        self.hand_positions = TrajectoryBuffer(self.max_trail_length)
         self.calibrated = False
         
-        # Mouse Callback für Hautkalibrierung
+        # Mouse Callback für Hautkalibrierung; der Klick wird erst mit dem
+        # nächsten Frame ausgewertet (nur dann wird ein Pixel nach HSV konvertiert)
         self.calibrating = False
+        self.pending_click = None
+        
+        # Zwischenpuffer (HSV, Masken, Anzeigebild) einmal pro Auflösung
+        self.buffers = FrameBuffers()
+        self.kernel = np.ones((3,3), np.uint8)
+        
+        # Segmentiert wird das ungedrehte Kamerabild; nur Ergebnisse und die
+        # Anzeige werden um 180° gedreht (Spur und Klicks in Anzeigekoordinaten)
+        self.orientation = OrientationTransform(180)
+        
+        # Region-of-Interest Tracking (nach Erfassung nur Fenster um die Hand)
+        self.roi_tracking = False
+        self.roi = RegionOfInterest()
+        self.roi_window = None
+        
+        # Vorberechnete BGR→Haut Tabelle (wird bei Kalibrierung neu aufgebaut)
+        self.use_skin_lut = False
+        self.skin_lut = SkinLookupTable()
+        
+        # Adaptives H-S Histogramm, nachgeführt aus der Handkontur
+        # (bis zur ersten Kontur wird der feste HSV-Bereich verwendet)
+        self.use_skin_histogram = False
+        self.skin_model = AdaptiveSkinModel()
+        
+        # Schneller Pfad: Fläche, Bounding Box und Schwerpunkt aller Regionen
+        # in einem Durchlauf; Kontur nur im Fenster der gewählten Region und
+        # nur wenn sie gezeichnet oder für das Haut-Histogramm gebraucht wird
+        self.fast_path = False
+        self.draw_contour = True
+        self.hand_bbox = None
+        self.hand_area = 0.0
+        
+        # Motion Gate: unveränderte Frames überspringen, geänderte Kacheln neu segmentieren
+        self.motion_gating = False
+        self.motion_gate = MotionGate()
+        self._gate_mask = None          # Vollbild-Maske des letzten Frames
+        self._last_located = None       # Letztes Ergebnis von locate_hand
+        
+        # Laufzeitmessung pro Verarbeitungsschritt (standardmäßig aus)
+        self.profiler = StageProfiler()
+        
+        # Zeichnen und Anzeige mit höchstens 30 fps, Erkennung mit Kamerarate;
+        # das Fenster mit der Hautmaske nur auf Wunsch
+        self.display = DisplayThrottle(30)
+        self.show_mask = False
+        
+        # Statische HUD-Elemente werden einmal vorgerendert
+        self.hud = self._build_hud()
         
     def mouse_callback(self, event, x, y, flags, param):
         """Callback-Funktion für Mausklicks zur Hautkalibrierung"""
         if event == cv2.EVENT_LBUTTONDOWN and self.calibrating:
-            hsv = cv2.cvtColor(self.current_frame, cv2.COLOR_BGR2HSV)
-            pixel_hsv = hsv[y, x]
-            
-            # Erweitere den Bereich um den geklickten Pixel
-            h, s, v = pixel_hsv
-            self.lower_skin = np.array([max(0, h-10), 50, 50], dtype=np.uint8)
-            self.upper_skin = np.array([min(179, h+10), 255, 255], dtype=np.uint8)
-            
-            print(f"Neue Hautfarbe kalibriert: HSV({h}, {s}, {v})")
-            print(f"Bereich: {self.lower_skin} bis {self.upper_skin}")
-            self.calibrated = True
-            self.calibrating = False
+            # Auswertung im nächsten Frame, bevor darauf gezeichnet wird
+            self.pending_click = (x, y)
+    
+    def calibrate_at(self, frame, x, y):
+        """Kalibriert die Hautfarbe am Pixel (x, y) des Kamerabilds (Rohkoordinaten)"""
+        # Nur den geklickten Pixel nach HSV konvertieren
+        h, s, v = (int(c) for c in cv2.cvtColor(frame[y:y+1, x:x+1], cv2.COLOR_BGR2HSV)[0, 0])
+        
+        # Erweitere den Bereich um den geklickten Pixel
+        self.lower_skin = np.array([max(0, h-10), 50, 50], dtype=np.uint8)
+        self.upper_skin = np.array([min(179, h+10), 255, 255], dtype=np.uint8)
+        
+        print(f"Neue Hautfarbe kalibriert: HSV({h}, {s}, {v})")
+        print(f"Bereich: {self.lower_skin} bis {self.upper_skin}")
+        if self.use_skin_lut:
+            self.skin_lut.update(self.lower_skin, self.upper_skin)
+        self.motion_gate.reset()
+        self.skin_model.reset()
+        self.calibrated = True
+        self.calibrating = False
     
-    def detect_hand(self, frame):
-        """Erkennt die Hand basierend auf Hautfarbe"""
-        # Konvertiere zu HSV für bessere Farbsegmentierung
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    def detect_hand(self, frame, dst=None):
+        """
+        Erkennt die Hand basierend auf Hautfarbe
         
-        # Erstelle Maske für Hautfarbe
-        mask = cv2.inRange(hsv, self.lower_skin, self.upper_skin)
+        Alle Zwischenbilder liegen in wiederverwendeten Puffern; die Schritte
+        wechseln zwischen Zielmaske und Hilfspuffer, sodass das Ergebnis ohne
+        Kopie in der Zielmaske landet.
+        
+        Args:
+            frame: BGR-Bild (oder Ausschnitt)
+            dst: Zielmaske; ohne Angabe ein Hilfspuffer, der nur bis zum
+                 nächsten Aufruf gültig ist
+        """
+        profiler = self.profiler
+        kernel = self.kernel
+        shape = frame.shape[:2]
+        mask = self.buffers.get("segment", shape) if dst is None else dst
+        tmp = self.buffers.get("morph", shape)
+        
+        if self.use_skin_histogram and self.skin_model.ready:
+            # Back-Projection des adaptiven Modells, bereits vor dem Schwellwert geglättet
+            with profiler.stage("cvtColor"):
+                hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV,
+                                   dst=self.buffers.get("hsv", frame.shape))
+            with profiler.stage("backproject"):
+                mask = self.skin_model.segment(hsv, dst=mask)
+            with profiler.stage("morphology"):
+                tmp = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, dst=tmp)
+                return cv2.morphologyEx(tmp, cv2.MORPH_CLOSE, kernel, dst=mask)
+        
+        if self.use_skin_lut:
+            # Ein Tabellenzugriff pro Pixel statt HSV-Konvertierung
+            with profiler.stage("lut"):
+                self.skin_lut.update(self.lower_skin, self.upper_skin)
+                tmp = self.skin_lut.apply(frame, dst=tmp)
+        else:
+            # Konvertiere zu HSV für bessere Farbsegmentierung
+            with profiler.stage("cvtColor"):
+                hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV,
+                                   dst=self.buffers.get("hsv", frame.shape))
+            
+            # Erstelle Maske für Hautfarbe
+            with profiler.stage("inRange"):
+                tmp = cv2.inRange(hsv, self.lower_skin, self.upper_skin, dst=tmp)
         
         # Anwenden von morphologischen Operationen zum Entfernen von Rauschen
-        kernel = np.ones((3,3), np.uint8)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+        with profiler.stage("morphology"):
+            mask = cv2.morphologyEx(tmp, cv2.MORPH_CLOSE, kernel, dst=mask)
+            tmp = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, dst=tmp)
         
         # Gaussian Blur zum Glätten
-        mask = cv2.GaussianBlur(mask, (5, 5), 0)
+        with profiler.stage("blur"):
+            mask = cv2.GaussianBlur(tmp, (5, 5), 0, dst=mask)
         
         return mask
     
-    def find_hand_center(self, mask):
+    def find_hand_center(self, mask, offset=(0, 0)):
         """Findet den Mittelpunkt der größten hautfarbenen Region"""
-        # Finde Konturen
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        # Finde Konturen (offset verschiebt ROI-Konturen in Bildkoordinaten)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE,
+                                       offset=offset)
         
-        if contours:
-            # Finde die größte Kontur (wahrscheinlich die Hand)
-            largest_contour = max(contours, key=cv2.contourArea)
-            
-            # Berechne den Schwerpunkt nur wenn die Kontur groß genug ist
-            if cv2.contourArea(largest_contour) > 1000:
-                M = cv2.moments(largest_contour)
-                if M["m00"] != 0:
-                    cx = int(M["m10"] / M["m00"])
-                    cy = int(M["m01"] / M["m00"])
-                    return (cx, cy), largest_contour
+        # Größte Kontur (wahrscheinlich die Hand), nur wenn sie groß genug ist;
+        # die Fläche wird dabei pro Kontur nur einmal berechnet
+        blobs = extract_blobs(contours, 1, min_area=1000)
+        if blobs:
+            center, largest_contour, _ = blobs[0]
+            return center, largest_contour
         
         return None, None
     
+    def find_hand_component(self, mask, offset=(0, 0), need_contour=True):
+        """
+        Findet die größte Region über cv2.connectedComponentsWithStats
+        
+        Die Kontur wird nur bei Bedarf und nur im Bereich der gewählten
+        Komponente extrahiert.
+        
+        Returns:
+            Tuple aus Mittelpunkt, Kontur (oder None), Bounding Box (x, y, w, h)
+            und Fläche in Pixeln
+        """
+        # Block-basierte Markierung (Grana) ist hier deutlich schneller als der Standard
+        count, labels, stats, centroids = cv2.connectedComponentsWithStatsWithAlgorithm(
+            mask, 8, cv2.CV_32S, cv2.CCL_GRANA)
+        if count < 2:
+            return None, None, None, 0.0
+        
+        # Label 0 ist der Hintergrund
+        best = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))
+        area = float(stats[best, cv2.CC_STAT_AREA])
+        if area <= 1000:
+            return None, None, None, 0.0
+        
+        ox, oy = offset
+        x, y, w, h = (int(v) for v in stats[best, :4])
+        cx, cy = centroids[best]
+        center = (int(cx) + ox, int(cy) + oy)
+        bbox = (x + ox, y + oy, w, h)
+        
+        contour = None
+        if need_contour:
+            component = (labels[y:y+h, x:x+w] == best).view(np.uint8)
+            contours, _ = cv2.findContours(component, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE,
+                                           offset=(x + ox, y + oy))
+            if contours:
+                contour = max(contours, key=len)
+        
+        return center, contour, bbox, area
+    
+    def _find_hand(self, mask, offset=(0, 0)):
+        """Mittelpunkt, Kontur, Bounding Box und Fläche über den gewählten Pfad"""
+        if self.fast_path:
+            need_contour = self.draw_contour or self.use_skin_histogram
+            with self.profiler.stage("components"):
+                return self.find_hand_component(mask, offset, need_contour)
+        
+        with self.profiler.stage("findContours"):
+            hand_center, hand_contour = self.find_hand_center(mask, offset)
+        if hand_contour is None:
+            return None, None, None, 0.0
+        return hand_center, hand_contour, cv2.boundingRect(hand_contour), cv2.contourArea(hand_contour)
+    
+    def locate_hand(self, frame):
+        """
+        Segmentiert den Frame und findet die Hand
+        
+        Im ROI-Modus wird nur das Fenster um die letzte Handposition
+        segmentiert; die Maske hat dann die Größe des Fensters.
+        
+        Mit Motion Gate wird bei unverändertem Bild das letzte Ergebnis
+        wiederverwendet und bei teilweiser Änderung nur die geänderten
+        Kacheln in der letzten Vollbild-Maske neu segmentiert.
+        
+        Die Maske liegt in einem wiederverwendeten Puffer und gilt bis zum
+        nächsten Frame.
+        
+        Returns:
+            Tuple aus Maske, Handmittelpunkt und Handkontur
+        """
+        changed = self.motion_gate.update(frame) if self.motion_gating else None
+        if changed is not None and self._last_located is not None and not changed.any():
+            return self._last_located
+        
+        window = self.roi.window(frame.shape) if self.roi_tracking else None
+        
+        if window is None and changed is not None and self._gate_mask is not None:
+            mask = self._gate_mask
+            self.motion_gate.resegment(mask, frame, changed, self.detect_hand)
+            hand_center, hand_contour, bbox, area = self._find_hand(mask)
+        elif window is None:
+            mask = self.detect_hand(frame, dst=self.buffers.get("mask", frame.shape[:2]))
+            hand_center, hand_contour, bbox, area = self._find_hand(mask)
+        else:
+            x0, y0, x1, y1 = window
+            mask = self.detect_hand(frame[y0:y1, x0:x1],
+                                    dst=self.buffers.get("mask", (y1 - y0, x1 - x0)))
+            hand_center, hand_contour, bbox, area = self._find_hand(mask, offset=(x0, y0))
+        
+        self.hand_bbox = bbox
+        self.hand_area = area
+        if self.roi_tracking:
+            self.roi.update(hand_center, bbox)
+        
+        if self.use_skin_histogram and hand_contour is not None:
+            # Hautmodell mit den Pixeln der bestätigten Hand nachführen
+            self.skin_model.update_from_contour(frame, hand_contour)
+        
+        self.roi_window = window
+        if self.motion_gating:
+            # Nur Vollbild-Masken eignen sich für die teilweise Aktualisierung
+            self._gate_mask = mask if window is None else None
+            self._last_located = (mask, hand_center, hand_contour)
+        return mask, hand_center, hand_contour
+    
+    def update_trail(self, hand_center):
+        """Fügt eine Position zur Spur hinzu und begrenzt deren Länge"""
+        self.hand_positions.append(hand_center[0], hand_center[1], time.time())
+    
     def draw_trail(self, frame):
-        """Zeichnet die Bewegungsspur der Hand"""
-        for i in range(1, len(self.hand_positions)):
-            # Farbverlauf von rot zu grün basierend auf der Zeitlinie
-            alpha = i / len(self.hand_positions)
-            color = (int(255 * (1-alpha)), int(255 * alpha), 0)
-            thickness = max(1, int(5 * alpha))
-            
-            cv2.line(frame, self.hand_positions[i-1], self.hand_positions[i], color, thickness)
+        """Zeichnet die Bewegungsspur der Hand (Farbverlauf nach Zeitlinie, gebündelt)"""
+        draw_trail_batched(frame, self.hand_positions.points(), 5)
     
-    def draw_info(self, frame):
-        """Zeichnet Informationen auf das Bild"""
-        # Status-Informationen
-        status = "Kalibriert" if self.calibrated else "Nicht kalibriert"
-        cv2.putText(frame, f"Status: {status}", (10, 30), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0) if self.calibrated else (0, 0, 255), 2)
+    def _build_hud(self):
+        """Registriert die statischen Anweisungen im HUD-Overlay"""
+        hud = StaticHud()
         
-        # Anweisungen
+        # Anweisungen (y relativ zum unteren Bildrand)
         instructions = [
             "Steuerung:",
             "'s' - Hautfarbe kalibrieren",
             "'r' - Zuruecksetzen", 
+            "'t' - ROI-Tracking", 
+            "'l' - Haut-Tabelle", 
+            "'g' - Motion Gate", 
+            "'h' - Haut-Histogramm", 
+            "'f' - Schneller Pfad", 
+            "'o' - Kontur anzeigen", 
+            "'k' - Hautmaske", 
+            "'i' - Profiling", 
             "'q' - Beenden"
         ]
         
         for i, instruction in enumerate(instructions):
-            cv2.putText(frame, instruction, (10, frame.shape[0] - 80 + i*20), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+            hud.add_text(instruction, (10, -240 + i*20), 0.5, (255, 255, 255), 1)
+        
+        return hud
+    
+    def draw_info(self, frame):
+        """Zeichnet Informationen auf das Bild"""
+        # Statische Anweisungen in einem Schritt einblenden
+        self.hud.composite(frame)
+        
+        # Status-Informationen
+        status = "Kalibriert" if self.calibrated else "Nicht kalibriert"
+        cv2.putText(frame, f"Status: {status}", (10, 30), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0) if self.calibrated else (0, 0, 255), 2)
         
         # Anzahl der getrackteten Positionen
         if self.hand_positions:
@@ -129,55 +361,87 @@ class HandTracker:
         cv2.namedWindow('Hand Tracking')
         cv2.setMouseCallback('Hand Tracking', self.mouse_callback)
         
+        profiler = self.profiler
+        
         while True:
-            ret, frame = self.cap.read()
+            with profiler.stage("capture"):
+                ret, frame = self.cap.read()
             if not ret:
                 print("Fehler beim Lesen der Webcam!")
                 break
             
-            # Drehe das Bild um 180° für natürlichere Bewegung
-            frame = cv2.rotate(frame, cv2.ROTATE_180)
-            self.current_frame = frame.copy()
+            orientation = self.orientation
+            shape = frame.shape
+            
+            # Kalibrierungsklick (Anzeigekoordinaten) im Kamerabild auswerten
+            if self.pending_click is not None:
+                self.calibrate_at(frame, *orientation.to_raw(self.pending_click, shape))
+                self.pending_click = None
             
-            # Hand-Erkennung
-            mask = self.detect_hand(frame)
-            hand_center, hand_contour = self.find_hand_center(mask)
+            # Hand-Erkennung im ungedrehten Kamerabild
+            mask, hand_center, hand_contour = self.locate_hand(frame)
             
+            # Nur die Ergebnisse in Anzeigekoordinaten umrechnen
+            hand_center = orientation.to_display(hand_center, shape)
             if hand_center:
                 # Füge Position zur Spur hinzu
-                self.hand_positions.append(hand_center)
-                
-                # Begrenze die Länge der Spur
-                if len(self.hand_positions) > self.max_trail_length:
-                    self.hand_positions.pop(0)
-                
-                # Zeichne Hand-Kontur
-                if hand_contour is not None:
-                    cv2.drawContours(frame, [hand_contour], -1, (0, 255, 0), 2)
-                
-                # Zeichne Handzentrum
-                cv2.circle(frame, hand_center, 10, (255, 0, 0), -1)
-                cv2.circle(frame, hand_center, 15, (255, 255, 255), 2)
+                self.update_trail(hand_center)
             
-            # Zeichne Bewegungsspur
-            self.draw_trail(frame)
+            profiler.maybe_export()
             
-            # Zeichne Informationen
-            self.draw_info(frame)
+            # Anzeige (samt Zeichnen und Tastatur) nur mit der eingestellten Rate
+            if not self.display.due():
+                continue
             
-            # Zeige Kalibrierungs-Status
-            if self.calibrating:
-                cv2.putText(frame, "Klicke auf deine Hand!", (frame.shape[1]//2 - 100, frame.shape[0]//2), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
+            # Für 180° natürlichere Bewegung: Pixel nur für die Anzeige drehen
+            with profiler.stage("rotate"):
+                frame = orientation.render(frame, dst=self.buffers.get(
+                    "display", orientation.display_shape(shape)))
             
-            # Zeige das Ergebnis
-            cv2.imshow('Hand Tracking', frame)
+            with profiler.stage("drawing"):
+                # Suchfenster im ROI-Modus anzeigen
+                if self.roi_window is not None:
+                    x0, y0, x1, y1 = orientation.rect_to_display(self.roi_window, shape)
+                    cv2.rectangle(frame, (x0, y0), (x1, y1), (0, 255, 255), 1)
+                
+                if hand_center:
+                    # Zeichne Hand-Kontur (bzw. nur die Bounding Box)
+                    if self.draw_contour and hand_contour is not None:
+                        cv2.drawContours(frame, [orientation.points_to_display(hand_contour, shape)],
+                                         -1, (0, 255, 0), 2)
+                    elif self.hand_bbox is not None:
+                        x, y, w, h = orientation.bbox_to_display(self.hand_bbox, shape)
+                        cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+                    
+                    # Zeichne Handzentrum
+                    cv2.circle(frame, hand_center, 10, (255, 0, 0), -1)
+                    cv2.circle(frame, hand_center, 15, (255, 255, 255), 2)
+                
+                # Zeichne Bewegungsspur
+                self.draw_trail(frame)
+                
+                # Zeichne Informationen
+                self.draw_info(frame)
+                
+                # Zeige Kalibrierungs-Status
+                if self.calibrating:
+                    cv2.putText(frame, "Klicke auf deine Hand!", (frame.shape[1]//2 - 100, frame.shape[0]//2), 
+                               cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
             
-            # Zeige auch die Maske (optional)
-            cv2.imshow('Hautmaske', mask)
+            # Laufzeiten pro Schritt (nur wenn Profiling aktiv)
+            profiler.draw(frame)
             
-            # Tastatur-Input
-            key = cv2.waitKey(1) & 0xFF
+            with profiler.stage("display"):
+                # Zeige das Ergebnis
+                cv2.imshow('Hand Tracking', frame)
+                
+                # Zeige auch die Maske (auf Wunsch, gleich ausgerichtet wie das Bild)
+                if self.show_mask:
+                    cv2.imshow('Hautmaske', orientation.render(mask, dst=self.buffers.get(
+                        "mask_display", orientation.display_shape(mask.shape))))
+                
+                # Tastatur-Input
+                key = cv2.waitKey(1) & 0xFF
             
             if key == ord('q'):
                 break
@@ -187,10 +451,62 @@ class HandTracker:
             elif key == ord('r'):
                 print("Kalibrierung zurückgesetzt.")
                 self.calibrated = False
-                self.hand_positions = []
+                self.hand_positions.clear()
                 # Setze Standardwerte zurück
                 self.lower_skin = np.array([0, 20, 70], dtype=np.uint8)
                 self.upper_skin = np.array([20, 255, 255], dtype=np.uint8)
+                self.roi.reset()
+                self.motion_gate.reset()
+                self.skin_model.reset()
+                if self.use_skin_lut:
+                    self.skin_lut.update(self.lower_skin, self.upper_skin)
+            elif key == ord('t'):
+                self.roi_tracking = not self.roi_tracking
+                self.roi.reset()
+                print(f"ROI-Tracking {'aktiviert' if self.roi_tracking else 'deaktiviert'}")
+            elif key == ord('l'):
+                self.use_skin_lut = not self.use_skin_lut
+                if self.use_skin_lut:
+                    self.skin_lut.update(self.lower_skin, self.upper_skin)
+                self.motion_gate.reset()
+                print(f"Haut-Lookup-Tabelle {'aktiviert' if self.use_skin_lut else 'deaktiviert'}")
+            elif key == ord('h'):
+                self.use_skin_histogram = not self.use_skin_histogram
+                self.skin_model.reset()
+                self.motion_gate.reset()
+                state = 'aktiviert' if self.use_skin_histogram else 'deaktiviert'
+                print(f"Adaptives Haut-Histogramm {state}")
+            elif key == ord('f'):
+                self.fast_path = not self.fast_path
+                self.motion_gate.reset()
+                print(f"Schneller Pfad {'aktiviert' if self.fast_path else 'deaktiviert'}")
+            elif key == ord('o'):
+                self.draw_contour = not self.draw_contour
+                print(f"Kontur {'eingeblendet' if self.draw_contour else 'ausgeblendet'}")
+            elif key == ord('k'):
+                self.show_mask = not self.show_mask
+                if not self.show_mask:
+                    cv2.destroyWindow('Hautmaske')
+                print(f"Hautmaske {'eingeblendet' if self.show_mask else 'ausgeblendet'}")
+            elif key == ord('i'):
+                self.profiler.enabled = not self.profiler.enabled
+                self.profiler.show_overlay = self.profiler.enabled
+                print(f"Profiling {'aktiviert' if self.profiler.enabled else 'deaktiviert'}")
+            elif key == ord('g'):
+                self.motion_gating = not self.motion_gating
+                self.motion_gate.reset()
+                self._gate_mask = None
+                self._last_located = None
+                print(f"Motion Gate {'aktiviert' if self.motion_gating else 'deaktiviert'}")
+        
+        if self.roi.full_pixels:
+            print(f"ROI-Tracking: {self.roi.pixel_ratio() * 100:.1f}% der Pixel segmentiert")
+        if self.motion_gate.full_frames:
+            print(self.motion_gate.stats_text())
+        if self.display.skipped:
+            print(self.display.stats_text())
+        self.profiler.print_summary()
+        self.profiler.export()
         
         # Aufräumen
         self.cap.release()
@@ -199,8 +515,19 @@ class HandTracker:
 
 def main():
     """Hauptfunktion"""
+    parser = argparse.ArgumentParser(description="Hand Tracking mit OpenCV")
+    add_source_arguments(parser)
+    add_orientation_arguments(parser)
+    add_display_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    
     try:
-        tracker = HandTracker()
+        tracker = HandTracker(camera_index=None)
+        tracker.cap = capture_from_args(args)
+        tracker.orientation = orientation_from_args(args)
+        tracker.display = display_from_args(args)
+        tracker.profiler = profiler_from_args(args)
         tracker.run()
     except KeyboardInterrupt:
         print("\nProgramm durch Benutzer beendet.")
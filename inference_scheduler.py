@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Adaptive Inferenzrate
+Hält die Hand dieselbe Pose, liefert MediaPipe Frame für Frame dasselbe
+Ergebnis, und die Cooldowns in process_gesture unterdrücken ohnehin jeden
+wiederholten Sound. Der Scheduler senkt dann die Inferenzrate stufenweise
+(jeden 2., 4., 8. Frame) und kehrt bei Bewegung sofort zur vollen Rate
+zurück.
+
+- Stabil ist ein Ergebnis, wenn die Gesten-Codes gleich bleiben und sich
+  die Bounding Box aller Landmarks kaum verschiebt; nach stable_results
+  stabilen Ergebnissen in Folge wird die nächste Stufe gewählt.
+- Bewegung wird in jedem Frame günstig erkannt: Der Bereich der letzten
+  Hand-Bounding-Box wird auf ein kleines Graustufenbild verkleinert und
+  mit dem Stand beim letzten Ergebnis verglichen. Die Referenz stammt aus
+  dem Bild, auf dem das Ergebnis berechnet wurde (nicht aus dem meist
+  neueren aktuellen Frame), damit Box und Referenz zusammenpassen. Die Box
+  ist normiert gespeichert, Referenz- und aktueller Frame dürfen daher
+  unterschiedliche Auflösungen haben.
+- Ohne sichtbare Hand läuft die Inferenz immer mit voller Rate, damit neue
+  Hände sofort erkannt werden.
+"""
+
+import cv2
+import numpy as np
+
+
+class AdaptiveInferenceScheduler:
+    """Entscheidet pro Frame, ob inferiert wird (volle Rate bis jeder 8. Frame)"""
+
+    def __init__(self, intervals=(1, 2, 4, 8), stable_results=3, bbox_tolerance=0.03,
+                 small_size=(32, 32), pixel_threshold=15, motion_threshold=0.05,
+                 padding=0.1, mirror=False):
+        self.intervals = intervals                # Inferenz-Intervalle der Stufen (Frames)
+        self.stable_results = stable_results      # Stabile Ergebnisse bis zur nächsten Stufe
+        self.bbox_tolerance = bbox_tolerance      # Max. Verschiebung der Box (normiert)
+        self.small_size = small_size              # Größe des Vergleichsbildes (B, H)
+        self.pixel_threshold = pixel_threshold    # Grauwert-Differenz für "geändert"
+        self.motion_threshold = motion_threshold  # Anteil geänderter Pixel für "Bewegung"
+        self.padding = padding                    # Rand um die Box (Anteil ihrer Größe)
+        self.mirror = mirror                      # Landmarks stammen aus dem gespiegelten Bild
+
+        width, height = small_size
+        self._small = np.empty((height, width, 3), dtype=np.uint8)
+        self._gray = np.empty((height, width), dtype=np.uint8)
+        self._reference = np.empty((height, width), dtype=np.uint8)
+        self._diff = np.empty((height, width), dtype=np.uint8)
+
+        self.reset()
+        self.reset_stats()
+
+    def reset(self):
+        """Zurück zur vollen Rate, Referenz und Stabilitätszähler verwerfen"""
+        self.level = 0
+        self._stable = 0
+        self._since = 0
+        self._codes = None
+        self._bbox = None       # Normierte Box (x0, y0, x1, y1) im ungespiegelten Bild
+        self._window = None     # Normiertes Fenster der Referenz (Box mit Rand)
+
+    def reset_stats(self):
+        """Setzt die Zähler zurück"""
+        self.frames = 0
+        self.inferred = 0
+        self.motion_resets = 0
+        self.level_frames = [0] * len(self.intervals)
+        self.inference_time = 0.0   # Summe der Modellzeiten (s)
+        self.results = 0
+
+    @property
+    def interval(self):
+        """Aktuelles Inferenz-Intervall in Frames"""
+        return self.intervals[self.level]
+
+    def _pixel_window(self, shape):
+        """Referenzfenster in Pixeln eines Frames der Form shape oder None, wenn zu klein"""
+        height, width = shape[:2]
+        x0, y0, x1, y1 = self._window
+        window = (max(0, int(x0 * width)), max(0, int(y0 * height)),
+                  min(width, int(np.ceil(x1 * width))), min(height, int(np.ceil(y1 * height))))
+        if window[2] - window[0] < 2 or window[3] - window[1] < 2:
+            return None
+        return window
+
+    def _crop_small(self, frame, window):
+        """Verkleinert ein Pixel-Fenster des Frames in das Graustufen-Vergleichsbild"""
+        x0, y0, x1, y1 = window
+        cv2.resize(frame[y0:y1, x0:x1], self.small_size, dst=self._small,
+                   interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+
+    def motion(self, frame):
+        """
+        Prüft auf Bewegung im Bereich der letzten Hand
+
+        Returns:
+            True, wenn sich genug Pixel seit dem letzten Ergebnis geändert haben
+        """
+        window = None if self._window is None else self._pixel_window(frame.shape)
+        if window is None:
+            return True
+        gray = self._crop_small(frame, window)
+        cv2.absdiff(gray, self._reference, dst=self._diff)
+        changed = np.count_nonzero(self._diff > self.pixel_threshold)
+        return changed > self.motion_threshold * self._diff.size
+
+    def should_infer(self, frame):
+        """
+        Entscheidet, ob der Frame an die Inferenz geht (einmal pro Frame aufrufen)
+
+        Args:
+            frame: Aktueller BGR-Frame (ungespiegelt, Aufnahmeauflösung)
+
+        Returns:
+            True, wenn inferiert werden soll
+        """
+        self.frames += 1
+        self.level_frames[self.level] += 1
+
+        if self.level > 0 and self.motion(frame):
+            # Bewegung: sofort zurück zur vollen Rate
+            self.level = 0
+            self._stable = 0
+            self.motion_resets += 1
+
+        self._since += 1
+        if self._since < self.interval:
+            return False
+        self._since = 0
+        self.inferred += 1
+        return True
+
+    def _bounding_box(self, points):
+        """Normierte Box (x0, y0, x1, y1) aller Landmarks im ungespiegelten Bild"""
+        xy = points[:, :, :2].reshape(-1, 2)
+        x0, y0 = xy.min(axis=0).tolist()
+        x1, y1 = xy.max(axis=0).tolist()
+        if self.mirror:
+            x0, x1 = 1.0 - x1, 1.0 - x0
+        return (x0, y0, x1, y1)
+
+    def update(self, codes, points, frame, duration=0.0):
+        """
+        Wertet ein Inferenz-Ergebnis aus und wählt die nächste Stufe
+
+        Args:
+            codes: Gesten-Codes aller Hände
+            points: Landmarks der Form (Hände, 21, 3), normiert
+            frame: BGR-Bild, auf dem das Ergebnis berechnet wurde (ungespiegelt,
+                   beliebige Auflösung); Referenz für die Bewegungserkennung
+            duration: Modellzeit des Ergebnisses in Sekunden (für die Statistik)
+        """
+        self.results += 1
+        self.inference_time += duration
+
+        if len(points) == 0:
+            # Keine Hand: volle Rate, damit neue Hände sofort erkannt werden
+            self.reset()
+            return
+
+        bbox = self._bounding_box(points)
+        stable = (self._codes is not None and np.array_equal(codes, self._codes) and
+                  max(abs(a - b) for a, b in zip(bbox, self._bbox)) < self.bbox_tolerance)
+        self._codes = np.array(codes, copy=True)
+        self._bbox = bbox
+
+        if stable:
+            self._stable += 1
+            if self._stable >= self.stable_results and self.level < len(self.intervals) - 1:
+                self.level += 1
+                self._stable = 0
+        else:
+            self.level = 0
+            self._stable = 0
+
+        # Referenzfenster: Box mit Rand, normiert
+        x0, y0, x1, y1 = bbox
+        pad_x = (x1 - x0) * self.padding
+        pad_y = (y1 - y0) * self.padding
+        self._window = (x0 - pad_x, y0 - pad_y, x1 + pad_x, y1 + pad_y)
+        window = self._pixel_window(frame.shape)
+        if window is None:
+            self._window = None
+            return
+        np.copyto(self._reference, self._crop_small(frame, window))
+
+    def inference_rate(self):
+        """Anteil der Frames, die inferiert wurden"""
+        return self.inferred / self.frames if self.frames else 1.0
+
+    def stats_text(self):
+        """Inferenzrate, Verteilung der Stufen und geschätzte eingesparte Modellzeit"""
+        if self.frames == 0:
+            return "Adaptive Inferenz: keine Frames"
+        skipped = self.frames - self.inferred
+        mean = self.inference_time / self.results if self.results else 0.0
+        levels = ", ".join(f"1/{interval}: {count}"
+                           for interval, count in zip(self.intervals, self.level_frames))
+        return (f"Adaptive Inferenz: {self.inferred}/{self.frames} Frames inferiert "
+                f"({self.inference_rate() * 100:.0f}%), {self.motion_resets}x Bewegung, "
+                f"Stufen [{levels}], ca. {skipped * mean:.1f} s Modellzeit gespart "
+                f"(Ø {mean * 1000:.1f} ms pro Inferenz)")
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Asynchrone Inferenz in einem Worker-Thread
+Die Hauptschleife übergibt jeden Frame mit submit() und holt fertige
+Ergebnisse mit poll() ab, ohne auf das Modell zu warten. Der Worker
+verarbeitet immer nur den neuesten Frame ("latest frame wins"); Frames,
+die vor ihrer Verarbeitung überschrieben werden, zählen als verworfen.
+
+- Die Eingabe wird schon bei submit() auf die Inferenzauflösung verkleinert
+  (unabhängig von Aufnahme- und Anzeigeauflösung); Spiegeln und die
+  Konvertierung nach RGB laufen im Worker auf dem kleinen Bild.
+- Jedes Ergebnis trägt Frame-ID, Aufnahmezeitpunkt und das verkleinerte
+  Eingangsbild, sodass Auswertungen (z.B. die Bewegungsreferenz der
+  adaptiven Inferenzrate) zum Bild des Ergebnisses passen und nicht zum
+  meist neueren aktuellen Frame.
+- Ein Thread genügt: MediaPipe gibt den GIL während der Berechnung frei,
+  und die Ergebnisse müssen nicht zwischen Prozessen serialisiert werden.
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+from frame_buffers import FrameBuffers
+
+# frame_id/timestamp: Eingangsframe; latency: Sekunden von submit() bis zum
+# Ergebnis; duration: Sekunden für process() allein; image: Eingangsbild in
+# Inferenzauflösung (BGR, ungespiegelt), gültig bis zum nächsten submit()
+InferenceResult = namedtuple("InferenceResult",
+                             "frame_id timestamp output latency duration image")
+
+
+class InferenceWorker:
+    """Worker-Thread, der eine Inferenzfunktion auf dem jeweils neuesten Frame ausführt"""
+
+    def __init__(self, process, input_width=640, mirror=False):
+        """
+        Args:
+            process: Funktion RGB-Bild → Ergebnis (z.B. mp.solutions.hands.Hands().process)
+            input_width: Breite des Inferenzbilds (Höhe nach Seitenverhältnis),
+                         0 = Aufnahmeauflösung
+            mirror: Bild vor der Inferenz horizontal spiegeln
+        """
+        self.process = process
+        self.input_width = input_width
+        self.mirror = mirror
+
+        # Zwei Eingangs-Slots: einer wird beschrieben, einer verarbeitet; der
+        # verarbeitete wandert mit dem Ergebnis hinaus und wird gegen das Bild
+        # des vorherigen Ergebnisses getauscht
+        self._slots = [None, None]
+        self._spare = None
+        self._buffers = FrameBuffers()     # Gespiegeltes und RGB-Bild (nur im Worker)
+        self._write = 0
+        self._pending = None        # (Slot, Frame-ID, Zeitstempel, Übergabezeit)
+        self._result = None
+        self._result_seq = 0
+        self._poll_seq = 0
+        self.error = None
+
+        # Statistik
+        self.submitted = 0
+        self.processed = 0
+        self.dropped = 0
+
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._worker_loop, daemon=True)
+        self._thread.start()
+
+    def input_size(self, shape):
+        """Inferenzauflösung (Breite, Höhe) für Frames der Form shape"""
+        height, width = shape[:2]
+        if not self.input_width or self.input_width >= width:
+            return width, height
+        return self.input_width, max(1, round(height * self.input_width / width))
+
+    def submit(self, frame, frame_id, timestamp):
+        """
+        Übergibt einen Frame zur Inferenz (blockiert nicht auf das Modell)
+
+        Der Frame wird sofort in den Eingangs-Slot verkleinert bzw. kopiert
+        und kann danach weiterverwendet werden. Ein noch nicht verarbeiteter
+        Frame wird dabei ersetzt.
+
+        Args:
+            frame: BGR-Bild in Aufnahmeauflösung
+            frame_id: Laufende Nummer des Frames
+            timestamp: Aufnahmezeitpunkt in Sekunden
+        """
+        width, height = self.input_size(frame.shape)
+        with self._cond:
+            if self.error is not None:
+                raise RuntimeError(f"Inferenz fehlgeschlagen: {self.error}") from self.error
+
+            slot = self._slots[self._write]
+            if slot is None or slot.shape[:2] != (height, width):
+                slot = self._slots[self._write] = np.empty((height, width, 3), dtype=np.uint8)
+            if (width, height) == (frame.shape[1], frame.shape[0]):
+                np.copyto(slot, frame)
+            else:
+                cv2.resize(frame, (width, height), dst=slot, interpolation=cv2.INTER_AREA)
+
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = (self._write, frame_id, timestamp, time.monotonic())
+            self.submitted += 1
+            self._cond.notify()
+
+    def _worker_loop(self):
+        """Worker-Thread: verarbeitet den jeweils neuesten Frame"""
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or not self._running)
+                if not self._running:
+                    return
+                index, frame_id, timestamp, submitted = self._pending
+                self._pending = None
+                # Der nächste Frame wird in den anderen Slot geschrieben
+                self._write = 1 - index
+            slot = self._slots[index]
+
+            start = time.monotonic()
+            try:
+                if self.mirror:
+                    slot = cv2.flip(slot, 1, dst=self._buffers.get("mirror", slot.shape))
+                rgb = cv2.cvtColor(slot, cv2.COLOR_BGR2RGB,
+                                   dst=self._buffers.get("rgb", slot.shape))
+                output = self.process(rgb)
+            except Exception as e:
+                with self._cond:
+                    self.error = e
+                    self._running = False
+                return
+            done = time.monotonic()
+
+            with self._cond:
+                # Slots beschreibt nur submit() im Hauptthread; das Bild des
+                # Ergebnisses bleibt daher bis zum nächsten submit() unverändert
+                image = self._slots[index]
+                self._slots[index], self._spare = self._spare, image
+                self._result = InferenceResult(frame_id, timestamp, output,
+                                               done - submitted, done - start, image)
+                self._result_seq += 1
+                self.processed += 1
+
+    def poll(self):
+        """
+        Neuestes noch nicht abgeholtes Ergebnis
+
+        Returns:
+            InferenceResult oder None, wenn seit dem letzten Aufruf nichts
+            fertig geworden ist
+        """
+        with self._cond:
+            if self.error is not None:
+                raise RuntimeError(f"Inferenz fehlgeschlagen: {self.error}") from self.error
+            if self._result_seq == self._poll_seq:
+                return None
+            self._poll_seq = self._result_seq
+            return self._result
+
+    def close(self):
+        """Stoppt den Worker-Thread (ein laufender Aufruf wird noch beendet)"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout=2.0)
+
+    def stats_text(self):
+        """Kurze Zusammenfassung für die Ausgabe beim Beenden"""
+        return (f"Inferenz: {self.processed}/{self.submitted} Frames verarbeitet, "
+                f"{self.dropped} verworfen")
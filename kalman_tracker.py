@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Kalman-Filter für die Handposition
+Glättet den erkannten Handmittelpunkt und schätzt Geschwindigkeit (und
+optional Beschleunigung), statt sie aus der Differenz zweier verrauschter
+Mittelpunkte zu berechnen.
+
+Beide Achsen teilen sich Übergangsmodell und Messzeitpunkte, daher ist die
+Kovarianzmatrix für x und y identisch: Der Zustand ist ein (Ordnung, 2)-Array
+(Spalten x und y), die Kovarianz eine kleine (Ordnung, Ordnung)-Matrix.
+
+Mit position_std() lässt sich die Unsicherheit einer Vorhersage abfragen,
+ohne den Filter zu verändern; damit kann zwischen zwei Erkennungen
+vorhergesagt und bei zu großer Unsicherheit neu erkannt werden.
+"""
+
+import math
+
+import numpy as np
+
+MODELS = ("velocity", "acceleration")
+
+
+class KalmanTracker:
+    """Kalman-Filter mit konstanter Geschwindigkeit oder konstanter Beschleunigung"""
+
+    def __init__(self, model="velocity", process_noise=2000.0, measurement_noise=3.0,
+                 max_gap=0.5):
+        if model not in MODELS:
+            raise ValueError(f"model muss einer von {MODELS} sein")
+
+        self.model = model
+        self.order = 2 if model == "velocity" else 3
+        self.process_noise = process_noise          # Std. Beschleunigung (px/s²) bzw. Ruck (px/s³)
+        self.measurement_noise = measurement_noise  # Std. des Messrauschens in Pixeln
+        self.max_gap = max_gap                      # Längere Lücken starten den Filter neu (s)
+
+        # Anfangsunsicherheit für Position, Geschwindigkeit, Beschleunigung
+        self.initial_std = np.array([measurement_noise, 1000.0, 5000.0])[:self.order]
+
+        # k! für die Taylor-Terme von F und die Rauschkopplung
+        self._factorials = np.array([math.factorial(k) for k in range(self.order + 1)],
+                                    dtype=np.float64)
+
+        self.reset()
+
+    def reset(self):
+        """Verwirft den Zustand; die nächste Messung initialisiert den Filter neu"""
+        # Zeilen: Position, Geschwindigkeit[, Beschleunigung]; Spalten: x, y
+        self.state = np.zeros((self.order, 2), dtype=np.float64)
+        self.covariance = np.eye(self.order)
+        self.time = None
+
+    @property
+    def initialized(self):
+        return self.time is not None
+
+    def _initialize(self, current_time, measurement):
+        self.state[:] = 0.0
+        self.state[0] = measurement
+        self.covariance = np.diag(self.initial_std ** 2)
+        self.time = current_time
+
+    def _transition(self, dt):
+        """Übergangsmatrix F und Prozessrauschen Q für einen Zeitschritt dt"""
+        order = self.order
+        taylor = dt ** np.arange(order) / self._factorials[:order]
+
+        F = np.zeros((order, order))
+        for i in range(order):
+            F[i, i:] = taylor[:order - i]
+
+        # Stückweise konstante Beschleunigung (bzw. Ruck) als weißes Rauschen
+        exponents = np.arange(order, 0, -1)
+        G = dt ** exponents / self._factorials[exponents]
+        Q = self.process_noise ** 2 * np.outer(G, G)
+        return F, Q
+
+    def _predicted_covariance(self, dt):
+        F, Q = self._transition(dt)
+        return F @ self.covariance @ F.T + Q
+
+    def predict(self, current_time):
+        """
+        Schreibt den Zustand bis current_time fort
+
+        Returns:
+            Vorhergesagte Position (x, y) oder None wenn nicht initialisiert
+        """
+        if not self.initialized:
+            return None
+
+        dt = current_time - self.time
+        if dt > 0:
+            F, Q = self._transition(dt)
+            self.state = F @ self.state
+            self.covariance = F @ self.covariance @ F.T + Q
+            self.time = current_time
+
+        return self.position
+
+    def update(self, measurement):
+        """Korrigiert den Zustand mit einer gemessenen Position (x, y)"""
+        # Gemessen wird nur die Position (erste Zeile des Zustands)
+        innovation = np.asarray(measurement, dtype=np.float64) - self.state[0]
+        innovation_var = self.covariance[0, 0] + self.measurement_noise ** 2
+
+        gain = self.covariance[:, 0] / innovation_var
+        self.state += np.outer(gain, innovation)
+        self.covariance -= np.outer(gain, self.covariance[0])
+
+    def step(self, current_time, measurement=None):
+        """
+        Vorhersage bis current_time und (falls vorhanden) Korrektur mit der Messung
+
+        Nach einer Lücke von mehr als max_gap Sekunden (oder einem Zeitsprung
+        zurück) wird der Filter mit der Messung neu initialisiert.
+
+        Returns:
+            Geschätzte Position (x, y) oder None wenn nicht initialisiert
+        """
+        if measurement is not None:
+            if (not self.initialized or current_time < self.time
+                    or current_time - self.time > self.max_gap):
+                self._initialize(current_time, measurement)
+                return self.position
+
+        self.predict(current_time)
+        if measurement is not None:
+            self.update(measurement)
+
+        return self.position if self.initialized else None
+
+    def position_std(self, current_time=None):
+        """
+        Standardabweichung der Position (px), bei Angabe einer Zeit für die
+        Vorhersage bis dorthin (ohne den Filter zu verändern)
+        """
+        if not self.initialized:
+            return math.inf
+
+        covariance = self.covariance
+        if current_time is not None and current_time > self.time:
+            covariance = self._predicted_covariance(current_time - self.time)
+        return math.sqrt(covariance[0, 0])
+
+    @property
+    def position(self):
+        return float(self.state[0, 0]), float(self.state[0, 1])
+
+    @property
+    def velocity(self):
+        return float(self.state[1, 0]), float(self.state[1, 1])
+
+    @property
+    def acceleration(self):
+        if self.order < 3:
+            return 0.0, 0.0
+        return float(self.state[2, 0]), float(self.state[2, 1])
+
+    @property
+    def speed(self):
+        """Betrag der geschätzten Geschwindigkeit in px/s"""
+        return math.hypot(self.state[1, 0], self.state[1, 1])
+
+    def point(self):
+        """Geschätzte Position als ganzzahliges Tupel für OpenCV-Zeichenfunktionen"""
+        return int(round(self.state[0, 0])), int(round(self.state[0, 1]))
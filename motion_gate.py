@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Motion Gate
+Günstiger Bewegungsfilter vor der Hand-Erkennung: Der Frame wird auf ein
+kleines Graustufenbild verkleinert und mit dem zuletzt verarbeiteten Frame
+verglichen. Pro Kachel eines groben Rasters entsteht ein Änderungswert.
+
+- Keine Kachel geändert: das letzte Ergebnis wird wiederverwendet.
+- Einige Kacheln geändert: nur diese Bereiche werden neu segmentiert.
+- Sonst (bzw. beim ersten Frame): volle Verarbeitung.
+
+Spart CPU bei Dauerinstallationen, vor denen meistens niemand steht.
+"""
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Kachelbasierte Frame-Differenz auf einem verkleinerten Graustufenbild"""
+
+    def __init__(self, grid=(8, 6), small_size=(80, 60), pixel_threshold=15,
+                 tile_threshold=0.02, margin=16):
+        cols, rows = grid
+        width, height = small_size
+        if width % cols or height % rows:
+            raise ValueError("small_size muss durch grid teilbar sein")
+
+        self.grid = grid                          # Kacheln (Spalten, Zeilen)
+        self.small_size = small_size              # Größe des Vergleichsbildes (B, H)
+        self.pixel_threshold = pixel_threshold    # Grauwert-Differenz für "geändert"
+        self.tile_threshold = tile_threshold      # Anteil geänderter Pixel pro Kachel
+        self.margin = margin                      # Rand beim Neusegmentieren (volle Auflösung)
+
+        self._tile_h = height // rows
+        self._tile_w = width // cols
+        self._small = np.empty((height, width, 3), dtype=np.uint8)
+        self._gray = np.empty((height, width), dtype=np.uint8)
+        self._diff = np.empty((height, width), dtype=np.uint8)
+
+        # Statistik
+        self.skipped_frames = 0
+        self.partial_frames = 0
+        self.full_frames = 0
+
+        self.reset()
+
+    def reset(self):
+        """Verwirft den Referenz-Frame, der nächste Frame wird voll verarbeitet"""
+        self._reference = None
+        self._frame_shape = None
+        self.tile_scores = None
+
+    def update(self, frame):
+        """
+        Vergleicht den Frame mit der Referenz
+
+        Returns:
+            Bool-Array (Zeilen, Spalten) der geänderten Kacheln oder None,
+            wenn keine Referenz vorliegt und voll verarbeitet werden muss
+        """
+        cv2.resize(frame, self.small_size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+
+        if self._reference is None or frame.shape != self._frame_shape:
+            self._reference = self._gray.copy()
+            self._frame_shape = frame.shape
+            self.full_frames += 1
+            return None
+
+        cv2.absdiff(self._gray, self._reference, dst=self._diff)
+        cols, rows = self.grid
+        changed_pixels = self._diff > self.pixel_threshold
+        self.tile_scores = changed_pixels.reshape(
+            rows, self._tile_h, cols, self._tile_w).mean(axis=(1, 3))
+        changed = self.tile_scores > self.tile_threshold
+
+        if not changed.any():
+            self.skipped_frames += 1
+        elif changed.all():
+            self.full_frames += 1
+            self._reference[:] = self._gray
+        else:
+            self.partial_frames += 1
+            # Referenz nur in neu verarbeiteten Kacheln erneuern, damit
+            # langsames Driften in den übrigen Kacheln weiter auffällt
+            tile_mask = np.repeat(np.repeat(changed, self._tile_h, axis=0), self._tile_w, axis=1)
+            np.copyto(self._reference, self._gray, where=tile_mask)
+
+        return changed
+
+    def regions(self, changed, frame_shape):
+        """
+        Bounding Boxes zusammenhängender geänderter Kacheln in Bildkoordinaten
+
+        Returns:
+            Liste von (x0, y0, x1, y1)
+        """
+        height, width = frame_shape[:2]
+        cols, rows = self.grid
+        scale_x = width / cols
+        scale_y = height / rows
+
+        count, _, stats, _ = cv2.connectedComponentsWithStats(
+            changed.astype(np.uint8), connectivity=8)
+
+        boxes = []
+        for label in range(1, count):
+            tx, ty, tw, th = stats[label, :4]
+            boxes.append((int(tx * scale_x), int(ty * scale_y),
+                          min(width, int(np.ceil((tx + tw) * scale_x))),
+                          min(height, int(np.ceil((ty + th) * scale_y)))))
+        return boxes
+
+    def resegment(self, mask, frame, changed, segment):
+        """
+        Segmentiert nur die geänderten Bereiche neu und schreibt sie in die Maske
+
+        Jeder Bereich wird mit Rand segmentiert (damit Morphologie und Blur an
+        den Kanten korrekt sind); übernommen wird nur das Innere.
+
+        Args:
+            mask: Maske des letzten Frames (wird in-place aktualisiert)
+            frame: Aktueller Frame
+            changed: Ergebnis von update()
+            segment: Segmentierungsfunktion Bild → Maske (z.B. detect_hand)
+        """
+        height, width = frame.shape[:2]
+        for x0, y0, x1, y1 in self.regions(changed, frame.shape):
+            px0, py0 = max(0, x0 - self.margin), max(0, y0 - self.margin)
+            px1, py1 = min(width, x1 + self.margin), min(height, y1 + self.margin)
+
+            region_mask = segment(frame[py0:py1, px0:px1])
+            mask[y0:y1, x0:x1] = region_mask[y0 - py0:y1 - py0, x0 - px0:x1 - px0]
+
+    def stats_text(self):
+        """Kurze Zusammenfassung der Zähler"""
+        total = self.skipped_frames + self.partial_frames + self.full_frames
+        if total == 0:
+            return "Motion Gate: keine Frames"
+        return (f"Motion Gate: {self.skipped_frames}/{total} Frames übersprungen, "
+                f"{self.partial_frames} teilweise, {self.full_frames} voll verarbeitet")
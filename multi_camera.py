@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Multi-Kamera Hand-Tracking
+Startet pro Quelle (Kamera-Index oder Videodatei) einen eigenen Prozess mit
+eigenem Tracker. Jeder Worker begrenzt die OpenCV-Threads, damit sich die
+Prozesse nicht gegenseitig die Kerne wegnehmen, und schickt seine
+Ergebnisse gebündelt über eine Queue an einen gemeinsamen Aggregator.
+Damit skaliert der Durchsatz mit der Anzahl Kerne statt an einer einzigen
+Python-Schleife (GIL) zu hängen.
+
+Beispiele:
+    python multi_camera.py 0 1 -o ergebnis.jsonl
+    python multi_camera.py 0 aufnahme.mp4 --tracker simple --max-frames 500
+    python multi_camera.py 0 1 --width 1280 --height 720
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import time
+
+import cv2
+
+from batch_processing import create_tracker, frame_timestamp, process_frame, write_records
+from frame_capture import open_camera
+from frame_recorder import parse_source
+
+
+def source_name(source):
+    """Anzeigename einer Quelle für Ergebnisse und Statistik"""
+    if isinstance(source, int):
+        return f"kamera{source}"
+    return os.path.basename(source)
+
+
+def camera_worker(name, source, tracker_kind, results, stop_event, opencv_threads=1,
+                  max_frames=None, batch_size=16, width=640, height=480):
+    """
+    Verarbeitet eine Quelle in einem eigenen Prozess
+
+    Ergebnisse werden in Bündeln von batch_size Frames als
+    ('results', name, [records]) in die Queue gelegt; am Ende folgt
+    ('done', name, statistik). Kameras werden mit width x height geöffnet,
+    Videodateien in ihrer eigenen Auflösung gelesen.
+    """
+    cv2.setNumThreads(opencv_threads)
+
+    live = isinstance(source, int)
+    cap = open_camera(source, width, height) if live else cv2.VideoCapture(source)
+    if not cap.isOpened():
+        results.put(('done', name, {'frames': 0, 'time': 0.0,
+                                    'error': f"{source} konnte nicht geöffnet werden"}))
+        return
+
+    fps = 0.0 if live else cap.get(cv2.CAP_PROP_FPS)
+    tracker = create_tracker(tracker_kind)
+    batch = []
+    frame_index = 0
+    resolution = None
+    start = time.perf_counter()
+
+    try:
+        while not stop_event.is_set() and (max_frames is None or frame_index < max_frames):
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if resolution is None:
+                # Tatsächliche Auflösung (Kameras ignorieren Wünsche mitunter)
+                resolution = (frame.shape[1], frame.shape[0])
+
+            if live:
+                timestamp = cap.last_timestamp
+            else:
+                timestamp = frame_timestamp(cap, frame_index, fps)
+
+            record = {'clip': name, 'frame': frame_index, 'time': timestamp}
+            record.update(process_frame(tracker, frame, timestamp))
+            batch.append(record)
+            frame_index += 1
+
+            if len(batch) >= batch_size:
+                results.put(('results', name, batch))
+                batch = []
+    finally:
+        if batch:
+            results.put(('results', name, batch))
+        cap.release()
+        results.put(('done', name, {'frames': frame_index,
+                                    'time': time.perf_counter() - start,
+                                    'resolution': resolution}))
+
+
+class ResultAggregator:
+    """Sammelt die Ergebnisse aller Worker und führt Statistik pro Quelle"""
+
+    def __init__(self, names):
+        self.records = {name: [] for name in names}
+        self.stats = {}
+
+    def add(self, name, records):
+        self.records[name].extend(records)
+
+    def finish(self, name, stats):
+        self.stats[name] = stats
+
+    @property
+    def done(self):
+        return len(self.stats) == len(self.records)
+
+    def ordered_records(self):
+        """Alle Ergebnisse nach Quelle und Frame sortiert"""
+        return [record for name in self.records for record in self.records[name]]
+
+    def report(self, elapsed):
+        """Gibt Frames/s pro Quelle und den Gesamtdurchsatz aus"""
+        total = 0
+        for name, stats in self.stats.items():
+            if 'error' in stats:
+                print(f"{name}: Fehler - {stats['error']}")
+                continue
+            fps = stats['frames'] / stats['time'] if stats['time'] > 0 else 0
+            total += stats['frames']
+            resolution = stats.get('resolution')
+            size = f" @ {resolution[0]}x{resolution[1]}" if resolution else ""
+            print(f"{name}: {stats['frames']} Frames{size} ({fps:.1f} Frames/s)")
+
+        total_fps = total / elapsed if elapsed > 0 else 0
+        print(f"\n{total} Frames aus {len(self.stats)} Quelle(n) in {elapsed:.2f} s")
+        print(f"Gesamtdurchsatz: {total_fps:.1f} Frames/s")
+
+
+def run_sources(sources, tracker_kind="advanced", max_frames=None, opencv_threads=None,
+                width=640, height=480):
+    """
+    Startet einen Worker-Prozess pro Quelle und sammelt die Ergebnisse
+
+    Args:
+        sources: Liste von Kamera-Indizes (int) und/oder Dateipfaden
+        tracker_kind: "simple" oder "advanced"
+        max_frames: Optionales Limit pro Quelle (Kameras laufen sonst bis Strg+C)
+        opencv_threads: OpenCV-Threads pro Worker (Standard: Kerne / Quellen)
+        width, height: Gewünschte Auflösung der Kameras (wie die Einzel-Tracker)
+
+    Returns:
+        ResultAggregator mit allen Ergebnissen
+    """
+    names = [source_name(source) for source in sources]
+    if len(set(names)) != len(names):
+        # Gleichnamige Dateien aus verschiedenen Ordnern unterscheidbar machen
+        names = [f"{i}_{name}" for i, name in enumerate(names)]
+
+    if opencv_threads is None:
+        opencv_threads = max(1, (os.cpu_count() or 1) // len(sources))
+
+    # "spawn" statt fork: OpenCV-Threadpools überstehen fork nicht zuverlässig
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    stop_event = ctx.Event()
+
+    workers = [ctx.Process(target=camera_worker,
+                           args=(name, source, tracker_kind, results, stop_event,
+                                 opencv_threads, max_frames, 16, width, height),
+                           daemon=True)
+               for name, source in zip(names, sources)]
+
+    aggregator = ResultAggregator(names)
+    for worker in workers:
+        worker.start()
+
+    try:
+        while not aggregator.done:
+            try:
+                kind, name, payload = results.get(timeout=1.0)
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in workers):
+                    print("Alle Worker beendet, fehlende Ergebnisse werden ignoriert.")
+                    break
+                continue
+
+            if kind == 'results':
+                aggregator.add(name, payload)
+            else:
+                aggregator.finish(name, payload)
+    except KeyboardInterrupt:
+        print("\nBeende Worker...")
+        stop_event.set()
+        # Restliche Ergebnisse einsammeln, bis alle Worker fertig sind
+        while not aggregator.done and any(worker.is_alive() for worker in workers):
+            try:
+                kind, name, payload = results.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            if kind == 'results':
+                aggregator.add(name, payload)
+            else:
+                aggregator.finish(name, payload)
+
+    for worker in workers:
+        worker.join(timeout=5.0)
+
+    return aggregator
+
+
+def main():
+    """Hauptfunktion"""
+    parser = argparse.ArgumentParser(description="Hand-Tracking für mehrere Kameras/Videos "
+                                                 "mit einem Prozess pro Quelle")
+    parser.add_argument("sources", nargs="+",
+                        help="Kamera-Indizes (z.B. 0 1) und/oder Videodateien")
+    parser.add_argument("-o", "--output", default="multi_camera_results.jsonl",
+                        help="Ausgabedatei (.jsonl oder .npz)")
+    parser.add_argument("--tracker", choices=["simple", "advanced"], default="advanced",
+                        help="Verwendete Tracking-Pipeline")
+    parser.add_argument("--max-frames", type=int, default=None,
+                        help="Maximale Anzahl Frames pro Quelle")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="OpenCV-Threads pro Worker (Standard: Kerne / Quellen)")
+    parser.add_argument("--width", type=int, default=640,
+                        help="Gewünschte Kamerabreite (Standard: 640 wie die Einzel-Tracker)")
+    parser.add_argument("--height", type=int, default=480,
+                        help="Gewünschte Kamerahöhe (Standard: 480)")
+    args = parser.parse_args()
+
+    sources = [parse_source(source) for source in args.sources]
+
+    start = time.perf_counter()
+    aggregator = run_sources(sources, args.tracker, args.max_frames, args.threads,
+                             args.width, args.height)
+    elapsed = time.perf_counter() - start
+
+    aggregator.report(elapsed)
+    write_records(aggregator.ordered_records(), args.output)
+    print(f"Ergebnisse gespeichert: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
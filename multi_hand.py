@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Mehrhand-Tracking mit Track-IDs
+- extract_blobs: die K größten Hautregionen eines Frames; die Fläche jeder
+  Kontur wird genau einmal berechnet.
+- HandTrackManager: ordnet die Hände von Frame zu Frame per Greedy-Zuordnung
+  auf der Distanz zwischen vorhergesagter und erkannter Position zu und
+  vergibt stabile IDs. Jede Hand hat eigene Spur, Kalman-Filter und
+  Gesten-Klassifikator.
+
+Da nur die K größten Regionen zugeordnet werden, wachsen die Kosten der
+Zuordnung mit der Anzahl Hände (K × Tracks) und nicht mit der Anzahl Konturen.
+"""
+
+import cv2
+import numpy as np
+
+from gesture_classifier import StreamingGestureClassifier
+from kalman_tracker import KalmanTracker
+from trajectory_buffer import TrajectoryBuffer
+
+# Farben pro Track-ID (BGR)
+TRACK_COLORS = [(0, 255, 0), (255, 0, 255), (0, 200, 255), (255, 200, 0),
+                (0, 0, 255), (255, 255, 255)]
+
+
+def extract_blobs(contours, max_count=1, min_area=0.0):
+    """
+    Die größten Konturen samt Schwerpunkt
+
+    Args:
+        contours: Konturen aus cv2.findContours
+        max_count: Maximale Anzahl Regionen (K)
+        min_area: Mindestfläche in Pixeln
+
+    Returns:
+        Liste von (Mittelpunkt, Kontur, Fläche), absteigend nach Fläche
+    """
+    if not contours:
+        return []
+
+    areas = np.fromiter((cv2.contourArea(c) for c in contours), dtype=np.float64,
+                        count=len(contours))
+
+    if max_count == 1:
+        order = [int(np.argmax(areas))]
+    else:
+        candidates = np.flatnonzero(areas >= min_area)
+        if len(candidates) > max_count:
+            candidates = candidates[np.argpartition(-areas[candidates], max_count - 1)[:max_count]]
+        # Stabile Sortierung: bei gleicher Fläche gewinnt die frühere Kontur
+        order = candidates[np.argsort(-areas[candidates], kind='stable')].tolist()
+
+    blobs = []
+    for index in order:
+        if areas[index] < min_area:
+            continue
+        contour = contours[index]
+        M = cv2.moments(contour)
+        if M["m00"] == 0:
+            continue
+        center = (int(M["m10"] / M["m00"]), int(M["m01"] / M["m00"]))
+        blobs.append((center, contour, float(areas[index])))
+    return blobs
+
+
+class HandTrack:
+    """Zustand einer verfolgten Hand"""
+
+    def __init__(self, track_id, trail_length=50, gesture_window=30):
+        self.id = track_id
+        self.positions = TrajectoryBuffer(trail_length)
+        self.classifier = StreamingGestureClassifier(gesture_window)
+        self.kalman = KalmanTracker()
+        self.gesture = "Sammle Daten..."
+        self.missed = 0
+        self.contour = None
+        self.fingertips = None
+        self.area = 0.0
+
+    @property
+    def color(self):
+        return TRACK_COLORS[self.id % len(TRACK_COLORS)]
+
+    def update(self, hand, timestamp):
+        """Übernimmt eine zugeordnete Erkennung (Mittelpunkt, Kontur, Fingerspitzen, Fläche)"""
+        center, self.contour, self.fingertips, self.area = hand
+        self.kalman.step(timestamp, center)
+        x, y = self.kalman.position
+        velocity = self.kalman.speed
+
+        self.positions.append(x, y, timestamp, velocity)
+        self.classifier.push(x, y)
+        self.gesture = self.classifier.classify()
+        self.missed = 0
+
+    def mark_missed(self):
+        """Keine Erkennung in diesem Frame"""
+        self.missed += 1
+        self.contour = None
+        self.fingertips = None
+
+    def point(self):
+        return self.kalman.point()
+
+
+class HandTrackManager:
+    """Greedy-Zuordnung von Erkennungen zu Tracks mit stabilen IDs"""
+
+    def __init__(self, max_hands=2, max_distance=150.0, max_missed=10,
+                 trail_length=50, gesture_window=30):
+        self.max_hands = max_hands
+        self.max_distance = max_distance    # Maximale Zuordnungsdistanz in Pixeln
+        self.max_missed = max_missed        # Frames ohne Erkennung bis ein Track gelöscht wird
+        self.trail_length = trail_length
+        self.gesture_window = gesture_window
+        self.clear()
+
+    def clear(self):
+        """Löscht alle Tracks (IDs beginnen wieder bei 0)"""
+        self.tracks = []
+        self._next_id = 0
+
+    def _new_track(self):
+        track = HandTrack(self._next_id, self.trail_length, self.gesture_window)
+        self._next_id += 1
+        return track
+
+    def update(self, hands, timestamp):
+        """
+        Ordnet die Erkennungen eines Frames den Tracks zu
+
+        Args:
+            hands: Liste von (Mittelpunkt, Kontur, Fingerspitzen, Fläche)
+            timestamp: Zeitstempel in Sekunden
+
+        Returns:
+            Liste der in diesem Frame erkannten Tracks
+        """
+        assigned_tracks = set()
+        assigned_hands = set()
+
+        if self.tracks and hands:
+            # Vorhergesagte Positionen der Tracks gegen erkannte Mittelpunkte
+            predicted = np.array([track.kalman.predict(timestamp) for track in self.tracks])
+            detected = np.array([hand[0] for hand in hands], dtype=np.float64)
+            distances = np.linalg.norm(predicted[:, None, :] - detected[None, :, :], axis=2)
+
+            # Greedy: kürzeste Distanzen zuerst
+            for flat in np.argsort(distances, axis=None).tolist():
+                t, d = divmod(flat, len(hands))
+                if distances[t, d] > self.max_distance:
+                    break
+                if t in assigned_tracks or d in assigned_hands:
+                    continue
+                self.tracks[t].update(hands[d], timestamp)
+                assigned_tracks.add(t)
+                assigned_hands.add(d)
+
+        matched = [self.tracks[t] for t in sorted(assigned_tracks)]
+
+        for t, track in enumerate(self.tracks):
+            if t not in assigned_tracks:
+                track.mark_missed()
+
+        # Neue Hände: freie Plätze nutzen, sonst den am längsten verlorenen Track ersetzen
+        for d, hand in enumerate(hands):
+            if d in assigned_hands:
+                continue
+            if len(self.tracks) >= self.max_hands:
+                lost = max(self.tracks, key=lambda track: track.missed)
+                if lost.missed == 0:
+                    continue
+                self.tracks.remove(lost)
+            track = self._new_track()
+            track.update(hand, timestamp)
+            self.tracks.append(track)
+            matched.append(track)
+
+        self.tracks = [track for track in self.tracks if track.missed <= self.max_missed]
+        return matched
+
+    def draw(self, frame):
+        """Zeichnet Spur, Kontur, Fingerspitzen und ID jeder Hand"""
+        for track in self.tracks:
+            color = track.color
+            if len(track.positions) > 1:
+                cv2.polylines(frame, [track.positions.points()], False, color, 3)
+
+            if track.missed:
+                continue
+
+            if track.contour is not None:
+                cv2.drawContours(frame, [track.contour], -1, color, 2)
+            if track.fingertips is not None:
+                for fingertip in track.fingertips.tolist():
+                    cv2.circle(frame, tuple(fingertip), 8, (0, 0, 255), -1)
+
+            center = track.point()
+            cv2.circle(frame, center, 12, color, -1)
+            cv2.putText(frame, f"#{track.id} {track.gesture}", (center[0] + 20, center[1] - 20),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
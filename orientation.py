@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Ausrichtung zwischen Kamerabild und Anzeige
+Die Kamera ist gedreht montiert (Standard: 180°). Statt jeden Frame vor
+der Verarbeitung zu drehen, wird das Rohbild segmentiert und nur die
+Ergebnisse (Mittelpunkte, Konturen, Fingerspitzen, Rechtecke) in
+Anzeigekoordinaten umgerechnet; Mausklicks gehen den umgekehrten Weg.
+Pixel werden nur noch für die Anzeige gedreht.
+
+Drehungen sind im Uhrzeigersinn angegeben (wie cv2.ROTATE_90_CLOCKWISE).
+Eine Drehung um 0° lässt Koordinaten unverändert.
+"""
+
+import cv2
+import numpy as np
+
+# Drehung → cv2.rotate-Code
+ROTATE_CODES = {
+    90: cv2.ROTATE_90_CLOCKWISE,
+    180: cv2.ROTATE_180,
+    270: cv2.ROTATE_90_COUNTERCLOCKWISE,
+}
+
+# Drehung → Matrix A der Abbildung Anzeige = A · Roh + b
+_MATRICES = {
+    0: ((1, 0), (0, 1)),
+    90: ((0, -1), (1, 0)),
+    180: ((-1, 0), (0, -1)),
+    270: ((0, 1), (-1, 0)),
+}
+
+
+class OrientationTransform:
+    """Abbildung von Rohbild-Koordinaten auf Anzeige-Koordinaten und zurück"""
+
+    def __init__(self, rotation=180):
+        if rotation not in _MATRICES:
+            raise ValueError(f"Drehung muss 0, 90, 180 oder 270 sein, nicht {rotation}")
+        self.rotation = rotation
+        self._matrix = np.array(_MATRICES[rotation], dtype=np.int32)
+
+    @property
+    def identity(self):
+        """True, wenn Rohbild und Anzeige übereinstimmen"""
+        return self.rotation == 0
+
+    def _offset(self, shape):
+        """Verschiebung b für ein Rohbild der Form shape"""
+        height, width = shape[:2]
+        if self.rotation == 90:
+            return np.array((height - 1, 0), dtype=np.int32)
+        if self.rotation == 180:
+            return np.array((width - 1, height - 1), dtype=np.int32)
+        if self.rotation == 270:
+            return np.array((0, width - 1), dtype=np.int32)
+        return np.zeros(2, dtype=np.int32)
+
+    def display_shape(self, shape):
+        """Form des Anzeigebilds zu einem Rohbild der Form shape"""
+        if self.rotation in (90, 270):
+            return (shape[1], shape[0]) + tuple(shape[2:])
+        return tuple(shape)
+
+    def to_display(self, point, shape):
+        """
+        Rechnet einen Punkt des Rohbilds in Anzeigekoordinaten um
+
+        Args:
+            point: (x, y) im Rohbild oder None
+            shape: Form des Rohbilds
+
+        Returns:
+            (x, y) als int-Tupel bzw. None
+        """
+        if point is None or self.identity:
+            return point
+        x, y = self._matrix @ (int(point[0]), int(point[1])) + self._offset(shape)
+        return (int(x), int(y))
+
+    def to_raw(self, point, shape):
+        """Rechnet einen Anzeigepunkt (z.B. Mausklick) in Rohbild-Koordinaten um"""
+        if point is None or self.identity:
+            return point
+        # A ist orthogonal, die Umkehrung ist daher Aᵀ · (Anzeige - b)
+        x, y = self._matrix.T @ (np.array((int(point[0]), int(point[1]))) - self._offset(shape))
+        return (int(x), int(y))
+
+    def points_to_display(self, points, shape):
+        """
+        Rechnet ein Punkt-Array in Anzeigekoordinaten um
+
+        Args:
+            points: Array der Form (..., 2), z.B. Kontur (N, 1, 2) oder
+                    Fingerspitzen (K, 2); None wird durchgereicht
+            shape: Form des Rohbilds
+
+        Returns:
+            Neues int32-Array gleicher Form (bei 0° das Eingabe-Array)
+        """
+        if points is None or self.identity:
+            return points
+        return (points @ self._matrix.T + self._offset(shape)).astype(np.int32, copy=False)
+
+    def rect_to_display(self, rect, shape):
+        """Rechnet ein Rechteck (x0, y0, x1, y1) mit exklusivem Ende um"""
+        if rect is None or self.identity:
+            return rect
+        x0, y0, x1, y1 = rect
+        ax, ay = self.to_display((x0, y0), shape)
+        bx, by = self.to_display((x1 - 1, y1 - 1), shape)
+        return (min(ax, bx), min(ay, by), max(ax, bx) + 1, max(ay, by) + 1)
+
+    def bbox_to_display(self, bbox, shape):
+        """Rechnet eine Bounding Box (x, y, w, h) um"""
+        if bbox is None or self.identity:
+            return bbox
+        x, y, w, h = bbox
+        x0, y0, x1, y1 = self.rect_to_display((x, y, x + w, y + h), shape)
+        return (x0, y0, x1 - x0, y1 - y0)
+
+    def render(self, image, dst=None):
+        """
+        Dreht die Pixel eines Bilds für die Anzeige
+
+        Auch bei 0° entsteht eine Kopie, damit auf dem Anzeigebild gezeichnet
+        werden kann, ohne den Frame der Quelle zu verändern.
+
+        Args:
+            image: Rohbild (Frame oder Maske)
+            dst: Optionaler Zielpuffer der Form display_shape(image.shape)
+        """
+        if self.identity:
+            if dst is None:
+                return image.copy()
+            np.copyto(dst, image)
+            return dst
+        return cv2.rotate(image, ROTATE_CODES[self.rotation], dst=dst)
+
+
+def add_orientation_arguments(parser):
+    """Registriert die Option für die Kameradrehung an einem ArgumentParser"""
+    parser.add_argument("--rotation", type=int, default=180, choices=(0, 90, 180, 270),
+                        help="Drehung der Kamera im Uhrzeigersinn (nur für die Anzeige, Standard: 180)")
+
+
+def orientation_from_args(args):
+    """Erstellt eine OrientationTransform aus der Option von add_orientation_arguments"""
+    return OrientationTransform(args.rotation)
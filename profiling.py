@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Profiling der Verarbeitungsschritte
+Misst die Laufzeit einzelner Schritte (Aufnahme, Drehen, Farbkonvertierung,
+Morphologie, Konturen, Zeichnen, Anzeige, ...) mit time.perf_counter_ns.
+
+- Pro Schritt werden die letzten N Messungen in einem festen Ringpuffer
+  gehalten; p50/p95/p99 werden erst bei Bedarf daraus berechnet.
+- Optional Anzeige im Bild sowie periodischer Export als CSV und als
+  Prometheus-Textdatei (z.B. für den node_exporter textfile collector).
+- Ist das Profiling aus, liefert stage() einen gemeinsamen Null-Kontext;
+  die Kosten beschränken sich auf einen Methodenaufruf.
+
+Beispiel:
+    profiler = StageProfiler(enabled=True)
+    with profiler.stage("segmentierung"):
+        mask = detect_hand(frame)
+"""
+
+import functools
+import os
+import time
+
+import cv2
+import numpy as np
+
+
+class _NullStage:
+    """Kontext ohne Wirkung für deaktiviertes Profiling"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """Wiederverwendbarer Messkontext eines Schritts (nicht reentrant)"""
+
+    __slots__ = ('_profiler', '_name', '_start')
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+        self._start = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._profiler.record(self._name, time.perf_counter_ns() - self._start)
+        return False
+
+
+class StageProfiler:
+    """Laufzeitmessung pro Schritt mit rollierenden Perzentilen in festem Speicher"""
+
+    def __init__(self, enabled=False, window=512, export_interval=10.0, csv_path=None,
+                 prometheus_path=None, prefix="hand_tracking"):
+        self.enabled = enabled
+        self.window = window                    # Messungen pro Schritt im Ringpuffer
+        self.export_interval = export_interval  # Sekunden zwischen zwei Exporten
+        self.csv_path = csv_path
+        self.prometheus_path = prometheus_path
+        self.prefix = prefix                    # Präfix der Prometheus-Metriken
+        self.show_overlay = False
+
+        self._stages = {}       # Name → _Stage
+        self._samples = {}      # Name → Ringpuffer (int64 ns)
+        self._counts = {}       # Name → Anzahl Messungen insgesamt
+        self._totals = {}       # Name → Summe aller Messungen (ns)
+        self._last_export = time.monotonic()
+
+    def stage(self, name):
+        """Kontextmanager, der die Laufzeit des Blocks unter name erfasst"""
+        if not self.enabled:
+            return NULL_STAGE
+        stage = self._stages.get(name)
+        if stage is None:
+            stage = self._stages[name] = _Stage(self, name)
+        return stage
+
+    def timed(self, name):
+        """Dekorator-Variante von stage()"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, name, duration_ns):
+        """Speichert eine Messung (Nanosekunden)"""
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = self._samples[name] = np.zeros(self.window, dtype=np.int64)
+            self._counts[name] = 0
+            self._totals[name] = 0
+
+        count = self._counts[name]
+        samples[count % self.window] = duration_ns
+        self._counts[name] = count + 1
+        self._totals[name] += duration_ns
+
+    def reset(self):
+        """Verwirft alle Messungen"""
+        self._samples.clear()
+        self._counts.clear()
+        self._totals.clear()
+
+    def summary(self):
+        """
+        Kennzahlen pro Schritt (in Aufnahmereihenfolge)
+
+        Returns:
+            Dictionary Name → {'count', 'mean', 'p50', 'p95', 'p99'} (Zeiten in ms)
+        """
+        result = {}
+        for name, samples in self._samples.items():
+            count = self._counts[name]
+            window = samples[:min(count, self.window)]
+            p50, p95, p99 = np.percentile(window, (50, 95, 99)) / 1e6
+            result[name] = {
+                'count': count,
+                'mean': self._totals[name] / count / 1e6,
+                'p50': float(p50),
+                'p95': float(p95),
+                'p99': float(p99),
+            }
+        return result
+
+    def draw(self, frame, origin=None):
+        """Blendet p50/p95/p99 pro Schritt im Bild ein (Standard: oben rechts)"""
+        if not self.show_overlay or not self._samples:
+            return
+
+        x, y = origin if origin is not None else (frame.shape[1] - 335, 100)
+        rows = self.summary()
+        cv2.rectangle(frame, (x - 5, y - 18), (x + 330, y + 20 * len(rows) - 8), (0, 0, 0), -1)
+        for i, (name, stats) in enumerate(rows.items()):
+            text = (f"{name:<14} {stats['p50']:6.2f} {stats['p95']:6.2f} "
+                    f"{stats['p99']:6.2f} ms")
+            cv2.putText(frame, text, (x, y + i * 20), cv2.FONT_HERSHEY_PLAIN, 1.0,
+                        (0, 255, 255), 1)
+
+    def maybe_export(self):
+        """Exportiert, wenn seit dem letzten Export export_interval Sekunden vergangen sind"""
+        if not self.enabled or not (self.csv_path or self.prometheus_path):
+            return
+        now = time.monotonic()
+        if now - self._last_export < self.export_interval:
+            return
+        self._last_export = now
+        self.export()
+
+    def export(self):
+        """Schreibt die aktuellen Kennzahlen in die konfigurierten Dateien"""
+        rows = self.summary()
+        if not rows:
+            return
+        try:
+            if self.csv_path:
+                self.export_csv(self.csv_path, rows)
+            if self.prometheus_path:
+                self.export_prometheus(self.prometheus_path, rows)
+        except OSError as e:
+            print(f"Profiling-Export fehlgeschlagen: {e}")
+
+    def export_csv(self, path, rows=None):
+        """Hängt eine Zeile pro Schritt an eine CSV-Datei an"""
+        rows = self.summary() if rows is None else rows
+        write_header = not os.path.exists(path)
+        timestamp = time.time()
+        with open(path, 'a', encoding='utf-8') as f:
+            if write_header:
+                f.write("timestamp,stage,count,mean_ms,p50_ms,p95_ms,p99_ms\n")
+            for name, s in rows.items():
+                f.write(f"{timestamp:.3f},{name},{s['count']},{s['mean']:.4f},"
+                        f"{s['p50']:.4f},{s['p95']:.4f},{s['p99']:.4f}\n")
+
+    def export_prometheus(self, path, rows=None):
+        """Schreibt die Kennzahlen im Prometheus-Textformat (atomar ersetzt)"""
+        rows = self.summary() if rows is None else rows
+        metric = f"{self.prefix}_stage_latency_seconds"
+        lines = [
+            f"# HELP {metric} Laufzeit pro Verarbeitungsschritt",
+            f"# TYPE {metric} summary",
+        ]
+        for name, s in rows.items():
+            for quantile, key in (("0.5", 'p50'), ("0.95", 'p95'), ("0.99", 'p99')):
+                lines.append(f'{metric}{{stage="{name}",quantile="{quantile}"}} '
+                             f'{s[key] / 1000:.6f}')
+            lines.append(f'{metric}_sum{{stage="{name}"}} {self._totals[name] / 1e9:.6f}')
+            lines.append(f'{metric}_count{{stage="{name}"}} {s["count"]}')
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+
+    def print_summary(self):
+        """Gibt die Kennzahlen als Tabelle aus"""
+        rows = self.summary()
+        if not rows:
+            return
+        print(f"\n{'Schritt':<16} {'Anzahl':>8} {'Ø ms':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+        for name, s in rows.items():
+            print(f"{name:<16} {s['count']:>8} {s['mean']:>8.3f} {s['p50']:>8.3f} "
+                  f"{s['p95']:>8.3f} {s['p99']:>8.3f}")
+
+
+def add_profiling_arguments(parser):
+    """Registriert die gemeinsamen Profiling-Optionen an einem ArgumentParser"""
+    parser.add_argument("--profile", action="store_true",
+                        help="Laufzeit pro Verarbeitungsschritt messen und anzeigen")
+    parser.add_argument("--profile-csv", default=None, metavar="PFAD",
+                        help="Kennzahlen periodisch an diese CSV-Datei anhängen")
+    parser.add_argument("--profile-prometheus", default=None, metavar="PFAD",
+                        help="Kennzahlen periodisch als Prometheus-Textdatei schreiben")
+    parser.add_argument("--profile-interval", type=float, default=10.0, metavar="SEK",
+                        help="Sekunden zwischen zwei Exporten")
+
+
+def profiler_from_args(args, prefix="hand_tracking"):
+    """Erstellt einen StageProfiler aus den Optionen von add_profiling_arguments"""
+    enabled = bool(args.profile or args.profile_csv or args.profile_prometheus)
+    profiler = StageProfiler(enabled=enabled, export_interval=args.profile_interval,
+                             csv_path=args.profile_csv,
+                             prometheus_path=args.profile_prometheus, prefix=prefix)
+    profiler.show_overlay = args.profile
+    return profiler
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Rendering-Hilfen für die Hand-Tracking Programme
+- Spuren werden nicht mehr Segment für Segment mit cv2.line gezeichnet,
+  sondern nach Farbstufen gruppiert mit einem cv2.polylines-Aufruf pro Stufe.
+- Statische HUD-Elemente (Balken, Steuerungs-Text) werden einmal in ein
+  Overlay samt Maske gezeichnet und pro Frame mit einer Kopier-Operation
+  pro belegtem Bildband eingeblendet.
+"""
+
+import cv2
+import numpy as np
+
+
+def gradient_color(value):
+    """Farbverlauf von Blau (alt) nach Grün (neu) für Werte in [0, 1]"""
+    return (int(255 * (1 - value)), int(255 * value), 0)
+
+
+def velocity_color(value):
+    """Farbverlauf von Blau (langsam) nach Rot (schnell) für Werte in [0, 1]"""
+    return (int(255 * (1 - value)), 0, int(255 * value))
+
+
+def draw_trail_batched(frame, points, max_thickness, values=None, color_fn=gradient_color,
+                       buckets=8):
+    """
+    Zeichnet eine Spur mit Farbverlauf über wenige cv2.polylines-Aufrufe
+
+    Die Segmente werden anhand ihres Werts (Standard: Position in der Spur,
+    alt = 0, neu = 1) in Farbstufen eingeteilt. Aufeinanderfolgende Segmente
+    derselben Stufe werden zu einem Linienzug zusammengefasst.
+
+    Args:
+        frame: Zielbild
+        points: (N, 2) int32-Array mit Spurpunkten (älteste zuerst)
+        max_thickness: Linienstärke des neuesten Segments
+        values: Optionale Werte in [0, 1] pro Segment (N-1), z.B. Geschwindigkeit
+        color_fn: Abbildung Wert → BGR-Farbe
+        buckets: Anzahl Farbstufen
+    """
+    n = len(points)
+    if n < 2:
+        return
+
+    # Position des Segments in der Spur bestimmt die Linienstärke
+    alpha = np.arange(1, n) / n
+    if values is None:
+        values = alpha
+
+    levels = np.minimum((np.asarray(values) * buckets).astype(np.int32), buckets - 1)
+    widths = np.maximum(1, (max_thickness * alpha).astype(np.int32))
+
+    # Grenzen der Läufe gleicher (Farbstufe, Linienstärke)
+    key = levels * (max_thickness + 1) + widths
+    breaks = np.flatnonzero(np.diff(key)) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.concatenate((breaks, [n - 1]))
+
+    groups = {}
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        # Segmente start..end-1 verbinden die Punkte start..end
+        groups.setdefault(int(key[start]), []).append(points[start:end + 1])
+
+    for group_key, polylines in groups.items():
+        level, width = divmod(group_key, max_thickness + 1)
+        color = color_fn((level + 0.5) / buckets)
+        cv2.polylines(frame, polylines, False, color, width)
+
+
+class StaticHud:
+    """
+    Vorgerendertes Overlay für statische HUD-Elemente
+
+    Elemente werden über add_rect/add_text registriert und beim ersten
+    Frame (bzw. bei Größenänderung) einmal gezeichnet. Danach kostet das
+    Einblenden nur noch eine Kopie pro belegtem Bildband.
+    """
+
+    def __init__(self):
+        self.elements = []
+        self._shape = None
+        self._overlay = None
+        self._mask = None
+        self._regions = []
+
+    def add_rect(self, pt1, pt2, color):
+        """Gefülltes Rechteck; negative Koordinaten zählen vom unteren/rechten Rand"""
+        self.elements.append(('rect', pt1, pt2, color))
+        self._shape = None
+
+    def add_text(self, text, org, scale, color, thickness=1):
+        """Text; negative Koordinaten zählen vom unteren/rechten Rand"""
+        self.elements.append(('text', text, org, scale, color, thickness))
+        self._shape = None
+
+    def clear(self):
+        """Entfernt alle Elemente"""
+        self.elements = []
+        self._shape = None
+
+    @staticmethod
+    def _resolve(point, width, height):
+        x, y = point
+        return (x + width if x < 0 else x, y + height if y < 0 else y)
+
+    def _render(self, shape):
+        """Zeichnet alle Elemente einmalig in Overlay und Maske"""
+        height, width = shape[:2]
+        self._overlay = np.zeros(shape, dtype=np.uint8)
+        self._mask = np.zeros((height, width), dtype=np.uint8)
+
+        for element in self.elements:
+            if element[0] == 'rect':
+                _, pt1, pt2, color = element
+                pt1 = self._resolve(pt1, width, height)
+                pt2 = self._resolve(pt2, width, height)
+                cv2.rectangle(self._overlay, pt1, pt2, color, -1)
+                cv2.rectangle(self._mask, pt1, pt2, 255, -1)
+            else:
+                _, text, org, scale, color, thickness = element
+                org = self._resolve(org, width, height)
+                cv2.putText(self._overlay, text, org, cv2.FONT_HERSHEY_SIMPLEX,
+                            scale, color, thickness)
+                cv2.putText(self._mask, text, org, cv2.FONT_HERSHEY_SIMPLEX,
+                            scale, 255, thickness)
+
+        self._regions = self._find_regions()
+        self._shape = shape
+
+    def _find_regions(self):
+        """
+        Zerlegt die Maske in horizontale Bänder mit Inhalt
+
+        Vollständig deckende Bänder (z.B. Header-Balken) werden ohne Maske
+        kopiert; nur teilweise bedeckte Bänder brauchen cv2.copyTo.
+        """
+        rows = np.flatnonzero(self._mask.any(axis=1))
+        if len(rows) == 0:
+            return []
+
+        breaks = np.flatnonzero(np.diff(rows) > 1) + 1
+        regions = []
+        for band in np.split(rows, breaks):
+            y0, y1 = int(band[0]), int(band[-1]) + 1
+            cols = np.flatnonzero(self._mask[y0:y1].any(axis=0))
+            x0, x1 = int(cols[0]), int(cols[-1]) + 1
+            opaque = bool(self._mask[y0:y1, x0:x1].all())
+            regions.append((y0, y1, x0, x1, opaque))
+        return regions
+
+    def composite(self, frame):
+        """Blendet das Overlay in den Frame ein (eine Operation pro Band)"""
+        if self._shape != frame.shape:
+            self._render(frame.shape)
+
+        for y0, y1, x0, x1, opaque in self._regions:
+            if opaque:
+                frame[y0:y1, x0:x1] = self._overlay[y0:y1, x0:x1]
+            else:
+                cv2.copyTo(self._overlay[y0:y1, x0:x1], self._mask[y0:y1, x0:x1],
+                           frame[y0:y1, x0:x1])
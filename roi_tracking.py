@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Region-of-Interest Tracking
+Sobald die Hand gefunden wurde, wird nur noch ein gepolstertes Fenster um
+die letzte Handposition segmentiert statt des ganzen Bildes. Das Fenster
+wächst mit der gemessenen Geschwindigkeit; ist die Hand für mehrere Frames
+verloren, wird wieder das ganze Bild durchsucht.
+"""
+
+
+class RegionOfInterest:
+    """Verwaltet das Suchfenster um die zuletzt bekannte Handposition"""
+
+    def __init__(self, padding=40, velocity_gain=2.0, max_lost_frames=5, min_size=64):
+        self.padding = padding                  # Rand um die Hand in Pixeln
+        self.velocity_gain = velocity_gain      # Zusätzlicher Rand pro px/Frame Bewegung
+        self.max_lost_frames = max_lost_frames  # Danach wieder Vollbildsuche
+        self.min_size = min_size                # Mindestgröße des Fensters
+
+        self.reset()
+
+    def reset(self):
+        """Verwirft die letzte Position, nächster Frame wird voll durchsucht"""
+        self.last_center = None
+        self.last_bbox = None
+        self.velocity = (0.0, 0.0)
+        self.lost_frames = 0
+
+        # Statistik
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.searched_pixels = 0
+        self.full_pixels = 0
+
+    @property
+    def active(self):
+        """True wenn der nächste Frame nur im Fenster segmentiert wird"""
+        return self.last_bbox is not None and self.lost_frames < self.max_lost_frames
+
+    def window(self, frame_shape):
+        """
+        Berechnet das Suchfenster für den nächsten Frame
+
+        Args:
+            frame_shape: Shape des Frames (Höhe, Breite, ...)
+
+        Returns:
+            (x0, y0, x1, y1) oder None für eine Vollbildsuche
+        """
+        height, width = frame_shape[:2]
+
+        if not self.active:
+            self.full_frames += 1
+            self.searched_pixels += width * height
+            self.full_pixels += width * height
+            return None
+
+        x, y, w, h = self.last_bbox
+        vx, vy = self.velocity
+
+        # Bei verlorener Hand wird das Fenster mit jedem Frame größer
+        growth = 1 + self.lost_frames
+        pad_x = int((self.padding + self.velocity_gain * abs(vx)) * growth)
+        pad_y = int((self.padding + self.velocity_gain * abs(vy)) * growth)
+
+        # Fenster in Bewegungsrichtung verschieben (erwartete Position)
+        shift_x = int(vx * growth)
+        shift_y = int(vy * growth)
+
+        x0 = x + shift_x - pad_x
+        y0 = y + shift_y - pad_y
+        x1 = x + w + shift_x + pad_x
+        y1 = y + h + shift_y + pad_y
+
+        # Mindestgröße erzwingen (z.B. für Median-Blur-Kernel)
+        if x1 - x0 < self.min_size:
+            grow = (self.min_size - (x1 - x0)) // 2 + 1
+            x0, x1 = x0 - grow, x1 + grow
+        if y1 - y0 < self.min_size:
+            grow = (self.min_size - (y1 - y0)) // 2 + 1
+            y0, y1 = y0 - grow, y1 + grow
+
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(width, x1), min(height, y1)
+
+        if x1 - x0 < self.min_size or y1 - y0 < self.min_size:
+            self.full_frames += 1
+            self.searched_pixels += width * height
+            self.full_pixels += width * height
+            return None
+
+        self.roi_frames += 1
+        self.searched_pixels += (x1 - x0) * (y1 - y0)
+        self.full_pixels += width * height
+        return x0, y0, x1, y1
+
+    def update(self, hand_center, hand_bbox):
+        """
+        Übernimmt das Ergebnis des aktuellen Frames
+
+        Args:
+            hand_center: Gefundener Mittelpunkt oder None
+            hand_bbox: Bounding Box (x, y, w, h) der Handkontur oder None
+        """
+        if hand_center is None:
+            self.lost_frames += 1
+            if self.lost_frames >= self.max_lost_frames:
+                self.last_center = None
+                self.last_bbox = None
+                self.velocity = (0.0, 0.0)
+            return
+
+        if self.last_center is not None and self.lost_frames == 0:
+            # Geschwindigkeit in px/Frame, leicht geglättet
+            vx = hand_center[0] - self.last_center[0]
+            vy = hand_center[1] - self.last_center[1]
+            self.velocity = (0.5 * self.velocity[0] + 0.5 * vx,
+                             0.5 * self.velocity[1] + 0.5 * vy)
+
+        self.last_center = hand_center
+        self.last_bbox = hand_bbox
+        self.lost_frames = 0
+
+    def pixel_ratio(self):
+        """Anteil der tatsächlich segmentierten Pixel gegenüber Vollbildsuche"""
+        if self.full_pixels == 0:
+            return 1.0
+        return self.searched_pixels / self.full_pixels
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Parallele Verarbeitung langer Aufnahmen in Zeitabschnitten (Shards)
+Das Video wird an Keyframes in Abschnitte geteilt, die ein Prozess-Pool
+unabhängig verarbeitet. Jeder Abschnitt beginnt mit einem Vorlauf
+(Warm-up), dessen Ergebnisse verworfen werden: Er füllt Spur,
+Gesten-Puffer und Kalman-Filter mit so vielen getrackten Frames, wie der
+längste Puffer fasst, sodass die Ergebnisse an den Grenzen denen eines
+durchgehenden Laufs entsprechen. Die Teilergebnisse werden
+anschließend in Frame-Reihenfolge zu einer Datei zusammengesetzt.
+
+Keyframes werden mit ffprobe bestimmt; ohne ffprobe wird gleichmäßig geteilt.
+
+Beispiele:
+    python sharded_processing.py aufnahme.mp4 -o ergebnis.jsonl --workers 4
+    python sharded_processing.py aufnahme.mp4 --speedup 4
+"""
+
+import argparse
+import bisect
+import multiprocessing as mp
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+from batch_processing import create_tracker, frame_timestamp, process_frame, write_records
+
+
+def keyframe_times(path):
+    """
+    Zeitpunkte (s) der Keyframes des ersten Videostreams über ffprobe
+
+    Returns:
+        Sortierte Liste oder None, wenn ffprobe fehlt oder fehlschlägt
+    """
+    if shutil.which("ffprobe") is None:
+        return None
+
+    cmd = ["ffprobe", "-v", "error", "-select_streams", "v:0",
+           "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", path]
+    try:
+        output = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"ffprobe fehlgeschlagen ({e}), teile gleichmäßig")
+        return None
+
+    times = []
+    for line in output.splitlines():
+        pts, _, flags = line.partition(",")
+        if "K" in flags and pts not in ("", "N/A"):
+            times.append(float(pts))
+    return sorted(times) or None
+
+
+def video_info(path):
+    """Frame-Anzahl und FPS laut Container"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise OSError(f"{path} konnte nicht geöffnet werden")
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    cap.release()
+    return frame_count, fps
+
+
+def plan_shards(frame_count, num_shards, keyframes=None):
+    """
+    Teilt [0, frame_count) in Abschnitte, Grenzen möglichst auf Keyframes
+
+    Args:
+        frame_count: Anzahl Frames des Videos
+        num_shards: Gewünschte Anzahl Abschnitte
+        keyframes: Sortierte Frame-Indizes der Keyframes (None = gleichmäßig)
+
+    Returns:
+        Liste von (start, end) Frame-Indizes, end exklusiv; der letzte
+        Abschnitt hat end=None (bis zum Dateiende)
+    """
+    num_shards = max(1, min(num_shards, frame_count))
+    bounds = [0]
+    for i in range(1, num_shards):
+        target = frame_count * i // num_shards
+        if keyframes:
+            # Nächstgelegenen Keyframe als Grenze nehmen
+            pos = bisect.bisect_left(keyframes, target)
+            candidates = keyframes[max(0, pos - 1):pos + 1]
+            target = min(candidates, key=lambda k: abs(k - target))
+        if bounds[-1] < target < frame_count:
+            bounds.append(target)
+    bounds.append(None)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def warmup_length(tracker_kind):
+    """Vorlauf in getrackten Frames: längster zustandsbehafteter Puffer des Trackers"""
+    tracker = create_tracker(tracker_kind)
+    lengths = [tracker.max_trail_length]
+    if hasattr(tracker, 'gesture_buffer'):
+        lengths += [tracker.gesture_buffer.capacity, tracker.gesture_classifier.window]
+    return max(lengths)
+
+
+def _warm_start(start, limit, keyframes):
+    """
+    Beginn des Vorlaufs: nicht vor limit, bei bekannten Keyframes am vorherigen Keyframe
+
+    Liegt zwischen limit und start kein Keyframe, beginnt der Vorlauf bei
+    limit (dem Start des vorherigen Abschnitts, selbst eine Keyframe-Grenze).
+    """
+    warm_start = max(limit, start)
+    if keyframes:
+        pos = bisect.bisect_right(keyframes, warm_start) - 1
+        warm_start = keyframes[pos] if pos >= 0 and keyframes[pos] >= limit else limit
+    return warm_start
+
+
+def process_shard(path, start, end, warmup, tracker_kind="advanced", keyframes=None, limit=0):
+    """
+    Verarbeitet einen Abschnitt inklusive Vorlauf
+
+    Die Puffer des Trackers rücken nur in Frames vor, in denen die Hand
+    erkannt oder vorhergesagt wird. Der Vorlauf beginnt daher zunächst
+    warmup Frames vor start (bei bekannten Keyframes am vorherigen
+    Keyframe, damit das Springen günstig bleibt) und wird verdoppelt, bis
+    er warmup getrackte Frames enthält oder limit (Start des vorherigen
+    Abschnitts) erreicht. Zurückgegeben werden nur die Ergebnisse für
+    [start, end).
+    """
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    clip = os.path.basename(path)
+
+    position = 0
+    span = warmup
+    while True:
+        warm_start = _warm_start(start - span, limit, keyframes)
+        if warm_start != position:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, warm_start)
+
+        tracker = create_tracker(tracker_kind)
+        tracked = 0
+        frame_index = warm_start
+        while frame_index < start:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            result = process_frame(tracker, frame, frame_timestamp(cap, frame_index, fps))
+            if result['center'] is not None:
+                tracked += 1
+            frame_index += 1
+        position = frame_index
+
+        if tracked >= warmup or warm_start <= limit:
+            break
+        span *= 2
+
+    records = []
+    while end is None or frame_index < end:
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        timestamp = frame_timestamp(cap, frame_index, fps)
+        record = {'clip': clip, 'frame': frame_index, 'time': timestamp}
+        record.update(process_frame(tracker, frame, timestamp))
+        records.append(record)
+        frame_index += 1
+
+    cap.release()
+    return records
+
+
+def _init_worker(opencv_threads):
+    cv2.setNumThreads(opencv_threads)
+
+
+def process_sharded(path, workers, num_shards=None, tracker_kind="advanced"):
+    """
+    Verarbeitet ein Video parallel in Abschnitten und setzt die Ergebnisse zusammen
+
+    Args:
+        path: Pfad zur Videodatei
+        workers: Anzahl Prozesse
+        num_shards: Anzahl Abschnitte (Standard: 2 pro Worker für bessere Lastverteilung)
+        tracker_kind: "simple" oder "advanced"
+
+    Returns:
+        Ergebnisse in Frame-Reihenfolge
+    """
+    frame_count, fps = video_info(path)
+    if num_shards is None:
+        num_shards = 2 * workers if workers > 1 else 1
+
+    keyframes = None
+    times = keyframe_times(path)
+    if times and fps > 0:
+        keyframes = sorted({int(round(t * fps)) for t in times})
+
+    shards = plan_shards(frame_count, num_shards, keyframes)
+    warmup = warmup_length(tracker_kind)
+
+    # Der Vorlauf eines Abschnitts reicht höchstens bis zum Start des vorherigen
+    limits = [0] + [start for start, _ in shards[:-1]]
+
+    if workers <= 1:
+        parts = [process_shard(path, start, end, warmup, tracker_kind, keyframes, limit)
+                 for (start, end), limit in zip(shards, limits)]
+    else:
+        # Threads pro Worker so begrenzen, dass die Kerne nicht überbucht werden
+        opencv_threads = max(1, (os.cpu_count() or 1) // workers)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"),
+                                 initializer=_init_worker,
+                                 initargs=(opencv_threads,)) as pool:
+            futures = [pool.submit(process_shard, path, start, end, warmup,
+                                   tracker_kind, keyframes, limit)
+                       for (start, end), limit in zip(shards, limits)]
+            parts = [future.result() for future in futures]
+
+    # Abschnitte sind nach Start sortiert, Ergebnisse innerhalb in Frame-Reihenfolge
+    return [record for part in parts for record in part]
+
+
+def compare_records(reference, records):
+    """Anzahl Frames, deren Mittelpunkt oder Geste vom Referenzlauf abweicht"""
+    mismatches = sum(a['center'] != b['center'] or a['gesture'] != b['gesture']
+                     for a, b in zip(reference, records))
+    return mismatches + abs(len(reference) - len(records))
+
+
+def speedup_report(path, max_workers, tracker_kind="advanced"):
+    """Misst die Laufzeit für 1..max_workers Prozesse und gibt die Beschleunigung aus"""
+    print(f"Beschleunigung für {os.path.basename(path)}:")
+    print(f"{'Worker':>6} {'Zeit':>9} {'Frames/s':>9} {'Speed-up':>9} {'Abweichend':>10}")
+
+    reference = None
+    base_time = None
+    report = {}
+    for workers in range(1, max_workers + 1):
+        start = time.perf_counter()
+        records = process_sharded(path, workers, tracker_kind=tracker_kind)
+        elapsed = time.perf_counter() - start
+
+        if reference is None:
+            reference, base_time = records, elapsed
+        mismatches = compare_records(reference, records)
+        speedup = base_time / elapsed if elapsed > 0 else 0.0
+        fps = len(records) / elapsed if elapsed > 0 else 0.0
+
+        report[workers] = {'time': elapsed, 'fps': fps, 'speedup': speedup,
+                           'mismatches': mismatches}
+        print(f"{workers:>6} {elapsed:>8.2f}s {fps:>9.1f} {speedup:>8.2f}x {mismatches:>10}")
+
+    return report
+
+
+def main():
+    """Hauptfunktion"""
+    parser = argparse.ArgumentParser(description="Parallele Verarbeitung langer Aufnahmen "
+                                                 "in Keyframe-Abschnitten")
+    parser.add_argument("input", help="Videodatei")
+    parser.add_argument("-o", "--output", default="tracking_results.jsonl",
+                        help="Ausgabedatei (.jsonl oder .npz)")
+    parser.add_argument("--tracker", choices=["simple", "advanced"], default="advanced",
+                        help="Verwendete Tracking-Pipeline")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Anzahl Prozesse")
+    parser.add_argument("--shards", type=int, default=None,
+                        help="Anzahl Abschnitte (Standard: 2 pro Worker)")
+    parser.add_argument("--speedup", type=int, default=None, metavar="N",
+                        help="Laufzeit für 1..N Worker messen (keine Ausgabedatei)")
+    args = parser.parse_args()
+
+    if args.speedup:
+        speedup_report(args.input, args.speedup, args.tracker)
+        return
+
+    start = time.perf_counter()
+    records = process_sharded(args.input, args.workers, args.shards, args.tracker)
+    elapsed = time.perf_counter() - start
+
+    write_records(records, args.output)
+    fps = len(records) / elapsed if elapsed > 0 else 0
+    print(f"{len(records)} Frames mit {args.workers} Worker(n) in {elapsed:.2f} s "
+          f"({fps:.1f} Frames/s)")
+    print(f"Ergebnisse gespeichert: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
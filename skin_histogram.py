@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Adaptives Hautmodell über ein H-S Histogramm
+Statt eines festen Farbtonfensters um einen einzelnen Kalibrierungspixel
+wird die Hautfarbe als kleines 2D-Histogramm über Farbton (H) und
+Sättigung (S) modelliert und per cv2.calcBackProject auf den Frame
+angewendet.
+
+Das Histogramm wird bei jedem Frame aus den Pixeln innerhalb der
+bestätigten Handkontur nachgeführt (exponentieller Zerfall über
+cv2.accumulateWeighted, in-place). So folgt das Modell langsamen
+Lichtänderungen, und die Maske bleibt sauber genug, dass ein kleiner
+Gauß-Blur statt des 15px Median Blur reicht.
+"""
+
+import cv2
+import numpy as np
+
+HS_RANGES = [0, 180, 0, 256]
+
+
+class AdaptiveSkinModel:
+    """H-S Histogramm mit Back-Projection und exponentiell gewichteter Nachführung"""
+
+    def __init__(self, h_bins=30, s_bins=32, learning_rate=0.05, threshold=40):
+        self.h_bins = h_bins
+        self.s_bins = s_bins
+        self.learning_rate = learning_rate  # Gewicht des neuen Frames (0..1)
+        self.threshold = threshold          # Mindestwahrscheinlichkeit (0..255) für Haut
+
+        # Modell (Summe 1), Histogramm des aktuellen Frames und Lookup für die Back-Projection
+        self.hist = np.zeros((h_bins, s_bins), dtype=np.float32)
+        self._sample = np.zeros((h_bins, s_bins), dtype=np.float32)
+        self._lookup = np.zeros((h_bins, s_bins), dtype=np.float32)
+        self.ready = False
+        self.updates = 0
+
+        # Zwischenpuffer für die Konturmaske (wächst bei Bedarf)
+        self._contour_mask = np.zeros((0, 0), dtype=np.uint8)
+
+    def reset(self):
+        """Verwirft das Modell; das nächste update() initialisiert es neu"""
+        self.hist.fill(0)
+        self.ready = False
+        self.updates = 0
+
+    def update(self, hsv, mask):
+        """
+        Führt das Modell mit den Pixeln unter der Maske nach
+
+        Args:
+            hsv: HSV-Bild
+            mask: uint8-Maske der Hautpixel (gleiche Größe wie hsv)
+        """
+        cv2.calcHist([hsv], [0, 1], mask, [self.h_bins, self.s_bins], HS_RANGES,
+                     hist=self._sample)
+        total = float(self._sample.sum())
+        if total <= 0:
+            return
+        self._sample /= total
+
+        if self.ready:
+            cv2.accumulateWeighted(self._sample, self.hist, self.learning_rate)
+        else:
+            self.hist[:] = self._sample
+            self.ready = True
+
+        # Lookup-Tabelle: Modell auf 0..255 relativ zum häufigsten Bin
+        cv2.normalize(self.hist, self._lookup, 0, 255, cv2.NORM_MINMAX)
+        self.updates += 1
+
+    def update_from_contour(self, frame, contour):
+        """
+        Führt das Modell mit den Pixeln innerhalb der Handkontur nach
+
+        Es wird nur die Bounding Box der Kontur nach HSV konvertiert.
+        """
+        x, y, w, h = cv2.boundingRect(contour)
+        if w == 0 or h == 0:
+            return
+
+        if self._contour_mask.shape[0] < h or self._contour_mask.shape[1] < w:
+            self._contour_mask = np.zeros((max(h, self._contour_mask.shape[0]),
+                                           max(w, self._contour_mask.shape[1])), np.uint8)
+        mask = self._contour_mask[:h, :w]
+        mask.fill(0)
+        cv2.drawContours(mask, [contour], -1, 255, -1, offset=(-x, -y))
+
+        hsv = cv2.cvtColor(frame[y:y + h, x:x + w], cv2.COLOR_BGR2HSV)
+        self.update(hsv, mask)
+
+    def back_project(self, hsv, dst=None):
+        """Hautwahrscheinlichkeit pro Pixel (uint8, 0..255)"""
+        return cv2.calcBackProject([hsv], [0, 1], self._lookup, HS_RANGES, 1, dst=dst)
+
+    def segment(self, hsv, blur=5, dst=None):
+        """
+        Hautmaske aus der Back-Projection
+
+        Die Wahrscheinlichkeiten werden vor dem Schwellwert mit einem kleinen
+        Gauß-Kernel geglättet; das ersetzt den großen Median Blur. Alle
+        Schritte laufen in-place im Zielpuffer dst (falls angegeben).
+        """
+        probability = self.back_project(hsv, dst)
+        if blur > 1:
+            cv2.GaussianBlur(probability, (blur, blur), 0, dst=probability)
+        _, mask = cv2.threshold(probability, self.threshold, 255, cv2.THRESH_BINARY,
+                                dst=probability)
+        return mask
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Vorberechnete BGR→Haut Lookup-Tabelle
+Der Hauttest (HSV-Konvertierung + inRange) ist eine reine Funktion des
+BGR-Werts eines Pixels. Statt ihn für jeden Frame neu zu rechnen, wird er
+einmal für alle (quantisierten) BGR-Werte ausgewertet und danach mit einem
+einzigen vektorisierten Tabellenzugriff angewendet.
+
+Die Tabelle wird auf der Festplatte (bit-gepackt) zwischengespeichert,
+Schlüssel ist der Kalibrierungsbereich, sodass ein Warmstart den Aufbau
+überspringt.
+"""
+
+import os
+import sys
+
+import cv2
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lut_cache")
+
+
+class SkinLookupTable:
+    """Hautmaske über eine Lookup-Tabelle statt cvtColor + inRange"""
+
+    def __init__(self, bits=8, cache_dir=DEFAULT_CACHE_DIR):
+        if not 4 <= bits <= 8:
+            raise ValueError("bits muss zwischen 4 und 8 liegen")
+        if sys.byteorder != "little":
+            raise RuntimeError("SkinLookupTable setzt eine Little-Endian-Plattform voraus")
+
+        self.bits = bits                # 8 = volle 256³ Tabelle, 6 = 64³ usw.
+        self.shift = 8 - bits
+        self.cache_dir = cache_dir
+        self.key = None                 # Kalibrierungsbereich der aktuellen Tabelle
+
+        # Index-Layout eines BGRA-Pixels als uint32: B | G << 8 | R << 16
+        channel_mask = (1 << bits) - 1
+        self.index_mask = channel_mask | channel_mask << 8 | channel_mask << 16
+        self.table = None
+
+        # Zwischenpuffer pro Bildgröße
+        self._shape = None
+        self._bgra = None
+        self._index = None
+
+    def _cache_path(self, key):
+        """Dateiname der zwischengespeicherten Tabelle für einen Bereich"""
+        lower, upper = key
+        name = "skin_lut_b{}_{}_{}.npy".format(
+            self.bits, "-".join(map(str, lower)), "-".join(map(str, upper)))
+        return os.path.join(self.cache_dir, name)
+
+    def _compute(self, lower, upper):
+        """Wertet den HSV-Hauttest für alle quantisierten BGR-Werte aus"""
+        levels = 1 << self.bits
+        step = 1 << self.shift
+
+        # Repräsentant jeder Quantisierungsstufe ist die Mitte des Intervalls
+        values = (np.arange(levels, dtype=np.uint16) * step + step // 2).astype(np.uint8)
+
+        # Reihenfolge R, G, B: dichter Index = r * levels² + g * levels + b
+        r, g, b = np.meshgrid(values, values, values, indexing='ij')
+        colors = np.stack((b, g, r), axis=-1).reshape(-1, 1, 3)
+
+        hsv = cv2.cvtColor(colors, cv2.COLOR_BGR2HSV)
+        return cv2.inRange(hsv, lower, upper).ravel()
+
+    def update(self, lower_skin, upper_skin):
+        """
+        Stellt sicher, dass die Tabelle zum Kalibrierungsbereich passt
+
+        Baut die Tabelle nur neu, wenn sich der Bereich geändert hat. Ist sie
+        bereits auf der Festplatte vorhanden, wird sie von dort geladen.
+        """
+        key = (tuple(int(v) for v in lower_skin), tuple(int(v) for v in upper_skin))
+        if key == self.key:
+            return
+
+        levels = 1 << self.bits
+        path = self._cache_path(key)
+
+        dense = None
+        if os.path.exists(path):
+            try:
+                dense = np.unpackbits(np.load(path), count=levels ** 3)
+                dense *= 255
+            except (OSError, ValueError) as e:
+                print(f"Fehler beim Laden der Haut-Tabelle {path}: {e}")
+
+        if dense is None:
+            dense = self._compute(np.array(key[0], dtype=np.uint8),
+                                  np.array(key[1], dtype=np.uint8))
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                np.save(path, np.packbits(dense > 0))
+            except OSError as e:
+                print(f"Haut-Tabelle konnte nicht gespeichert werden: {e}")
+
+        if self.shift == 0:
+            # Bei 8 Bit entspricht der dichte Index bereits dem BGRA-Layout
+            self.table = dense
+        else:
+            # Dichte Tabelle in das Layout des BGRA-Index verteilen
+            q = np.arange(levels, dtype=np.uint32)
+            r, g, b = np.meshgrid(q, q, q, indexing='ij')
+            positions = (b | g << 8 | r << 16).ravel()
+
+            self.table = np.zeros(self.index_mask + 1, dtype=np.uint8)
+            self.table[positions] = dense
+
+        self.key = key
+
+    def apply(self, frame, dst=None):
+        """
+        Berechnet die Hautmaske eines BGR-Bildes
+
+        Args:
+            frame: BGR-Bild
+            dst: Optionaler Zielpuffer (uint8, Größe des Bildes)
+
+        Returns:
+            Maske (uint8, 0 oder 255) in der Größe des Bildes
+        """
+        shape = frame.shape[:2]
+        if shape != self._shape:
+            self._shape = shape
+            self._bgra = np.empty(shape + (4,), dtype=np.uint8)
+            self._index = np.empty(shape, dtype=np.uint32)
+
+        # BGRA als uint32 lesen: ein Wert pro Pixel ohne Kopie
+        cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA, dst=self._bgra)
+        packed = self._bgra.view(np.uint32).reshape(shape)
+
+        if self.shift:
+            np.right_shift(packed, self.shift, out=self._index)
+            np.bitwise_and(self._index, self.index_mask, out=self._index)
+        else:
+            np.bitwise_and(packed, self.index_mask, out=self._index)
+
+        return np.take(self.table, self._index, out=dst)
@@ -7,6 +7,8 @@ Dieses einfache Programm testet, ob die Webcam verfügbar ist.
 import cv2
 import sys
 
+from orientation import OrientationTransform
+
 def test_webcam():
     print("Teste Webcam-Verfügbarkeit...")
     
@@ -31,6 +33,10 @@ def test_webcam():
         print(f"✅ Webcam funktioniert! Auflösung: {width}x{height}")
         print("Drücke 'q' um den Test zu beenden...")
         
+        # Das Bild wird nur für die Anzeige gedreht, in einen wiederverwendeten Puffer
+        orientation = OrientationTransform(180)
+        display = None
+        
         # Zeige Live-Video für 10 Sekunden oder bis 'q' gedrückt wird
         while True:
             ret, frame = cap.read()
@@ -39,7 +45,7 @@ def test_webcam():
                 break
             
             # Drehe das Bild um 180°
-            frame = cv2.rotate(frame, cv2.ROTATE_180)
+            frame = display = orientation.render(frame, dst=display)
             
             # Füge Text hinzu
             cv2.putText(frame, "Webcam Test - Druecke 'q' zum Beenden", 
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Trajektorien-Puffer
+Ringpuffer fester Kapazität für Handpositionen (x, y, Zeit, Geschwindigkeit)
+auf Basis eines strukturierten NumPy-Arrays. Anhängen kostet O(1) und die
+letzten N Einträge sind immer als zusammenhängende View ohne Kopie
+verfügbar, sodass auch Spuren mit tausenden Punkten günstig bleiben.
+
+Trick: Jeder Eintrag wird zweimal geschrieben (an Position i und
+i + capacity). Dadurch liegen die letzten N Einträge immer lückenlos im
+doppelt so großen Array.
+"""
+
+import numpy as np
+
+TRAJECTORY_DTYPE = np.dtype([
+    ('x', np.float64),
+    ('y', np.float64),
+    ('t', np.float64),
+    ('v', np.float64),
+])
+
+
+class TrajectoryBuffer:
+    """Ringpuffer für Trajektorien mit O(1)-Anhängen und Views ohne Kopie"""
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("capacity muss mindestens 1 sein")
+
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=TRAJECTORY_DTYPE)
+        # Gleicher Speicher als (2 * capacity, 4) float64 für x/y-Views
+        self._flat = self._data.view(np.float64).reshape(-1, 4)
+        self._head = 0    # Nächste Schreibposition in [0, capacity)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return self._count > 0
+
+    def append(self, x, y, t=0.0, v=0.0):
+        """Hängt einen Punkt an; bei voller Kapazität fällt der älteste heraus"""
+        row = (x, y, t, v)
+        self._flat[self._head] = row
+        self._flat[self._head + self.capacity] = row
+
+        self._head += 1
+        if self._head == self.capacity:
+            self._head = 0
+        if self._count < self.capacity:
+            self._count += 1
+
+    def clear(self):
+        """Leert den Puffer (Speicher bleibt allokiert)"""
+        self._head = 0
+        self._count = 0
+
+    def _bounds(self, n):
+        """Start und Ende der letzten n Einträge im doppelten Array"""
+        n = self._count if n is None else max(0, min(n, self._count))
+        end = self._head + self.capacity
+        return end - n, end
+
+    def last(self, n=None):
+        """Strukturierte View der letzten n Einträge (älteste zuerst)"""
+        start, end = self._bounds(n)
+        return self._data[start:end]
+
+    def xy(self, n=None):
+        """View der letzten n Positionen als (n, 2) float64-Array"""
+        start, end = self._bounds(n)
+        return self._flat[start:end, :2]
+
+    def points(self, n=None):
+        """Letzte n Positionen als (n, 2) int32-Array, z.B. für cv2.polylines"""
+        return self.xy(n).astype(np.int32)
+
+    def latest(self):
+        """Neuester Eintrag oder None wenn leer"""
+        if self._count == 0:
+            return None
+        return self._data[self._head + self.capacity - 1]